@@ -1,7 +1,10 @@
 const API_BASE = (import.meta.env.VITE_API_BASE ?? "http://127.0.0.1:8000").replace(/\/$/, "");
 
 async function req<T>(path: string, init?: RequestInit): Promise<T> {
+  // GETs carry ETag/Last-Modified with Cache-Control: no-cache, so the browser
+  // revalidates its cached copy (304) instead of re-downloading the body.
   const res = await fetch(`${API_BASE}${path}`, {
+    cache: "no-cache",
     ...init,
     headers: { "Content-Type": "application/json", ...(init?.headers ?? {}) },
   });
@@ -9,6 +12,24 @@ async function req<T>(path: string, init?: RequestInit): Promise<T> {
   return (await res.json()) as T;
 }
 
+export type ChangeEvent = { id?: number; type: string; version: string; row?: number; [key: string]: any };
+
+// Subscribe to /events (SSE). `types` are prefixes such as "project" or "catalog";
+// returns a function that closes the stream.
+export function subscribeEvents(types: string[], onEvent: (e: ChangeEvent) => void): () => void {
+  const u = new URL(`${API_BASE}/events`);
+  if (types.length) u.searchParams.set("types", types.join(","));
+  const source = new EventSource(u.toString());
+  const handler = (msg: MessageEvent) => onEvent(JSON.parse(msg.data));
+  for (const t of ["project.inserted", "project.updated", "dependencies.changed", "catalog.reloaded", "suggestion.added", "workbook.changed", "resync"]) {
+    source.addEventListener(t, handler as EventListener);
+  }
+  return () => source.close();
+}
+
+export type BatchRequest = { id?: string; path: string; params?: Record<string, string | number | boolean> };
+export type BatchResult = { id: string | number; status: number; body: any };
+
 export const api = {
   health: () => req<{ status: string; paths: string }>("/health"),
   catalogs: () => req<any>("/catalogs"),
@@ -25,7 +46,15 @@ export const api = {
   },
   getProject: (nombre: string) => req<any>(`/projects/${encodeURIComponent(nombre)}`),
   updateProjectRow: (row: number, payload: any) => req<any>(`/projects/${row}`, { method: "PUT", body: JSON.stringify(payload) }),
+  teams: (includeRows = false, offset = 0, limit = 50) =>
+    req<any>(`/teams?include_rows=${includeRows}&offset=${offset}&limit=${limit}`),
   team: (equipo: string) => req<any>(`/teams/${encodeURIComponent(equipo)}`),
   sendSuggestion: (payload: { usuario: string; texto: string }) => req(`/suggestions`, { method: "POST", body: JSON.stringify(payload) }),
   listSuggestions: (limit = 5) => req<any>(`/suggestions?limit=${limit}`),
+  // Several reads answered from one workbook snapshot in a single round trip.
+  batch: (requests: BatchRequest[]) =>
+    req<{ version: string; count: number; results: BatchResult[] }>(`/batch`, {
+      method: "POST",
+      body: JSON.stringify({ requests }),
+    }),
 };
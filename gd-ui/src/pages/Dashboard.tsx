@@ -1,5 +1,5 @@
 import { useEffect, useMemo, useState } from "react";
-import { api } from "../lib/api";
+import { api, subscribeEvents } from "../lib/api";
 
 function Card({ title, value }: { title: string; value: string }) {
   return (
@@ -16,17 +16,30 @@ export default function Dashboard() {
   const [filter, setFilter] = useState<string>("");
   const [metricsData, setMetricsData] = useState<any>(null);
   const [err, setErr] = useState<string>("");
+  const [catalogTick, setCatalogTick] = useState(0);
+  const [metricsTick, setMetricsTick] = useState(0);
 
   useEffect(() => {
     api.catalogs().then(setCatalogs).catch((e) => setErr(String(e)));
-  }, []);
+  }, [catalogTick]);
 
   useEffect(() => {
     api
       .metrics(scope, scope === "all" ? undefined : filter || undefined)
       .then(setMetricsData)
       .catch((e) => setErr(String(e)));
-  }, [scope, filter]);
+  }, [scope, filter, metricsTick]);
+
+  // Refetch only what an event touched; suggestions don't affect the metrics,
+  // so they are not subscribed to.
+  useEffect(
+    () =>
+      subscribeEvents(["project", "dependencies", "catalog", "workbook"], (e) => {
+        if (e.type === "catalog.reloaded" || e.type === "resync") setCatalogTick((n) => n + 1);
+        setMetricsTick((n) => n + 1);
+      }),
+    []
+  );
 
   const filterOptions = useMemo(() => {
     if (!catalogs) return [] as string[];
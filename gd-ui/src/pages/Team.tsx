@@ -5,6 +5,7 @@ export default function Team() {
   const [catalogs, setCatalogs] = useState<any>(null);
   const [team, setTeam] = useState("");
   const [data, setData] = useState<any>(null);
+  const [overview, setOverview] = useState<any>(null);
   const [err, setErr] = useState("");
 
   useEffect(() => {
@@ -15,6 +16,10 @@ export default function Team() {
         setTeam(c.celulas_dep?.[0] ?? "");
       })
       .catch((e) => setErr(String(e)));
+    api
+      .teams()
+      .then(setOverview)
+      .catch((e) => setErr(String(e)));
   }, []);
 
   async function load() {
@@ -46,6 +51,42 @@ export default function Team() {
         </button>
       </div>
 
+      {overview && (
+        <div className="rounded-2xl border bg-white p-4 shadow-sm">
+          <div className="font-semibold">Resumen por célula</div>
+          <div className="mt-3 overflow-auto rounded-xl border">
+            <table className="w-full text-sm">
+              <thead className="bg-slate-50 text-left">
+                <tr>
+                  <th className="p-3">Célula</th>
+                  <th className="p-3 w-[90px]">Total</th>
+                  <th className="p-3 w-[90px]">P</th>
+                  <th className="p-3 w-[90px]">L</th>
+                  <th className="p-3 w-[120px]">% Pend.</th>
+                </tr>
+              </thead>
+              <tbody>
+                {(overview.equipos ?? [])
+                  .filter((e: any) => e.found)
+                  .map((e: any) => (
+                    <tr
+                      key={e.equipo}
+                      className={`border-t cursor-pointer ${e.equipo === team ? "bg-slate-50" : ""}`}
+                      onClick={() => setTeam(e.equipo)}
+                    >
+                      <td className="p-3">{e.equipo}</td>
+                      <td className="p-3">{e.total}</td>
+                      <td className="p-3">{e.pendientes}</td>
+                      <td className="p-3">{e.negociadas}</td>
+                      <td className="p-3">{e.pct_pendientes.toFixed(1)}%</td>
+                    </tr>
+                  ))}
+              </tbody>
+            </table>
+          </div>
+        </div>
+      )}
+
       {data && data.found && (
         <div className="rounded-2xl border bg-white p-4 shadow-sm">
           <div className="flex flex-wrap justify-between gap-2">
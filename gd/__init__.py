@@ -1,13 +1,64 @@
-"""Backend package extracted from the GD_v1 notebook."""
-from .config import *  # noqa: F401,F403
-from .models import Dependency, Project, Catalogs
-from .catalogs import load_catalogs
-from .projects import (
-    write_project_with_dependencies,
-    get_all_project_names,
-    summarize_by_equipo,
-    summarize_by_proyecto,
-    update_project_row_and_dependencies,
-)
-from .metrics import compute_metrics
-from .suggestions import append_suggestion, get_last_suggestions
+"""Backend package extracted from the GD_v1 notebook.
+
+Nothing is imported eagerly: the configuration constants and the public
+functions below are resolved on first attribute access, so ``import gd`` (and
+``python -m gd --help``) does not pay for openpyxl. ``from gd import
+compute_metrics`` and ``from gd import *`` work as before.
+"""
+from importlib import import_module
+
+_LAZY = {
+    "Dependency": "models",
+    "Project": "models",
+    "Catalogs": "models",
+    "load_catalogs": "catalogs",
+    "write_project_with_dependencies": "projects",
+    "write_projects_with_dependencies": "projects",
+    "get_all_project_names": "projects",
+    "summarize_all_equipos": "projects",
+    "summarize_by_equipo": "projects",
+    "summarize_by_proyecto": "projects",
+    "summarize_projects": "projects",
+    "update_project_row_and_dependencies": "projects",
+    "collect_board_projects": "boards",
+    "get_expert_project_list": "boards",
+    "rank_expert_projects": "boards",
+    "update_alistamiento_rating": "boards",
+    "update_expert_fields": "boards",
+    "compute_metrics": "metrics",
+    "append_suggestion": "suggestions",
+    "get_last_suggestions": "suggestions",
+    "sync_suggestions": "suggestions",
+}
+
+
+def _config_names():
+    config = import_module(".config", __name__)
+    return [name for name in vars(config) if not name.startswith("_")]
+
+
+def __getattr__(name):
+    if name == "__all__":
+        value = _config_names() + list(_LAZY)
+    elif name in _LAZY:
+        value = getattr(import_module(f".{_LAZY[name]}", __name__), name)
+    else:
+        config = import_module(".config", __name__)
+        if name.startswith("_"):
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+        if hasattr(config, name):
+            value = getattr(config, name)
+        else:
+            # Submodules (``gd.projects``) used to be reachable after a bare ``import gd``.
+            try:
+                value = import_module(f".{name}", __name__)
+            except ModuleNotFoundError as exc:
+                if exc.name != f"{__name__}.{name}":
+                    raise
+                raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY) | set(_config_names()))
@@ -0,0 +1,449 @@
+"""Command-line entry point: ``python -m gd <command>``.
+
+For cron jobs and scripts that need the workbook without going through the
+API:
+
+- ``metrics``: the /metrics payload for one scope, or one record per área /
+  célula with ``--each``;
+- ``teams``: P/L counts per célula (``--rows`` lists the projects, ``--trenes``
+  the tren rollups);
+- ``export``: every ProyectosTI row, with one column per célula flag;
+- ``import``: append the projects of a CSV / JSON-lines file in ``export``
+  format (``fila``, ``ID`` and derived columns are ignored) with one save;
+- ``validate-layout``: sheets, header row and R:BB / BC:CM against Datos;
+- ``reconcile``: rows whose CN:CQ / PORC_CUMPLIMIENTO disagree with their
+  R:BB flags and M/N, fixed in one save with ``--fix``;
+- ``bench``: ``gd.bench`` with the same arguments.
+
+Records are written to stdout as they are produced (``--format
+json|jsonl|csv``). Each command imports only what it needs, and
+``--workbook`` is applied before ``gd.config`` reads ``GD_EXCEL_PATH``.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import sys
+
+FORMATS = ("json", "jsonl", "csv")
+NUMERIC_FIELDS = ("LINEA_BASE", "LINEA_BASE_Q_GESTION", "AVANCE", "ESTIMADO_AVANCE", "CONTRIBUCION")
+DESC_SUFFIX = " (descripción)"
+
+
+class CommandError(Exception):
+    """Bad input for a command; printed to stderr with exit status 1."""
+
+
+def _json_default(value):
+    isoformat = getattr(value, "isoformat", None)
+    return isoformat() if isoformat else str(value)
+
+
+def _csv_value(value):
+    if isinstance(value, (list, tuple)):
+        return ";".join(str(v) for v in value)
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False, default=_json_default)
+    isoformat = getattr(value, "isoformat", None)
+    return isoformat() if isoformat else value
+
+
+def emit(records, fmt: str, out=None, fields=None) -> int:
+    """Write the flat dicts in *records* to *out* as they come; returns the count."""
+    out = out or sys.stdout
+    count = 0
+    if fmt == "csv":
+        writer = None
+        for record in records:
+            if writer is None:
+                writer = csv.DictWriter(out, fieldnames=fields or list(record), extrasaction="ignore")
+                writer.writeheader()
+            writer.writerow({k: _csv_value(v) for k, v in record.items()})
+            count += 1
+    elif fmt == "jsonl":
+        for record in records:
+            out.write(json.dumps(record, ensure_ascii=False, default=_json_default) + "\n")
+            count += 1
+    else:
+        out.write("[")
+        for record in records:
+            out.write(("," if count else "") + "\n" + json.dumps(record, ensure_ascii=False, default=_json_default))
+            count += 1
+        out.write("\n]\n" if count else "]\n")
+    out.flush()
+    return count
+
+
+def emit_rows(header, rows, fmt: str, out=None) -> int:
+    """``emit`` for tuples in *header* order; CSV output skips the per-row dicts."""
+    if fmt != "csv":
+        return emit((dict(zip(header, row)) for row in rows), fmt, out)
+    out = out or sys.stdout
+    writer = csv.writer(out)
+    writer.writerow(header)
+    count = 0
+    for row in rows:
+        writer.writerow([_csv_value(v) for v in row])
+        count += 1
+    out.flush()
+    return count
+
+
+def _dump(obj) -> None:
+    json.dump(obj, sys.stdout, ensure_ascii=False, indent=2, default=_json_default)
+    sys.stdout.write("\n")
+
+
+def _catalogs():
+    from .catalogs import load_catalogs
+
+    return load_catalogs()
+
+
+# ---------------------------------------------------------------------------
+# Commands
+# ---------------------------------------------------------------------------
+
+def cmd_metrics(args) -> int:
+    from .metrics import compute_metrics_from_snapshot
+    from .snapshot import get_snapshot
+
+    catalogs = _catalogs()
+    snap = get_snapshot()
+
+    def record(scope, value):
+        payload = compute_metrics_from_snapshot(
+            snap, scope, value, catalogs.dependency_mapping, catalogs.celula_tren_map
+        )
+        return {"scope": scope, "filter_value": value, **payload}
+
+    if args.each:
+        values = catalogs.area_tren_coe if args.each == "area" else catalogs.celulas_dep
+        emit((record(args.each, v) for v in values), args.format or "jsonl")
+    elif (args.format or "json") == "json":
+        _dump(record(args.scope, args.filter_value))
+    else:
+        emit([record(args.scope, args.filter_value)], args.format)
+    return 0
+
+
+def _team_records(result, rows: bool):
+    for summary in result["equipos"]:
+        if not summary.get("found"):
+            print(summary["msg"], file=sys.stderr)
+            continue
+        if rows:
+            for item in summary["rows"]:
+                yield {"equipo": summary["equipo"], **item}
+        else:
+            yield {k: v for k, v in summary.items() if k not in ("found", "rows", "rows_total")}
+
+
+def cmd_teams(args) -> int:
+    from .projects import summarize_all_equipos
+
+    catalogs = _catalogs()
+    result = summarize_all_equipos(
+        catalogs.celulas_dep,
+        celula_tren_map=catalogs.celula_tren_map,
+        include_rows=args.rows,
+        rows_limit=-1,
+    )
+    records = result["trenes"] if args.trenes else _team_records(result, args.rows)
+    emit(records, args.format or "jsonl")
+    return 0
+
+
+def _dependency_columns(snap, dep_mapping):
+    """``[(equipo, flag_pos, desc_pos)]`` in sheet order, for células present in R:BB."""
+    columns = []
+    for equipo, desc_header in dep_mapping.items():
+        pos = snap.flag_col(equipo)
+        if pos is not None:
+            columns.append((equipo, pos, snap.desc_col(desc_header)))
+    return sorted(columns, key=lambda c: c[1])
+
+
+def cmd_export(args) -> int:
+    from operator import itemgetter
+
+    from .config import COLS
+    from .snapshot import get_snapshot
+
+    dep_mapping = _catalogs().dependency_mapping
+    snap = get_snapshot()
+    dep_columns = _dependency_columns(snap, dep_mapping)
+    header = ["fila"] + list(COLS) + [equipo for equipo, _, _ in dep_columns]
+    positions = [snap.col(f) for f in COLS] + [pos for _, pos, _ in dep_columns]
+    if args.descriptions:
+        described = [(equipo, desc_pos) for equipo, _, desc_pos in dep_columns if desc_pos is not None]
+        header += [equipo + DESC_SUFFIX for equipo, _ in described]
+        positions += [desc_pos for _, desc_pos in described]
+    pick = itemgetter(*positions)
+    q = (args.q or "").strip().lower()
+
+    def rows():
+        for rec in snap.records():
+            if q and q not in str(rec.nombre or "").lower():
+                continue
+            yield (rec.row,) + pick(rec.values)
+
+    emit_rows(header, rows(), args.format or "csv")
+    return 0
+
+
+def _read_records(path: str, fmt: str | None):
+    fmt = fmt or ("csv" if path.lower().endswith(".csv") else "jsonl")
+    handle = sys.stdin if path == "-" else open(path, encoding="utf-8-sig", newline="")
+    try:
+        if fmt == "csv":
+            yield from csv.DictReader(handle)
+        elif fmt == "json":
+            yield from json.load(handle)
+        else:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+def _project_from_record(record: dict, line: int, dep_mapping: dict):
+    """``(Project, [Dependency])`` from one ``export``-style record."""
+    from .excel import header_key, to_num_cell
+    from .models import Dependency, Project
+
+    attrs = dict(Project.ROW_FIELDS)
+    celulas = {header_key(equipo): equipo for equipo in dep_mapping}
+
+    kwargs = {}
+    deps = []
+    for key, value in record.items():
+        if key is None or value in (None, ""):
+            continue
+        key = str(key).strip()
+        if key in attrs:
+            if key in NUMERIC_FIELDS:
+                value = to_num_cell(value)
+            elif isinstance(value, str):
+                value = value.strip()
+            kwargs[attrs[key]] = value
+            continue
+        equipo = celulas.get(header_key(key))
+        if equipo is None:
+            continue  # fila, ID, derived columns, descriptions and unknown keys
+        flag = str(value).strip().upper()
+        if flag not in ("P", "L"):
+            raise CommandError(f"Registro {line}: bandera '{value}' inválida para '{equipo}' (use P o L).")
+        deps.append(Dependency(equipo=equipo, codigo=flag, descripcion=str(record.get(key + DESC_SUFFIX) or "")))
+    if not kwargs.get("nombre"):
+        raise CommandError(f"Registro {line}: falta NOMBRE_PROYECTO.")
+    return Project(**kwargs), deps
+
+
+def cmd_import(args) -> int:
+    catalogs = _catalogs()
+    if not catalogs.dependency_mapping:
+        raise CommandError("No dependency mapping loaded from 'Datos'.")
+    items = [
+        _project_from_record(record, line, catalogs.dependency_mapping)
+        for line, record in enumerate(_read_records(args.file, args.input_format), start=1)
+    ]
+    if args.dry_run:
+        _dump({"validos": len(items), "escritos": 0})
+        return 0
+
+    from .projects import write_projects_with_dependencies
+
+    inserted = write_projects_with_dependencies(items, catalogs.dependency_mapping)
+    emit(
+        ({"fila": row, "id": project_id, "proyecto": project.nombre} for (row, project_id), (project, _) in zip(inserted, items)),
+        args.format or "jsonl",
+    )
+    return 0
+
+
+def cmd_validate_layout(args) -> int:
+    from .config import COLS, EXCEL_PATH, FLAG_END_COL, FLAG_START_COL, HEADER_ROW_PROYECTOS, SHEET_PROYECTOS, START_ROW_PROYECTOS, ensure_required_sheets
+    from .excel import column_index_from_string, header_key, load_workbook
+    from .snapshot import MAX_SNAPSHOT_COL, build_snapshot
+
+    errors, warnings = [], []
+    wb = load_workbook(EXCEL_PATH, read_only=True)
+    try:
+        try:
+            ensure_required_sheets(wb.sheetnames)
+        except KeyError as exc:
+            _dump({"ok": False, "workbook": str(EXCEL_PATH), "errores": [exc.args[0]], "avisos": []})
+            return 1
+        ws = wb[SHEET_PROYECTOS]
+        header_rows = list(ws.iter_rows(min_row=1, max_row=START_ROW_PROYECTOS - 1, max_col=MAX_SNAPSHOT_COL, values_only=True))
+    finally:
+        wb.close()
+
+    header_row = next(
+        (idx for idx, values in enumerate(header_rows, start=1) if values and isinstance(values[0], str) and values[0].strip().lower() == "id"),
+        None,
+    )
+    if header_row is None:
+        errors.append(f"No se encontró el encabezado 'ID' en la columna A antes de la fila {START_ROW_PROYECTOS}.")
+        header = ()
+    else:
+        header = tuple(header_rows[header_row - 1]) + (None,) * MAX_SNAPSHOT_COL
+        if header_row != HEADER_ROW_PROYECTOS:
+            warnings.append(f"El encabezado está en la fila {header_row}, no en la {HEADER_ROW_PROYECTOS}.")
+        for field, letter in COLS.items():
+            if header[column_index_from_string(letter) - 1] in (None, ""):
+                warnings.append(f"La columna {letter} ({field}) no tiene encabezado.")
+
+    catalogs = _catalogs()
+    snap = build_snapshot(EXCEL_PATH)
+    if not catalogs.dependency_mapping:
+        errors.append("La hoja Datos no define 'Celula Dependencia' / 'Celula Descripcion Dependencia'.")
+    for equipo, desc_header in catalogs.dependency_mapping.items():
+        if snap.flag_col(equipo) is None:
+            errors.append(f"La célula '{equipo}' no tiene columna en R:BB.")
+        if snap.desc_col(desc_header) is None:
+            warnings.append(f"La descripción '{desc_header}' de '{equipo}' no tiene columna en BC:CM.")
+    known = {header_key(equipo) for equipo in catalogs.dependency_mapping}
+    for key in snap.flag_columns:
+        if key not in known:
+            warnings.append(f"La columna de R:BB '{key}' no está en la hoja Datos.")
+
+    id_pos = snap.col("ID")
+    seen = {}
+    bad_flags = []
+    for row, values in snap.iter_rows():
+        raw = values[id_pos]
+        if isinstance(raw, (int, float)):
+            if int(raw) in seen:
+                errors.append(f"ID {int(raw)} duplicado en las filas {seen[int(raw)]} y {row}.")
+            seen.setdefault(int(raw), row)
+        elif raw not in (None, ""):
+            warnings.append(f"Fila {row}: ID no numérico '{raw}'.")
+        for flag in values[FLAG_START_COL - 1:FLAG_END_COL]:
+            if flag not in (None, "") and str(flag).strip().upper() not in ("P", "L"):
+                bad_flags.append(row)
+                break
+    if bad_flags:
+        sample = ", ".join(str(r) for r in bad_flags[:10])
+        warnings.append(f"{len(bad_flags)} filas con banderas distintas de P/L en R:BB (p. ej. {sample}).")
+
+    _dump({
+        "ok": not errors,
+        "workbook": str(EXCEL_PATH),
+        "header_row": header_row,
+        "filas": len(snap.rows),
+        "celulas": len(catalogs.dependency_mapping),
+        "errores": errors,
+        "avisos": warnings,
+    })
+    return 0 if not errors else 1
+
+
+def cmd_reconcile(args) -> int:
+    from .reconcile import reconcile
+
+    report = reconcile(fix=args.fix, include_formulas=args.formulas, limit=None)
+    fmt = args.format or "jsonl"
+    drift = report.pop("items")
+    if fmt == "csv":
+        records = (
+            {"fila": d["fila"], "id": d["id"], "proyecto": d["proyecto"], "campo": field, **values}
+            for d in drift
+            for field, values in d["campos"].items()
+        )
+        emit(records, fmt, fields=["fila", "id", "proyecto", "campo", "excel", "calculado"])
+    else:
+        emit(drift, fmt)
+    print(
+        f"{report['drifted_rows']} de {report['rows']} filas con diferencias"
+        f" ({', '.join(f'{k}: {v}' for k, v in report['by_field'].items() if v) or 'ninguna'});"
+        f" {report['fixed_cells']} celdas corregidas.",
+        file=sys.stderr,
+    )
+    return 1 if report["drifted_rows"] and args.check and not args.fix else 0
+
+
+def cmd_bench(args) -> int:
+    from . import bench
+
+    return bench.main(args.bench_args)
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m gd", description="Operaciones por lotes sobre el workbook de gd, sin la API.")
+    parser.add_argument("--workbook", help="workbook a usar (equivale a GD_EXCEL_PATH)")
+    sub = parser.add_subparsers(dest="command", required=True, metavar="COMANDO")
+
+    def add(name, func, help_text, formats=True, **kwargs):
+        p = sub.add_parser(name, help=help_text, description=help_text, **kwargs)
+        if formats:
+            p.add_argument("--format", choices=FORMATS, help="formato de salida")
+        p.set_defaults(func=func)
+        return p
+
+    p = add("metrics", cmd_metrics, "métricas del dashboard (como GET /metrics)")
+    p.add_argument("--scope", choices=("all", "area", "celula"), default="all")
+    p.add_argument("--filter-value")
+    p.add_argument("--each", choices=("area", "celula"), help="un registro por cada área / célula del catálogo")
+
+    p = add("teams", cmd_teams, "conteos P/L por célula")
+    group = p.add_mutually_exclusive_group()
+    group.add_argument("--rows", action="store_true", help="un registro por célula y proyecto")
+    group.add_argument("--trenes", action="store_true", help="totales por tren")
+
+    p = add("export", cmd_export, "exporta todas las filas de ProyectosTI")
+    p.add_argument("--descriptions", action="store_true", help="incluir las descripciones de BC:CM")
+    p.add_argument("--q", help="solo proyectos cuyo nombre contiene este texto")
+
+    p = add("import", cmd_import, "agrega los proyectos de un archivo CSV / JSON lines en un solo guardado")
+    p.add_argument("file", help="archivo a importar ('-' para stdin)")
+    p.add_argument("--input-format", choices=FORMATS, help="por defecto según la extensión")
+    p.add_argument("--dry-run", action="store_true", help="solo validar")
+
+    add("validate-layout", cmd_validate_layout, "verifica hojas, encabezados y columnas de dependencias", formats=False)
+
+    p = add("reconcile", cmd_reconcile, "filas cuyo CN:CQ / PORC_CUMPLIMIENTO no coincide con R:BB y M/N")
+    p.add_argument("--check", action="store_true", help="salir con 1 si hay diferencias")
+    p.add_argument("--fix", action="store_true", help="escribir los valores calculados (un solo guardado)")
+    p.add_argument("--formulas", action="store_true", help="tratar las fórmulas de Excel como diferencias (y reemplazarlas con --fix)")
+
+    # Everything after "bench" (including --help) goes to gd.bench.
+    add("bench", cmd_bench, "benchmarks (argumentos de python -m gd.bench)", formats=False, add_help=False)
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if args.command == "bench":
+        args.bench_args = extra
+    elif extra:
+        parser.error(f"argumentos no reconocidos: {' '.join(extra)}")
+    if args.workbook:
+        config = sys.modules.get("gd.config")
+        if config is not None and os.path.abspath(config.EXCEL_PATH) != os.path.abspath(args.workbook):
+            parser.error("--workbook debe indicarse antes de importar gd.config; use GD_EXCEL_PATH.")
+        os.environ["GD_EXCEL_PATH"] = args.workbook
+    try:
+        return args.func(args)
+    except CommandError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    except BrokenPipeError:
+        # Output piped into `head` & co.: stop quietly.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
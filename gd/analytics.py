@@ -0,0 +1,378 @@
+"""Portfolio-wide dependency analytics over a sparse project × célula matrix.
+
+The R:BB block is mostly empty (a project depends on a handful of the 37
+células), so it is stored in CSR form: ``indptr`` delimits each project's
+entries in ``indices`` (célula column) and ``data`` (``PENDING`` = 1 for P,
+``NEGOTIATED`` = 2 for L). The matrix is built once per workbook version from
+the snapshot and memoised like the boards.
+
+On top of it:
+
+- ``celula_load``: P/L counts per célula and per tren, plus the projects
+  with the most pending dependencies;
+- ``co_dependency``: célula × célula counts of projects depending on both
+  (the heatmap behind ``/analytics/dependency-matrix``).
+
+With numpy installed these are vectorised over the CSR arrays (``bincount``
+of columns, rows and, for co-dependencies, of the célula pairs within each
+row), so their cost follows the number of flags rather than rows × células;
+without it the same results come from plain loops over the arrays.
+"""
+from __future__ import annotations
+
+import heapq
+import threading
+from array import array
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Dict, List, Optional, Sequence
+
+from .config import EXCEL_PATH
+from .excel import workbook_key
+from .snapshot import get_snapshot
+from .telemetry import cache_lookup, rows_scanned, timed
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+PENDING = 1
+NEGOTIATED = 2
+ENCODING = {"P": PENDING, "L": NEGOTIATED}
+DEFAULT_TOP = 20
+
+
+@dataclass
+class DependencyMatrix:
+    version: str
+    celulas: List[str]   # column labels, in R:BB order
+    rows: List[int]      # Excel row of each matrix row
+    ids: list
+    nombres: List[str]
+    indptr: Sequence[int]
+    indices: Sequence[int]
+    data: Sequence[int]
+
+    @property
+    def shape(self):
+        return len(self.rows), len(self.celulas)
+
+    @property
+    def nnz(self) -> int:
+        return len(self.indices)
+
+    def row_entries(self, i: int):
+        """``(célula index, code)`` pairs of matrix row *i*."""
+        start, end = self.indptr[i], self.indptr[i + 1]
+        return zip(self.indices[start:end], self.data[start:end])
+
+    def to_dict(self) -> dict:
+        return {
+            "shape": list(self.shape),
+            "nnz": self.nnz,
+            "encoding": ENCODING,
+            "celulas": self.celulas,
+            "filas": self.rows,
+            "ids": self.ids,
+            "proyectos": self.nombres,
+            "indptr": [int(v) for v in self.indptr],
+            "indices": [int(v) for v in self.indices],
+            "data": [int(v) for v in self.data],
+        }
+
+
+@timed("index")
+def build_matrix(snap, dep_mapping: dict) -> DependencyMatrix:
+    """CSR matrix of the P/L flags of every named project in *snap*."""
+    columns = sorted(
+        (pos, equipo) for equipo in dep_mapping for pos in (snap.flag_col(equipo),) if pos is not None
+    )
+    positions = [pos for pos, _ in columns]
+
+    indptr = array("i", [0])
+    indices = array("b" if len(columns) < 128 else "i")
+    data = array("b")
+    rows, ids, nombres = [], [], []
+    records = snap.records()
+    rows_scanned("analytics", len(records))
+    for rec in records:
+        if not rec.nombre:
+            continue
+        values = rec.values
+        for j, pos in enumerate(positions):
+            flag = values[pos]
+            if not flag:
+                continue
+            code = ENCODING.get(flag) or ENCODING.get(str(flag).strip().upper())
+            if code:
+                indices.append(j)
+                data.append(code)
+        indptr.append(len(indices))
+        rows.append(rec.row)
+        ids.append(rec.id)
+        nombres.append(str(rec.nombre).strip())
+
+    if np is not None:
+        indptr = np.frombuffer(indptr, dtype=np.int32)
+        indices = np.frombuffer(indices, dtype=np.int8 if indices.typecode == "b" else np.int32)
+        data = np.frombuffer(data, dtype=np.int8)
+    return DependencyMatrix(
+        version=snap.version,
+        celulas=[equipo for _, equipo in columns],
+        rows=rows,
+        ids=ids,
+        nombres=nombres,
+        indptr=indptr,
+        indices=indices,
+        data=data,
+    )
+
+
+_matrices: Dict[object, tuple] = {}
+_matrices_lock = threading.Lock()
+
+
+def get_matrix(dep_mapping: dict, path=EXCEL_PATH, snap=None) -> DependencyMatrix:
+    """The matrix for the current workbook version (built once, then memoised)."""
+    snap = snap or get_snapshot(path)
+    key = workbook_key(path)
+    token = (snap.version, tuple(dep_mapping))
+    with _matrices_lock:
+        cached = _matrices.get(key)
+        hit = cached is not None and cached[0] == token
+    cache_lookup("analytics_matrix", hit)
+    if hit:
+        return cached[1]
+    matrix = build_matrix(snap, dep_mapping)
+    with _matrices_lock:
+        _matrices[key] = (token, matrix)
+    return matrix
+
+
+# ---------------------------------------------------------------------------
+# Kernels (numpy when available, plain Python otherwise)
+# ---------------------------------------------------------------------------
+
+def _column_counts(matrix: DependencyMatrix, code: int) -> List[int]:
+    n_cols = len(matrix.celulas)
+    if np is not None:
+        return np.bincount(matrix.indices[matrix.data == code], minlength=n_cols).tolist()
+    counts = [0] * n_cols
+    for j, value in zip(matrix.indices, matrix.data):
+        if value == code:
+            counts[j] += 1
+    return counts
+
+
+def _row_counts(matrix: DependencyMatrix, code: int, columns: Optional[Sequence[int]] = None) -> List[int]:
+    """Entries equal to *code* per matrix row, optionally only in *columns*."""
+    n_rows = len(matrix.rows)
+    if np is not None:
+        row_of = np.repeat(np.arange(n_rows), np.diff(matrix.indptr))
+        mask = matrix.data == code
+        if columns is not None:
+            mask &= np.isin(matrix.indices, np.asarray(list(columns), dtype=np.int64))
+        return np.bincount(row_of[mask], minlength=n_rows).tolist()
+    allowed = set(columns) if columns is not None else None
+    counts = [0] * n_rows
+    for i in range(n_rows):
+        counts[i] = sum(
+            1 for j, value in matrix.row_entries(i)
+            if value == code and (allowed is None or j in allowed)
+        )
+    return counts
+
+
+def _group_projects(matrix: DependencyMatrix, group_of_col: Sequence[int], n_groups: int) -> List[int]:
+    """Distinct projects with at least one P/L in each group of columns."""
+    if n_groups == 0:
+        return []
+    n_rows = len(matrix.rows)
+    if np is not None:
+        groups = np.asarray(group_of_col, dtype=np.int64)[matrix.indices]
+        row_of = np.repeat(np.arange(n_rows, dtype=np.int64), np.diff(matrix.indptr))
+        valid = groups >= 0
+        pairs = np.unique(row_of[valid] * n_groups + groups[valid])
+        return np.bincount(pairs % n_groups, minlength=n_groups).tolist()
+    counts = [0] * n_groups
+    for i in range(n_rows):
+        seen = {group_of_col[j] for j, _code in matrix.row_entries(i)}
+        for g in seen:
+            if g >= 0:
+                counts[g] += 1
+    return counts
+
+
+def co_dependency(matrix: DependencyMatrix, pending_only: bool = False) -> List[List[int]]:
+    """``C[a][b]`` = projects flagged for both células *a* and *b* (diagonal: for *a*)."""
+    n_rows, n_cols = matrix.shape
+    if np is not None:
+        # Count (a, b) pairs straight from the CSR rows: for every offset d,
+        # each entry pairs with the entry d positions later in its row. Rows
+        # hold at most ``n_cols`` entries, so this is O(nnz × longest row).
+        indices = matrix.indices.astype(np.int64)
+        row_of = np.repeat(np.arange(n_rows), np.diff(matrix.indptr))
+        if pending_only:
+            keep = matrix.data == PENDING
+            indices, row_of = indices[keep], row_of[keep]
+        lengths = np.bincount(row_of, minlength=n_rows)
+        starts = np.cumsum(lengths) - lengths
+        remaining = lengths[row_of] - (np.arange(len(indices)) - starts[row_of]) - 1
+        pairs = np.zeros(n_cols * n_cols, dtype=np.int64)
+        for d in range(1, int(lengths.max(initial=0))):
+            first = np.flatnonzero(remaining >= d)
+            pairs += np.bincount(indices[first] * n_cols + indices[first + d], minlength=n_cols * n_cols)
+        counts = pairs.reshape(n_cols, n_cols)
+        counts = counts + counts.T
+        counts[np.diag_indices(n_cols)] = np.bincount(indices, minlength=n_cols)
+        return counts.tolist()
+    counts = [[0] * n_cols for _ in range(n_cols)]
+    for i in range(n_rows):
+        cols = [j for j, code in matrix.row_entries(i) if not pending_only or code == PENDING]
+        for j in cols:
+            counts[j][j] += 1
+        for a, b in combinations(cols, 2):
+            counts[a][b] += 1
+            counts[b][a] += 1
+    return counts
+
+
+def _top_pairs(matrix: DependencyMatrix, counts: List[List[int]], top: int) -> List[dict]:
+    pairs = (
+        (counts[a][b], a, b)
+        for a in range(len(counts))
+        for b in range(a + 1, len(counts))
+        if counts[a][b]
+    )
+    return [
+        {"celula_a": matrix.celulas[a], "celula_b": matrix.celulas[b], "proyectos": n}
+        for n, a, b in heapq.nlargest(top, pairs, key=lambda p: (p[0], -p[1], -p[2]))
+    ]
+
+
+def _pct(part: int, total: int) -> float:
+    return (part / total * 100.0) if total else 0.0
+
+
+# ---------------------------------------------------------------------------
+# Payloads
+# ---------------------------------------------------------------------------
+
+@timed("compute")
+def celula_load(
+    dep_mapping: dict,
+    celula_tren_map: dict | None = None,
+    tren: Optional[str] = None,
+    top: int = DEFAULT_TOP,
+    path=EXCEL_PATH,
+    snap=None,
+) -> dict:
+    """Pending/negotiated load per célula and per tren, and the most blocked projects.
+
+    With *tren* the célula list and the ranking only look at that tren's
+    células.
+    """
+    matrix = get_matrix(dep_mapping, path, snap)
+    celula_tren_map = celula_tren_map or {}
+    trenes_of = [str(celula_tren_map.get(c) or "").strip() for c in matrix.celulas]
+    tren_names = sorted({t for t in trenes_of if t})
+    tren_index = {t: i for i, t in enumerate(tren_names)}
+
+    pendientes = _column_counts(matrix, PENDING)
+    negociadas = _column_counts(matrix, NEGOTIATED)
+    wanted = str(tren).strip() if tren else None
+
+    celulas = []
+    for j, celula in enumerate(matrix.celulas):
+        if wanted and trenes_of[j] != wanted:
+            continue
+        total = pendientes[j] + negociadas[j]
+        celulas.append({
+            "celula": celula,
+            "tren": trenes_of[j] or None,
+            "pendientes": pendientes[j],
+            "negociadas": negociadas[j],
+            "total": total,
+            "pct_pendientes": _pct(pendientes[j], total),
+        })
+    celulas.sort(key=lambda c: (-c["pendientes"], c["celula"]))
+
+    group_of_col = [tren_index.get(t, -1) for t in trenes_of]
+    proyectos = _group_projects(matrix, group_of_col, len(tren_names))
+    trenes = []
+    for g, name in enumerate(tren_names):
+        if wanted and name != wanted:
+            continue
+        cols = [j for j, t in enumerate(group_of_col) if t == g]
+        p = sum(pendientes[j] for j in cols)
+        l = sum(negociadas[j] for j in cols)
+        trenes.append({
+            "tren": name,
+            "celulas": [matrix.celulas[j] for j in cols],
+            "pendientes": p,
+            "negociadas": l,
+            "pct_pendientes": _pct(p, p + l),
+            "proyectos": proyectos[g],
+        })
+    trenes.sort(key=lambda t: (-t["pendientes"], t["tren"]))
+
+    columns = [j for j, t in enumerate(trenes_of) if t == wanted] if wanted else None
+    return {
+        "version": matrix.version,
+        "backend": "numpy" if np is not None else "python",
+        "proyectos": len(matrix.rows),
+        "celulas": celulas,
+        "trenes": trenes,
+        "mas_bloqueados": most_blocked(matrix, top, columns),
+    }
+
+
+def most_blocked(matrix: DependencyMatrix, top: int = DEFAULT_TOP, columns: Optional[Sequence[int]] = None) -> List[dict]:
+    """The *top* projects by pending (P) dependencies, optionally within *columns*."""
+    allowed = set(columns) if columns is not None else None
+    pending = _row_counts(matrix, PENDING, columns)
+    ranked = heapq.nlargest(
+        max(top, 0),
+        (i for i, n in enumerate(pending) if n),
+        key=lambda i: (pending[i], -matrix.rows[i]),
+    )
+    result = []
+    for i in ranked:
+        entries = [(j, code) for j, code in matrix.row_entries(i) if allowed is None or j in allowed]
+        result.append({
+            "fila": matrix.rows[i],
+            "id": matrix.ids[i],
+            "proyecto": matrix.nombres[i],
+            "pendientes": pending[i],
+            "negociadas": sum(1 for _j, code in entries if code == NEGOTIATED),
+            "celulas_pendientes": [matrix.celulas[j] for j, code in entries if code == PENDING],
+        })
+    return result
+
+
+@timed("compute")
+def dependency_matrix(
+    dep_mapping: dict,
+    pending_only: bool = False,
+    include_matrix: bool = False,
+    top: int = DEFAULT_TOP,
+    path=EXCEL_PATH,
+    snap=None,
+) -> dict:
+    """Célula × célula co-dependency heatmap, plus the CSR matrix itself."""
+    matrix = get_matrix(dep_mapping, path, snap)
+    counts = co_dependency(matrix, pending_only)
+    payload = {
+        "version": matrix.version,
+        "backend": "numpy" if np is not None else "python",
+        "shape": list(matrix.shape),
+        "nnz": matrix.nnz,
+        "celulas": matrix.celulas,
+        "pending_only": pending_only,
+        "co_dependencia": counts,
+        "pares_principales": _top_pairs(matrix, counts, top),
+    }
+    if include_matrix:
+        payload["matriz"] = matrix.to_dict()
+    return payload
@@ -1,16 +1,40 @@
 """FastAPI surface for the GD backend logic."""
 from __future__ import annotations
 
+import asyncio
+import json
+import threading
+import time
 from pathlib import Path
 from typing import List, Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
 
-from . import catalogs, config, metrics, projects, suggestions
+from . import (
+    analytics,
+    batch,
+    boards,
+    catalogs,
+    config,
+    events,
+    httpcache,
+    metrics,
+    profiling,
+    projects,
+    ranking,
+    reconcile,
+    service,
+    suggestions,
+    telemetry,
+    tracing,
+)
+from .coalesce import coalesced
+from .excel import workbook_mtime, workbook_version
 from .models import Catalogs, Dependency, Project
 
 
@@ -75,6 +99,31 @@ class UpdatePayload(BaseModel):
         return [d.to_model() for d in self.dependencias]
 
 
+class ProjectDetailsPayload(BaseModel):
+    nombres: List[str] = Field(default_factory=list, description="Nombres exactos de proyecto")
+    ids: List[int] = Field(default_factory=list, description="IDs de la columna A")
+
+
+class BatchRequest(BaseModel):
+    id: Optional[str] = None
+    path: str = Field(..., description="Ruta GET de lectura, p. ej. /metrics?scope=all")
+    params: dict = Field(default_factory=dict)
+
+
+class BatchPayload(BaseModel):
+    requests: List[BatchRequest] = Field(..., min_length=1, max_length=batch.MAX_REQUESTS)
+
+
+class ExpertDecisionPayload(BaseModel):
+    priorizado: str = Field(..., description="SI / NO")
+    contribucion: Optional[float] = None
+    iniciativa: Optional[str] = None
+
+
+class RatingPayload(BaseModel):
+    rating: int = Field(..., ge=0, le=5, description="Rating PO Sync (0–5)")
+
+
 class SuggestionPayload(BaseModel):
     usuario: str = ""
     texto: str
@@ -83,6 +132,11 @@ class SuggestionPayload(BaseModel):
 STATIC_DIR = Path(__file__).parent / "static"
 
 app = FastAPI(title="GD Excel API", version="1.0.0", docs_url=None, redoc_url=None)
+app.add_middleware(telemetry.RequestTimingMiddleware, exclude=("/events",))
+if config.TRACE_PATH:
+    app.add_middleware(tracing.TracingMiddleware, exclude=("/events",))
+if config.PROFILING:
+    app.add_middleware(profiling.ProfilingMiddleware)
 # Allow the React UI (Vite dev server) to consume the API directly from the browser.
 app.add_middleware(
     CORSMiddleware,
@@ -93,15 +147,161 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified", "Retry-After", profiling.PROFILE_ID_HEADER, tracing.TRACE_ID_HEADER],
 )
 # Serve the Telefónica-themed Swagger assets (CSS + SVG favicon) alongside the API.
 app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 
+_catalogs_version = workbook_version()
 try:
     _catalogs = catalogs.load_catalogs()
 except Exception as exc:  # pragma: no cover - defensive bootstrap
     print("⚠️ No se pudieron cargar catálogos al iniciar la API:", exc)
     _catalogs = Catalogs()
+_catalogs_loaded_at = time.time()
+
+
+_suggestion_sync_stop = threading.Event()
+
+
+def _suggestion_sync_loop(interval: float):
+    while not _suggestion_sync_stop.wait(interval):
+        try:
+            suggestions.sync_suggestions()
+        except Exception as exc:  # pragma: no cover - keep the loop alive
+            print("⚠️ No se pudieron sincronizar las sugerencias:", exc)
+
+
+@app.on_event("startup")
+async def _start_suggestion_sync():
+    # Seed the suggestion ring (parses the Sugerencias sheet) on the read pool
+    # and before serving, so no request waits on it holding the store lock.
+    try:
+        await service.run_read(suggestions.get_last_suggestions, 1)
+    except Exception as exc:  # pragma: no cover - the first request retries
+        print("⚠️ No se pudieron cargar las sugerencias:", exc)
+    if config.SUGGESTIONS_SYNC_SECONDS > 0:
+        _suggestion_sync_stop.clear()
+        threading.Thread(
+            target=_suggestion_sync_loop,
+            args=(config.SUGGESTIONS_SYNC_SECONDS,),
+            name="gd-suggestions-sync",
+            daemon=True,
+        ).start()
+
+
+async def _reload_catalogs() -> str:
+    global _catalogs, _catalogs_version, _catalogs_loaded_at
+    version = workbook_version()
+    loaded = await service.run_read(catalogs.load_catalogs)
+    _catalogs, _catalogs_version, _catalogs_loaded_at = loaded, version, time.time()
+    return version
+
+
+async def _watch_workbook(interval: float):
+    # Relay other workers' events (GD_SHARED_STATE) and announce edits made
+    # outside the API (Excel, another process) as workbook.changed.
+    shared = events.BUS.log_path is not None
+    poll = config.SHARED_EVENTS_POLL_SECONDS if shared else interval
+    next_check = 0.0
+    while True:
+        await asyncio.sleep(poll)
+        try:
+            for event in events.BUS.pull_shared():
+                if event["type"] == "catalog.reloaded":
+                    await _reload_catalogs()
+            if interval > 0 and time.monotonic() >= next_check:
+                next_check = time.monotonic() + interval
+                events.BUS.check_external_change()
+        except OSError as exc:  # pragma: no cover - file briefly missing while Excel saves
+            print("⚠️ No se pudo revisar la versión del libro:", exc)
+        except Exception as exc:  # pragma: no cover - keep the watcher alive
+            print("⚠️ No se pudieron recargar los catálogos:", exc)
+
+
+@app.on_event("startup")
+async def _start_workbook_watcher():
+    events.BUS.check_external_change()
+    if config.EVENTS_POLL_SECONDS > 0 or events.BUS.log_path is not None:
+        app.state.workbook_watcher = asyncio.create_task(_watch_workbook(config.EVENTS_POLL_SECONDS))
+
+
+@app.on_event("shutdown")
+def _flush_suggestions():
+    _suggestion_sync_stop.set()
+    watcher = getattr(app.state, "workbook_watcher", None)
+    if watcher is not None:
+        watcher.cancel()
+    try:
+        suggestions.sync_suggestions()
+    except Exception as exc:  # pragma: no cover - best effort on shutdown
+        print("⚠️ No se pudieron sincronizar las sugerencias:", exc)
+    service.shutdown_executors()
+
+
+# Concurrent identical reads (same arguments, same workbook version) share one
+# in-flight computation instead of each parsing the workbook.
+_compute_metrics = coalesced(metrics.compute_metrics_cached)
+_project_names = coalesced(projects.project_names)
+_summarize_project = coalesced(projects.summarize_project)
+_summarize_projects = coalesced(projects.summarize_projects)
+_summarize_equipo = coalesced(projects.summarize_equipo)
+_summarize_all_equipos = coalesced(projects.summarize_all_equipos)
+_collect_board_projects = coalesced(boards.collect_board_projects)
+_get_expert_project_list = coalesced(boards.get_expert_project_list)
+_rank_expert_projects = coalesced(boards.rank_expert_projects)
+_celula_load = coalesced(analytics.celula_load)
+_dependency_matrix = coalesced(analytics.dependency_matrix)
+
+
+async def _conditional(request: Request, version: str, last_modified, compute):
+    """Answer 304 when the client's validators match, else compute and tag the body.
+
+    *version* must be read before computing so the ETag never claims a newer
+    state than the body it labels.
+    """
+    etag = httpcache.make_etag(version, request.url.path, request.url.query)
+    headers = httpcache.cache_headers(etag, last_modified)
+    not_modified = httpcache.is_not_modified(
+        request.headers.get("if-none-match"),
+        request.headers.get("if-modified-since"),
+        etag,
+        last_modified,
+    )
+    telemetry.cache_lookup("http", not_modified)
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    payload = await compute()
+    with telemetry.stage("serialize"), tracing.span("serialize"):
+        return JSONResponse(jsonable_encoder(payload), headers=headers)
+
+
+async def _workbook_read(request: Request, fn, *args, **kwargs):
+    """Run a workbook read on the read pool behind ETag/Last-Modified validators.
+
+    These bodies also depend on the in-memory catalogs, which ``POST
+    /catalogs/reload`` (or another worker's reload) swaps without touching the
+    workbook, so the validators cover both.
+    """
+    mtime = workbook_mtime()
+    return await _conditional(
+        request,
+        f"{workbook_version()}+{_catalogs_version}",
+        max(mtime, _catalogs_loaded_at) if mtime is not None else None,
+        lambda: service.run_read(fn, *args, **kwargs),
+    )
+
+
+@app.exception_handler(service.Overloaded)
+async def _overloaded(request: Request, exc: service.Overloaded):
+    # Queue full: the caller should back off (429). Waited too long: we could
+    # not serve it in time (503). Either way, tell it when to come back.
+    status = 429 if exc.reason == "queue_full" else 503
+    return JSONResponse(
+        {"detail": str(exc), "reason": exc.reason},
+        status_code=status,
+        headers={"Retry-After": str(exc.retry_after)},
+    )
 
 
 def _require_dep_mapping():
@@ -111,7 +311,7 @@ def _require_dep_mapping():
 
 
 @app.get("/", response_class=HTMLResponse)
-def landing_page():
+async def landing_page():
     primary = "#00a9e0"  # Telefónica blue
     navy = "#0b1e3d"
     gradient = "linear-gradient(135deg, #0b1e3d 0%, #032d60 40%, #00a9e0 100%)"
@@ -476,12 +676,69 @@ def landing_page():
     return html
 
 @app.get("/health")
-def health():
+async def health():
     return {"status": "ok", "paths": config.describe_active_paths()}
 
 
+@app.get("/internal/executors", include_in_schema=False)
+async def executor_queues():
+    return service.executor_stats()
+
+
+def _executor_samples():
+    for pool, stats in service.executor_stats().items():
+        for state in ("queued", "running"):
+            yield (pool, state), stats[state]
+
+
+telemetry.REGISTRY.register(
+    telemetry.Gauge("gd_executor_jobs", "Jobs waiting or running per API executor.", ("pool", "state"), _executor_samples)
+)
+
+
+@app.get("/internal/profiles", include_in_schema=False)
+async def list_profiles():
+    return {"enabled": config.PROFILING, "items": profiling.list_reports()}
+
+
+@app.get("/internal/profiles/{profile_id}", include_in_schema=False)
+async def get_profile(profile_id: str):
+    report = profiling.get_report(profile_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail=f"No existe el perfil '{profile_id}'.")
+    return report
+
+
+@app.get("/internal/traces", include_in_schema=False)
+async def list_traces(limit: int = 20):
+    return {
+        "enabled": config.TRACE_PATH is not None,
+        "exported": tracing.exported_traces,
+        "dropped": tracing.dropped_traces,
+        "items": tracing.recent_traces(limit),
+    }
+
+
+@app.get("/internal/telemetry", include_in_schema=False)
+async def telemetry_scrape():
+    """Prometheus text exposition of gd.telemetry (formatted only when scraped)."""
+    return Response(telemetry.render(), media_type=telemetry.CONTENT_TYPE)
+
+
+@app.get("/internal/reconcile", include_in_schema=False)
+async def reconcile_report(limit: int = reconcile.DEFAULT_LIMIT, formulas: bool = False):
+    """Rows whose CN:CQ / PORC_CUMPLIMIENTO drifted from their flags and M/N."""
+    return await service.run_read(reconcile.reconcile, limit=limit, include_formulas=formulas)
+
+
+@app.post("/internal/reconcile", include_in_schema=False)
+async def reconcile_fix(limit: int = reconcile.DEFAULT_LIMIT, formulas: bool = False):
+    """Write the calculated values for every drifting row in a single save."""
+    return await service.run_write(reconcile.reconcile, fix=True, limit=limit, include_formulas=formulas)
+
+
 @app.get("/docs", include_in_schema=False)
-def custom_docs() -> HTMLResponse:
+async def custom_docs() -> HTMLResponse:
     hero_html = """
     <header class="gd-hero">
       <div class="gd-hero__badge">GDv1 heritage</div>
@@ -531,44 +788,158 @@ def custom_docs() -> HTMLResponse:
 
 
 @app.get("/catalogs")
-def get_catalogs():
-    return _catalogs.__dict__
+async def get_catalogs(request: Request):
+    async def compute():
+        return _catalogs.__dict__
+
+    return await _conditional(request, f"catalogs-{_catalogs_version}", _catalogs_loaded_at, compute)
+
+
+@app.post("/catalogs/reload")
+async def reload_catalogs():
+    try:
+        version = await _reload_catalogs()
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"No se pudieron recargar los catálogos: {exc}") from exc
+    events.publish("catalog.reloaded", version=version)
+    return {"status": "ok", "version": version}
+
+
+def _event_filter(types: Optional[str]):
+    """``?types=project,suggestion`` keeps events whose type starts with any prefix."""
+    prefixes = tuple(t.strip() for t in (types or "").split(",") if t.strip())
+    return lambda event: not prefixes or event["type"] in ("hello", "resync") or event["type"].startswith(prefixes)
+
+
+def _hello_event() -> dict:
+    return {"type": "hello", "version": workbook_version(), "catalogs": _catalogs_version}
+
+
+def _sse(event: dict) -> str:
+    head = f"id: {event['id']}\n" if "id" in event else ""
+    return f"{head}event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+@app.get("/events")
+async def event_stream(request: Request, types: Optional[str] = None, last_event_id: Optional[int] = None):
+    """Server-Sent Events feed of workbook changes.
+
+    Reconnecting clients send ``Last-Event-ID`` (or ``?last_event_id=``) and get
+    the events they missed, if still in the history; a ``resync`` event means
+    they fell behind and should refetch everything.
+    """
+    header_id = request.headers.get("last-event-id")
+    if header_id and header_id.isdigit():
+        last_event_id = int(header_id)
+    wanted = _event_filter(types)
+
+    async def stream():
+        sub, backlog = events.BUS.subscribe(last_event_id)
+        try:
+            yield "retry: 3000\n" + _sse(_hello_event())
+            for event in backlog:
+                if wanted(event):
+                    yield _sse(event)
+            while not await request.is_disconnected():
+                event = await sub.get(timeout=config.EVENTS_KEEPALIVE_SECONDS)
+                if event is None:
+                    yield ": keepalive\n\n"
+                elif wanted(event):
+                    yield _sse(event)
+        finally:
+            events.BUS.unsubscribe(sub)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.websocket("/events/ws")
+async def event_socket(websocket: WebSocket, types: Optional[str] = None, last_event_id: Optional[int] = None):
+    """WebSocket variant of ``/events``: one JSON message per event."""
+    await websocket.accept()
+    wanted = _event_filter(types)
+    sub, backlog = events.BUS.subscribe(last_event_id)
+    try:
+        await websocket.send_json(_hello_event())
+        for event in backlog:
+            if wanted(event):
+                await websocket.send_json(event)
+        while True:
+            event = await sub.get(timeout=config.EVENTS_KEEPALIVE_SECONDS)
+            if event is None:
+                await websocket.send_json({"type": "ping"})
+            elif wanted(event):
+                await websocket.send_json(event)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        events.BUS.unsubscribe(sub)
 
 
 @app.post("/projects")
-def create_project(payload: ProjectPayload):
+async def create_project(payload: ProjectPayload):
     dep_mapping = _require_dep_mapping()
     dep_models = payload.dependency_models()
-    row, proj_id = projects.write_project_with_dependencies(payload.to_model(), dep_models, dep_mapping)
+    row, proj_id = await service.run_write(
+        projects.write_project_with_dependencies, payload.to_model(), dep_models, dep_mapping
+    )
     return {"row": row, "id": proj_id}
 
 
 @app.get("/projects")
-def list_projects(q: Optional[str] = None):
-    names = projects.get_all_project_names()
-    if q:
-        qn = q.strip().lower()
-        names = [n for n in names if qn in n.lower()]
-    return {"count": len(names), "items": names}
+async def list_projects(request: Request, q: Optional[str] = None):
+    async def compute():
+        names = await service.run_read(_project_names)
+        if q:
+            qn = q.strip().lower()
+            names = [n for n in names if qn in n.lower()]
+        return {"count": len(names), "items": names}
+
+    return await _conditional(request, workbook_version(), workbook_mtime(), compute)
+
+
+@app.post("/projects/details")
+async def get_project_details(payload: ProjectDetailsPayload):
+    dep_mapping = _require_dep_mapping()
+    return await service.run_read(_summarize_projects, payload.nombres, payload.ids, dep_mapping)
+
+
+@app.post("/batch")
+async def run_batch(payload: BatchPayload):
+    """Several read routes answered from one workbook snapshot (one parse)."""
+    requests = [r.model_dump(exclude_none=True) for r in payload.requests]
+    return await service.run_read(batch.run_batch, requests, _catalogs)
 
 
 @app.get("/projects/{nombre}")
-def get_project(nombre: str):
+async def get_project(request: Request, nombre: str):
     dep_mapping = _require_dep_mapping()
-    return projects.summarize_by_proyecto(nombre, dep_mapping)
+    return await _workbook_read(request, _summarize_project, nombre, dep_mapping)
 
 
 @app.patch("/projects/{row}")
 @app.put("/projects/{row}")
-def update_project(row: int, payload: UpdatePayload):
+async def update_project(row: int, payload: UpdatePayload):
     dep_mapping = _require_dep_mapping()
     dep_models = payload.dependency_models()
-    return projects.update_project_row_and_dependencies(row, payload.avance, payload.estimado, dep_models, dep_mapping)
+    return await service.run_write(
+        projects.update_project_row_and_dependencies,
+        row,
+        payload.avance,
+        payload.estimado,
+        dep_models,
+        dep_mapping,
+    )
 
 
 @app.get("/metrics")
-def get_metrics(scope: str = "all", filter_value: Optional[str] = None):
-    return metrics.compute_metrics(
+async def get_metrics(request: Request, scope: str = "all", filter_value: Optional[str] = None):
+    return await _workbook_read(
+        request,
+        _compute_metrics,
         scope=scope,
         filter_value=filter_value,
         dep_mapping=_catalogs.dependency_mapping,
@@ -577,17 +948,148 @@ def get_metrics(scope: str = "all", filter_value: Optional[str] = None):
 
 
 @app.post("/suggestions")
-def send_suggestion(payload: SuggestionPayload):
-    suggestions.append_suggestion(payload.usuario, payload.texto)
+async def send_suggestion(payload: SuggestionPayload):
+    # Append-only log + ring buffer: no workbook save, so the read pool (not
+    # the writer) takes it, keeping file I/O off the event loop.
+    await service.run_read(suggestions.append_suggestion, payload.usuario, payload.texto)
     return {"status": "ok"}
 
 
+@app.get("/teams")
+async def list_team_summaries(request: Request, include_rows: bool = False, offset: int = 0, limit: int = 50):
+    return await _workbook_read(
+        request,
+        _summarize_all_equipos,
+        _catalogs.celulas_dep,
+        celula_tren_map=_catalogs.celula_tren_map,
+        include_rows=include_rows,
+        rows_offset=max(offset, 0),
+        rows_limit=limit,
+    )
+
+
 @app.get("/teams/{equipo}")
-def get_team_summary(equipo: str):
+async def get_team_summary(request: Request, equipo: str):
+    _require_dep_mapping()
+    return await _workbook_read(request, _summarize_equipo, equipo)
+
+
+@app.get("/analytics/celula-load")
+async def get_celula_load(request: Request, tren: Optional[str] = None, top: int = analytics.DEFAULT_TOP):
     dep_mapping = _require_dep_mapping()
-    return projects.summarize_by_equipo(equipo, dep_mapping)
+    return await _workbook_read(
+        request,
+        _celula_load,
+        dep_mapping,
+        celula_tren_map=_catalogs.celula_tren_map,
+        tren=tren,
+        top=max(top, 0),
+    )
+
+
+@app.get("/analytics/dependency-matrix")
+async def get_dependency_matrix(
+    request: Request,
+    pending_only: bool = False,
+    include_matrix: bool = False,
+    top: int = analytics.DEFAULT_TOP,
+):
+    dep_mapping = _require_dep_mapping()
+    return await _workbook_read(
+        request,
+        _dependency_matrix,
+        dep_mapping,
+        pending_only=pending_only,
+        include_matrix=include_matrix,
+        top=max(top, 0),
+    )
 
 
 @app.get("/suggestions")
-def list_suggestions(limit: int = 5):
-    return suggestions.get_last_suggestions(limit=limit)
+async def list_suggestions(request: Request, limit: int = 5):
+    store = suggestions.get_suggestion_store()
+    if not 0 < limit <= store.ring_size:
+        return await service.run_read(suggestions.get_last_suggestions, limit=limit)
+
+    async def compute():
+        return await service.run_read(suggestions.get_last_suggestions, limit=limit)
+
+    version = await service.run_read(store.version)
+    return await _conditional(request, f"sugerencias-{version}", store.last_modified, compute)
+
+
+@app.post("/suggestions/sync")
+async def sync_suggestions():
+    return {"status": "ok", "synced": await service.run_write(suggestions.sync_suggestions)}
+
+
+@app.get("/boards/projects")
+async def get_board_projects(
+    request: Request,
+    tren: Optional[str] = None,
+    q: Optional[str] = None,
+    solo_priorizados: bool = False,
+):
+    dep_mapping = _require_dep_mapping()
+    return await _workbook_read(
+        request,
+        _collect_board_projects,
+        tren_filter=tren,
+        dep_mapping=dep_mapping,
+        celula_tren_map=_catalogs.celula_tren_map,
+        q_filter=q,
+        solo_priorizados=solo_priorizados,
+    )
+
+
+@app.get("/boards/expertos")
+async def get_expert_board(request: Request, tren: Optional[str] = None):
+    dep_mapping = _require_dep_mapping()
+    return await _workbook_read(
+        request,
+        _get_expert_project_list,
+        tren_filter=tren,
+        dep_mapping=dep_mapping,
+        celula_tren_map=_catalogs.celula_tren_map,
+    )
+
+
+@app.get("/boards/ranking")
+async def get_expert_ranking(
+    request: Request,
+    tren: Optional[str] = None,
+    top: int = ranking.DEFAULT_TOP,
+    pesos: Optional[str] = None,
+):
+    dep_mapping = _require_dep_mapping()
+    try:
+        weights = ranking.ScoreWeights.parse(pesos, ranking.DEFAULT_WEIGHTS)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from None
+    return await _workbook_read(
+        request,
+        _rank_expert_projects,
+        tren_filter=tren,
+        top=max(top, 0),
+        weights=weights,
+        dep_mapping=dep_mapping,
+        celula_tren_map=_catalogs.celula_tren_map,
+    )
+
+
+@app.put("/boards/expertos/{row}")
+async def update_expert_decision(row: int, payload: ExpertDecisionPayload):
+    try:
+        return await service.run_write(
+            boards.update_expert_fields, row, payload.priorizado, payload.contribucion, payload.iniciativa
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+@app.put("/boards/po-sync/{row}")
+async def update_po_sync_rating(row: int, payload: RatingPayload):
+    try:
+        return await service.run_write(boards.update_alistamiento_rating, row, payload.rating)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
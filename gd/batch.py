@@ -0,0 +1,220 @@
+"""``POST /batch``: several read routes answered from one snapshot.
+
+A page render usually needs metrics, the project list, one project's detail
+and the team overview. Sent as one batch they cost one request and at most one
+parse of the workbook: every sub-request is answered from the same
+``ProjectSnapshot``, so the results are also mutually consistent (no write can
+land between them).
+
+Each sub-request is ``{"id": ..., "path": "/metrics?scope=all", "params": {...}}``
+using the paths and query parameters of the GET routes; ``params`` is merged
+over the query string. Results come back in request order as
+``{"id", "status", "body"}`` — a failing item gets its own 4xx/5xx status and
+does not fail the batch.
+"""
+from __future__ import annotations
+
+import re
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from . import analytics, boards, config, metrics, projects, ranking, suggestions
+from .config import EXCEL_PATH
+from .snapshot import get_snapshot
+from .tracing import span
+
+MAX_REQUESTS = 32
+
+
+class BatchItemError(Exception):
+    def __init__(self, status: int, detail: str):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+def _bool(params: dict, name: str) -> bool:
+    value = params.get(name)
+    if value is None or isinstance(value, bool):
+        return bool(value)
+    return str(value).strip().lower() in ("1", "true", "yes", "on", "si")
+
+
+def _int(params: dict, name: str, default: int) -> int:
+    value = params.get(name)
+    if value in (None, ""):
+        return default
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise BatchItemError(422, f"El parámetro '{name}' debe ser un entero.") from None
+
+
+def _dep_mapping(catalogs) -> dict:
+    if not catalogs.dependency_mapping:
+        raise BatchItemError(500, "No dependency mapping loaded from 'Datos'.")
+    return catalogs.dependency_mapping
+
+
+# ---------------------------------------------------------------------------
+# Route handlers: (snap, catalogs, params, **path_args) -> body
+# ---------------------------------------------------------------------------
+
+def _health(snap, catalogs, params):
+    return {"status": "ok", "paths": config.describe_active_paths()}
+
+
+def _catalogs(snap, catalogs, params):
+    return dict(vars(catalogs))
+
+
+def _suggestions(snap, catalogs, params):
+    return suggestions.get_last_suggestions(limit=_int(params, "limit", 5))
+
+
+def _metrics(snap, catalogs, params):
+    return metrics.compute_metrics_from_snapshot(
+        snap,
+        scope=params.get("scope") or "all",
+        filter_value=params.get("filter_value"),
+        dep_mapping=catalogs.dependency_mapping,
+        celula_tren_map=catalogs.celula_tren_map,
+    )
+
+
+def _project_list(snap, catalogs, params):
+    names = projects.project_names_from_snapshot(snap)
+    q = params.get("q")
+    if q:
+        qn = q.strip().lower()
+        names = [n for n in names if qn in n.lower()]
+    return {"count": len(names), "items": names}
+
+
+def _project(snap, catalogs, params, nombre):
+    return projects.summarize_project(nombre, _dep_mapping(catalogs), snap=snap)
+
+
+def _teams(snap, catalogs, params):
+    return projects.summarize_all_equipos(
+        catalogs.celulas_dep,
+        celula_tren_map=catalogs.celula_tren_map,
+        include_rows=_bool(params, "include_rows"),
+        rows_offset=max(_int(params, "offset", 0), 0),
+        rows_limit=_int(params, "limit", 50),
+        snap=snap,
+    )
+
+
+def _team(snap, catalogs, params, equipo):
+    _dep_mapping(catalogs)
+    return projects.summarize_equipo(equipo, snap=snap)
+
+
+def _board_projects(snap, catalogs, params):
+    return boards.collect_board_projects(
+        tren_filter=params.get("tren"),
+        dep_mapping=_dep_mapping(catalogs),
+        celula_tren_map=catalogs.celula_tren_map,
+        q_filter=params.get("q"),
+        solo_priorizados=_bool(params, "solo_priorizados"),
+        snap=snap,
+    )
+
+
+def _expert_board(snap, catalogs, params):
+    return boards.get_expert_project_list(
+        tren_filter=params.get("tren"),
+        dep_mapping=_dep_mapping(catalogs),
+        celula_tren_map=catalogs.celula_tren_map,
+        snap=snap,
+    )
+
+
+def _expert_ranking(snap, catalogs, params):
+    try:
+        weights = ranking.ScoreWeights.parse(params.get("pesos"), ranking.DEFAULT_WEIGHTS)
+    except ValueError as exc:
+        raise BatchItemError(422, str(exc)) from None
+    return boards.rank_expert_projects(
+        tren_filter=params.get("tren"),
+        top=max(_int(params, "top", ranking.DEFAULT_TOP), 0),
+        weights=weights,
+        dep_mapping=_dep_mapping(catalogs),
+        celula_tren_map=catalogs.celula_tren_map,
+        snap=snap,
+    )
+
+
+def _celula_load(snap, catalogs, params):
+    return analytics.celula_load(
+        _dep_mapping(catalogs),
+        celula_tren_map=catalogs.celula_tren_map,
+        tren=params.get("tren"),
+        top=max(_int(params, "top", analytics.DEFAULT_TOP), 0),
+        snap=snap,
+    )
+
+
+def _dependency_matrix(snap, catalogs, params):
+    return analytics.dependency_matrix(
+        _dep_mapping(catalogs),
+        pending_only=_bool(params, "pending_only"),
+        include_matrix=_bool(params, "include_matrix"),
+        top=max(_int(params, "top", analytics.DEFAULT_TOP), 0),
+        snap=snap,
+    )
+
+
+ROUTES: List[Tuple["re.Pattern[str]", Callable]] = [
+    (re.compile(r"^/health$"), _health),
+    (re.compile(r"^/catalogs$"), _catalogs),
+    (re.compile(r"^/suggestions$"), _suggestions),
+    (re.compile(r"^/metrics$"), _metrics),
+    (re.compile(r"^/projects$"), _project_list),
+    (re.compile(r"^/projects/(?P<nombre>[^/]+)$"), _project),
+    (re.compile(r"^/teams$"), _teams),
+    (re.compile(r"^/teams/(?P<equipo>[^/]+)$"), _team),
+    (re.compile(r"^/boards/projects$"), _board_projects),
+    (re.compile(r"^/boards/expertos$"), _expert_board),
+    (re.compile(r"^/boards/ranking$"), _expert_ranking),
+    (re.compile(r"^/analytics/celula-load$"), _celula_load),
+    (re.compile(r"^/analytics/dependency-matrix$"), _dependency_matrix),
+]
+
+
+def _resolve(path: str) -> Tuple[Callable, Dict[str, str]]:
+    for pattern, handler in ROUTES:
+        match = pattern.match(path)
+        if match:
+            return handler, {k: unquote(v) for k, v in match.groupdict().items()}
+    raise BatchItemError(404, f"Ruta no soportada en /batch: '{path}'.")
+
+
+def run_one(snap, catalogs, path: str, params: Optional[dict] = None) -> Tuple[int, object]:
+    """Answer one sub-request against *snap*; returns ``(status, body)``."""
+    parts = urlsplit(path)
+    merged = dict(parse_qsl(parts.query))
+    merged.update({k: v for k, v in (params or {}).items() if v is not None})
+    with span("batch_item", path=parts.path) as item_span:
+        try:
+            handler, path_args = _resolve(parts.path.rstrip("/") or "/")
+            body = handler(snap, catalogs, merged, **path_args)
+        except BatchItemError as exc:
+            status, body = exc.status, {"detail": exc.detail}
+        except ValueError as exc:
+            status, body = 400, {"detail": str(exc)}
+        else:
+            status = 200
+        item_span.set("status", status)
+    return status, body
+
+
+def run_batch(requests: Sequence[dict], catalogs, path=EXCEL_PATH) -> dict:
+    """Answer every sub-request in *requests* from a single workbook snapshot."""
+    snap = get_snapshot(path)
+    results = []
+    for idx, request in enumerate(requests):
+        status, body = run_one(snap, catalogs, request["path"], request.get("params"))
+        results.append({"id": request.get("id", idx), "status": status, "body": body})
+    return {"version": snap.version, "count": len(results), "results": results}
@@ -0,0 +1,574 @@
+"""Latency benchmarks for the gd functions and API routes.
+
+Each workbook size is generated with ``gd.synthetic`` (cached in the work
+directory) and benchmarked in a fresh child process with ``GD_EXCEL_PATH``
+pointing at a private copy, because the package binds the workbook path at
+import time and the write benchmarks modify the file. Routes are driven
+through an in-process ASGI client, so no server or HTTP stack is involved.
+
+Results (p50/p95/p99, mean, throughput per benchmark and size) are written as
+JSON; ``--baseline`` compares them with an earlier results file and exits
+with status 1 when a benchmark got slower than ``--threshold``.
+
+``--memory`` measures footprint instead of latency: peak and retained Python
+allocations (tracemalloc) and peak RSS sampled while each operation runs. The
+child then runs with ``GD_CPU_WORKERS=0`` so /metrics is measured in-process.
+``--budgets`` (JSON, ``{"name" or "name@size": {"peak_mb": ..., "rss_mb": ...}}``,
+``"*"`` for every benchmark) or ``--max-peak-mb`` fail the run when exceeded.
+
+Usage::
+
+    python -m gd.bench --sizes 1000,10000 --output bench.json
+    python -m gd.bench --sizes 1000,10000 --baseline bench.json --threshold 0.2
+    python -m gd.bench --memory --sizes 10000,50000 --budgets budgets.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import math
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import quote, unquote
+
+DEFAULT_SIZES = (1_000, 10_000)
+DEFAULT_REPEAT = 10
+DEFAULT_WRITE_REPEAT = 5
+DEFAULT_WARMUP = 2
+DEFAULT_MEMORY_REPEAT = 3
+DEFAULT_THRESHOLD = 0.2
+# Differences below this (ms or MB) are noise, whatever the ratio.
+MIN_DELTA = 1.0
+RSS_SAMPLE_SECONDS = 0.005
+MB = 1024 * 1024
+
+try:  # optional: more portable RSS readings
+    import psutil
+except ImportError:  # pragma: no cover - /proc fallback below
+    psutil = None
+
+
+# ---------------------------------------------------------------------------
+# Statistics
+# ---------------------------------------------------------------------------
+
+def percentile(sorted_samples: Sequence[float], q: float) -> float:
+    """Linear-interpolated percentile (``q`` in 0..1) of already sorted samples."""
+    if not sorted_samples:
+        return 0.0
+    k = (len(sorted_samples) - 1) * q
+    lo = math.floor(k)
+    hi = min(lo + 1, len(sorted_samples) - 1)
+    return sorted_samples[lo] + (sorted_samples[hi] - sorted_samples[lo]) * (k - lo)
+
+
+def summarize(samples: Sequence[float]) -> dict:
+    """Latency summary in milliseconds plus sequential throughput."""
+    ordered = sorted(samples)
+    total = sum(ordered)
+    return {
+        "n": len(ordered),
+        "min_ms": round(ordered[0] * 1000, 3) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+        "mean_ms": round(total / len(ordered) * 1000, 3) if ordered else 0.0,
+        "ops_per_sec": round(len(ordered) / total, 2) if total > 0 else 0.0,
+    }
+
+
+def measure(fn: Callable[[int], object], repeat: int, warmup: int = 0) -> List[float]:
+    """Call ``fn(i)`` *warmup* + *repeat* times; returns the timed durations."""
+    for i in range(warmup):
+        fn(i)
+    samples = []
+    for i in range(warmup, warmup + repeat):
+        start = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+# ---------------------------------------------------------------------------
+# Memory
+# ---------------------------------------------------------------------------
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def rss_bytes() -> Optional[int]:
+    """Current resident set size of this process, or None when unavailable."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm", "rb") as fh:
+            return int(fh.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class RssSampler:
+    """Background thread recording the highest RSS seen while active."""
+
+    def __init__(self, interval: float = RSS_SAMPLE_SECONDS):
+        self.interval = interval
+        self.peak = rss_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="gd-bench-rss", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            value = rss_bytes()
+            if value is not None and (self.peak is None or value > self.peak):
+                self.peak = value
+
+    def __enter__(self):
+        if self.peak is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        value = rss_bytes()
+        if value is not None and (self.peak is None or value > self.peak):
+            self.peak = value
+        return False
+
+
+def measure_memory(fn: Callable[[int], object], repeat: int, warmup: int = 0) -> dict:
+    """Peak/retained traced allocations and peak RSS over *repeat* calls.
+
+    ``peak_mb`` is the highest traced allocation above the starting point
+    during any call; ``retained_mb`` is what is still allocated after the last
+    call and a full collection (caches, leaks).
+    """
+    for i in range(warmup):
+        fn(i)
+    gc.collect()
+    rss_before = rss_bytes()
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        peak = 0
+        with RssSampler() as sampler:
+            for i in range(warmup, warmup + repeat):
+                tracemalloc.reset_peak()
+                start, _ = tracemalloc.get_traced_memory()
+                fn(i)
+                _, call_peak = tracemalloc.get_traced_memory()
+                peak = max(peak, call_peak - start)
+        gc.collect()
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    result = {
+        "n": repeat,
+        "peak_mb": round(peak / MB, 3),
+        "retained_mb": round(max(retained - base, 0) / MB, 3),
+        "rss_before_mb": None,
+        "rss_mb": None,
+    }
+    if rss_before is not None and sampler.peak is not None:
+        result["rss_before_mb"] = round(rss_before / MB, 3)
+        result["rss_mb"] = round(sampler.peak / MB, 3)
+    return result
+
+
+def check_budgets(document: dict, budgets: dict) -> List[dict]:
+    """Results exceeding *budgets*; ``name@size`` beats ``name`` beats ``*``."""
+    violations = []
+    for r in document["results"]:
+        limits = {}
+        for key in ("*", r["name"], f"{r['name']}@{r['size']}"):
+            limits.update(budgets.get(key, {}))
+        for metric, limit in limits.items():
+            value = r.get(metric)
+            if value is not None and value > limit:
+                violations.append({"size": r["size"], "name": r["name"], "metric": metric, "value": value, "limit": limit})
+    return violations
+
+
+# ---------------------------------------------------------------------------
+# In-process ASGI client
+# ---------------------------------------------------------------------------
+
+class AsgiClient:
+    """Minimal HTTP/1.1 ASGI driver: no sockets, no extra dependencies."""
+
+    def __init__(self, app, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.app = app
+        self.loop = loop or asyncio.new_event_loop()
+
+    async def arequest(self, method: str, path: str, json_body=None, headers: Iterable[Tuple[str, str]] = ()):
+        raw_path, _, query = path.partition("?")
+        body = b"" if json_body is None else json.dumps(json_body).encode("utf-8")
+        header_list = [(b"host", b"bench"), *((k.lower().encode(), v.encode()) for k, v in headers)]
+        if json_body is not None:
+            header_list.append((b"content-type", b"application/json"))
+            header_list.append((b"content-length", str(len(body)).encode()))
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method.upper(),
+            "scheme": "http",
+            "path": unquote(raw_path),
+            "raw_path": raw_path.encode("utf-8"),
+            "query_string": query.encode("utf-8"),
+            "headers": header_list,
+            "client": ("127.0.0.1", 0),
+            "server": ("bench", 80),
+        }
+        sent = False
+        status = 0
+        chunks: List[bytes] = []
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await asyncio.sleep(3600)
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, send)
+        return status, b"".join(chunks)
+
+    def request(self, method: str, path: str, json_body=None, headers: Iterable[Tuple[str, str]] = ()):
+        return self.loop.run_until_complete(self.arequest(method, path, json_body, headers))
+
+    def close(self) -> None:
+        self.loop.close()
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks (child process: GD_EXCEL_PATH already points at the workbook)
+# ---------------------------------------------------------------------------
+
+def _benchmarks(repeat: int, write_repeat: int):
+    """Yield ``(name, kind, fn, repeat)``; reads first, then writes."""
+    from . import api, boards, catalogs, metrics, projects, suggestions
+    from .config import START_ROW_PROYECTOS
+    from .models import Dependency, Project
+    from .snapshot import build_snapshot
+
+    cat = catalogs.load_catalogs()
+    dep_mapping = cat.dependency_mapping
+    tren_map = cat.celula_tren_map
+    tren = cat.area_tren_coe[0] if cat.area_tren_coe else None
+    celula = cat.celulas_dep[0] if cat.celulas_dep else None
+    names = projects.get_all_project_names()
+    nombre = names[len(names) // 2] if names else ""
+    detail = projects.summarize_by_proyecto(nombre, dep_mapping) if nombre else {"found": False}
+    row = detail.get("fila") or START_ROW_PROYECTOS
+    deps = [Dependency(d["equipo"], d["FLAG"], d["descripcion"]) for d in detail.get("detalles", [])]
+    dep_payload = [{"equipo": d.equipo, "codigo": d.codigo, "descripcion": d.descripcion} for d in deps]
+    client = AsgiClient(api.app)
+
+    def get(path):
+        def call(_i):
+            status, body = client.request("GET", path)
+            if status != 200:
+                raise RuntimeError(f"GET {path} -> {status}: {body[:200]!r}")
+        return call
+
+    def send(method, path_fn, payload_fn):
+        def call(i):
+            path = path_fn(i)
+            status, body = client.request(method, path, payload_fn(i))
+            if status != 200:
+                raise RuntimeError(f"{method} {path} -> {status}: {body[:200]!r}")
+        return call
+
+    scopes = [("all", None), ("area", tren), ("celula", celula)]
+
+    # Functions: reads
+    yield "load_catalogs", "function", lambda _i: catalogs.load_catalogs(), repeat
+    for scope, value in scopes:
+        yield (
+            f"compute_metrics[{scope}]",
+            "function",
+            lambda _i, s=scope, v=value: metrics.compute_metrics(s, v, dep_mapping, tren_map),
+            repeat,
+        )
+    yield "get_all_project_names", "function", lambda _i: projects.get_all_project_names(), repeat
+    yield "summarize_by_equipo", "function", lambda _i: projects.summarize_by_equipo(celula, dep_mapping), repeat
+    yield "summarize_by_proyecto", "function", lambda _i: projects.summarize_by_proyecto(nombre, dep_mapping), repeat
+    yield "summarize_all_equipos", "function", lambda _i: projects.summarize_all_equipos(cat.celulas_dep, tren_map), repeat
+    yield "summarize_projects", "function", lambda _i: projects.summarize_projects(names[:50], dep_mapping=dep_mapping), repeat
+    yield (
+        "collect_board_projects",
+        "function",
+        lambda _i: boards.collect_board_projects(dep_mapping=dep_mapping, celula_tren_map=tren_map),
+        repeat,
+    )
+    yield "build_snapshot", "function", lambda _i: build_snapshot(), repeat
+
+    # Routes: reads
+    yield "GET /health", "route", get("/health"), repeat
+    yield "GET /catalogs", "route", get("/catalogs"), repeat
+    for scope, value in scopes:
+        query = f"?scope={scope}" + (f"&filter_value={quote(value)}" if value else "")
+        yield f"GET /metrics[{scope}]", "route", get(f"/metrics{query}"), repeat
+    yield "GET /projects", "route", get("/projects"), repeat
+    yield "GET /projects/{nombre}", "route", get(f"/projects/{quote(nombre)}"), repeat
+    yield "GET /teams", "route", get("/teams"), repeat
+    yield "GET /teams/{equipo}", "route", get(f"/teams/{quote(celula or '')}"), repeat
+    yield "GET /boards/projects", "route", get("/boards/projects"), repeat
+    yield "GET /boards/expertos", "route", get("/boards/expertos"), repeat
+    yield "GET /suggestions", "route", get("/suggestions"), repeat
+    batch_body = {
+        "requests": [
+            {"path": "/metrics"},
+            {"path": "/projects"},
+            {"path": f"/projects/{nombre}"},
+            {"path": "/teams"},
+            {"path": "/suggestions"},
+        ]
+    }
+    yield "POST /batch", "route", send("POST", lambda _i: "/batch", lambda _i: batch_body), repeat
+
+    # Writes (each one saves the workbook)
+    yield (
+        "append_suggestion",
+        "function",
+        lambda i: suggestions.append_suggestion("bench", f"sugerencia {i}"),
+        repeat,
+    )
+    yield (
+        "update_project_row_and_dependencies",
+        "function",
+        lambda i: projects.update_project_row_and_dependencies(row, 0.1 + (i % 2) * 0.1, 0.5, deps, dep_mapping),
+        write_repeat,
+    )
+    yield (
+        "write_project_with_dependencies",
+        "function",
+        lambda i: projects.write_project_with_dependencies(
+            Project(nombre=f"BENCH {i}", estado="Nuevo", avance=0.1, estimado_avance=0.5), deps, dep_mapping
+        ),
+        write_repeat,
+    )
+    yield (
+        "POST /suggestions",
+        "route",
+        send("POST", lambda _i: "/suggestions", lambda i: {"usuario": "bench", "texto": f"ruta {i}"}),
+        repeat,
+    )
+    yield (
+        "PUT /projects/{row}",
+        "route",
+        send(
+            "PUT",
+            lambda _i: f"/projects/{row}",
+            lambda i: {"avance": 0.2 + (i % 2) * 0.1, "estimado": 0.5, "dependencias": dep_payload},
+        ),
+        write_repeat,
+    )
+    yield (
+        "POST /projects",
+        "route",
+        send(
+            "POST",
+            lambda _i: "/projects",
+            lambda i: {"nombre": f"BENCH RUTA {i}", "estado": "Nuevo", "dependencias": dep_payload},
+        ),
+        write_repeat,
+    )
+
+
+def run_suite(
+    repeat: int, write_repeat: int, warmup: int, only: Optional[str] = None, memory: bool = False
+) -> List[dict]:
+    """Run every benchmark against the workbook this process was started with."""
+    from . import service
+
+    results = []
+    try:
+        for name, kind, fn, n in _benchmarks(repeat, write_repeat):
+            if only and only not in name:
+                continue
+            if memory:
+                results.append({"name": name, "kind": kind, **measure_memory(fn, min(n, repeat), warmup)})
+                print(f"  {name:<40} peak {results[-1]['peak_mb']:>9.1f} MB  rss {results[-1]['rss_mb']} MB", file=sys.stderr)
+                continue
+            samples = measure(fn, n, warmup)
+            results.append({"name": name, "kind": kind, **summarize(samples)})
+            print(f"  {name:<40} p50 {results[-1]['p50_ms']:>10.2f} ms", file=sys.stderr)
+    finally:
+        service.shutdown_executors()
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Orchestration (parent process)
+# ---------------------------------------------------------------------------
+
+def fixture_path(workdir: Path, rows: int, seed: int) -> Path:
+    """Generated workbook for *rows*/*seed*, created once and reused."""
+    from .synthetic import SyntheticSpec, generate_workbook
+
+    path = workdir / f"gd_bench_{rows}_s{seed}.xlsx"
+    if not path.exists():
+        tmp = path.with_suffix(".tmp.xlsx")
+        generate_workbook(tmp, SyntheticSpec(rows=rows, seed=seed))
+        os.replace(tmp, path)
+    return path
+
+
+def _run_child(workbook: Path, workdir: Path, args) -> List[dict]:
+    """Benchmark a private copy of *workbook* in a fresh interpreter."""
+    run_dir = Path(tempfile.mkdtemp(prefix="run-", dir=workdir))
+    try:
+        copy = run_dir / workbook.name
+        shutil.copy2(workbook, copy)
+        out = run_dir / "results.json"
+        env = dict(
+            os.environ,
+            GD_EXCEL_PATH=str(copy),
+            GD_SUGGESTIONS_PATH=str(run_dir / "sugerencias.jsonl"),
+            GD_SUGGESTIONS_SYNC_SECONDS="0",
+            GD_EVENTS_POLL_SECONDS="0",
+        )
+        if args.memory:
+            env["GD_CPU_WORKERS"] = "0"
+        cmd = [
+            sys.executable, "-m", "gd.bench", "--child", str(out),
+            "--repeat", str(args.repeat),
+            "--write-repeat", str(args.write_repeat),
+            "--warmup", str(args.warmup),
+        ]
+        if args.only:
+            cmd += ["--only", args.only]
+        if args.memory:
+            cmd.append("--memory")
+        subprocess.run(cmd, env=env, check=True)
+        return json.loads(out.read_text())
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+
+def compare(current: dict, baseline: dict, threshold: float, metric: str = "p50_ms") -> List[dict]:
+    """Benchmarks whose *metric* grew more than *threshold* (and ``MIN_DELTA``)."""
+    previous = {(r["size"], r["name"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for r in current["results"]:
+        old = previous.get((r["size"], r["name"]))
+        if old is None or not old.get(metric):
+            continue
+        delta = r[metric] - old[metric]
+        ratio = r[metric] / old[metric]
+        if ratio > 1 + threshold and delta > MIN_DELTA:
+            regressions.append(
+                {"size": r["size"], "name": r["name"], "baseline": old[metric], "current": r[metric], "ratio": round(ratio, 3)}
+            )
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m gd.bench", description="Benchmarks de funciones y rutas de gd.")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES), help="filas por workbook, separadas por comas")
+    parser.add_argument("--workbook", type=Path, action="append", default=[], help="workbook existente a medir (además de --sizes)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--memory", action="store_true", help="medir memoria (tracemalloc + RSS) en vez de latencia")
+    parser.add_argument("--repeat", type=int, help=f"repeticiones (por defecto {DEFAULT_REPEAT}; {DEFAULT_MEMORY_REPEAT} con --memory)")
+    parser.add_argument("--write-repeat", type=int, default=DEFAULT_WRITE_REPEAT)
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP)
+    parser.add_argument("--only", help="solo benchmarks cuyo nombre contenga este texto")
+    parser.add_argument("--workdir", type=Path, default=Path(tempfile.gettempdir()) / "gd-bench")
+    parser.add_argument("--output", type=Path, help="archivo JSON de resultados")
+    parser.add_argument("--baseline", type=Path, help="resultados previos con los que comparar")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="regresión tolerada (0.2 = 20%%)")
+    parser.add_argument(
+        "--metric", choices=["p50_ms", "p95_ms", "p99_ms", "mean_ms", "peak_mb", "retained_mb", "rss_mb"],
+        help="métrica comparada con --baseline (p50_ms, o peak_mb con --memory)",
+    )
+    parser.add_argument("--budgets", type=Path, help="JSON con límites por benchmark (peak_mb, retained_mb, rss_mb, p95_ms…)")
+    parser.add_argument("--max-peak-mb", type=float, help="límite de peak_mb para todos los benchmarks")
+    parser.add_argument("--child", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.repeat is None:
+        args.repeat = DEFAULT_MEMORY_REPEAT if args.memory else DEFAULT_REPEAT
+    if args.metric is None:
+        args.metric = "peak_mb" if args.memory else "p50_ms"
+
+    if args.child:
+        results = run_suite(args.repeat, args.write_repeat, args.warmup, args.only, args.memory)
+        args.child.write_text(json.dumps(results))
+        return 0
+
+    args.workdir.mkdir(parents=True, exist_ok=True)
+    targets: List[Tuple[object, Path]] = []
+    for size in filter(None, (s.strip() for s in args.sizes.split(","))):
+        print(f"Preparando workbook de {size} filas…", file=sys.stderr)
+        targets.append((int(size), fixture_path(args.workdir, int(size), args.seed)))
+    targets += [(str(path), path) for path in args.workbook]
+
+    document: Dict[str, object] = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "mode": "memory" if args.memory else "latency",
+        "config": {"repeat": args.repeat, "write_repeat": args.write_repeat, "warmup": args.warmup, "seed": args.seed},
+        "results": [],
+    }
+    for size, path in targets:
+        print(f"Midiendo {path.name}…", file=sys.stderr)
+        for result in _run_child(path, args.workdir, args):
+            document["results"].append({"size": size, **result})
+
+    text = json.dumps(document, ensure_ascii=False, indent=2)
+    if args.output:
+        args.output.write_text(text)
+    else:
+        print(text)
+
+    status = 0
+    if args.baseline:
+        unit = args.metric.rsplit("_", 1)[-1]
+        regressions = compare(document, json.loads(args.baseline.read_text()), args.threshold, args.metric)
+        for r in regressions:
+            print(
+                f"REGRESIÓN {r['name']} ({r['size']}): {r['baseline']:.2f} -> {r['current']:.2f} {unit} (x{r['ratio']})",
+                file=sys.stderr,
+            )
+        if regressions:
+            status = 1
+        else:
+            print(f"Sin regresiones frente a {args.baseline} (umbral {args.threshold:.0%}).", file=sys.stderr)
+
+    budgets = json.loads(args.budgets.read_text()) if args.budgets else {}
+    if args.max_peak_mb is not None:
+        budgets.setdefault("*", {})["peak_mb"] = args.max_peak_mb
+    if budgets:
+        violations = check_budgets(document, budgets)
+        for v in violations:
+            print(f"PRESUPUESTO EXCEDIDO {v['name']} ({v['size']}): {v['metric']} = {v['value']} > {v['limit']}", file=sys.stderr)
+        if violations:
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
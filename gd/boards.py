@@ -0,0 +1,306 @@
+"""Mesa de Expertos / Mesa PO Sync boards ported from the notebook.
+
+Both boards are assembled from a single pass over the cached ProyectosTI
+snapshot and memoised per workbook version, so reloading a board during a
+session costs a dictionary lookup until somebody writes to the workbook.
+
+The expert board also feeds the top-k ranking (``gd.ranking``); the board
+writers patch it in place so it survives their saves.
+"""
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional
+
+from .config import EXCEL_PATH
+from .dependencies import dep_semaforo, dep_semaforo_state
+from .excel import workbook_key, workbook_lock, workbook_version
+from .projects import update_row_cells
+from .ranking import DEFAULT_TOP, DEFAULT_WEIGHTS, RANKING, Candidate, ScoreWeights, top_k
+from .snapshot import get_snapshot
+from .telemetry import cache_lookup, rows_scanned, timed
+
+# Estados que entran en las mesas (``_collect_board_projects``).
+BOARD_STATES = ("nuevo", "en curso")
+
+
+@dataclass
+class _BoardRow:
+    row: int
+    board: Optional[dict]   # _collect_board_projects payload (estado Nuevo / En curso)
+    expert: Optional[dict]  # get_expert_project_list payload ("nuevo"/"curso" + nombre)
+    celulas: FrozenSet[str]  # células with a P/L flag, for the tren filter
+    area: object            # Area/Tren/CoE column value, if the sheet has one
+
+
+def semaforo(total_dep: float, total_L: float, total_P: float) -> dict:
+    color, texto = dep_semaforo(total_dep, total_L, total_P)
+    return {"estado": dep_semaforo_state(total_dep, total_L, total_P), "color": color, "texto": texto}
+
+
+def _clamp_rating(value) -> int:
+    return max(0, min(5, int(value)))
+
+
+@timed("compute")
+def build_board(snap, dep_mapping: dict, celula_tren_map: dict) -> List[_BoardRow]:
+    """One pass over the snapshot producing both board views for every row."""
+    pri_pos, rating_pos = snap.col("PRIORIZADO"), snap.col("RATING_PO_SYNC")
+    area_pos = snap.area_tren_coe_col - 1 if snap.area_tren_coe_col else None
+
+    dep_flags = [(e, snap.flag_col(e)) for e in dep_mapping]
+    dep_flags = [(e, pos) for e, pos in dep_flags if pos is not None]
+    tren_flags = [(c, snap.flag_col(c)) for c in celula_tren_map]
+    tren_flags = [(c, pos) for c, pos in tren_flags if pos is not None]
+
+    rows: List[_BoardRow] = []
+    for rec in snap.records():
+        row, values = rec.row, rec.values
+        estado_val = rec.estado
+        if not estado_val:
+            continue
+        estado_str = str(estado_val).strip().lower()
+        in_board = estado_str in BOARD_STATES
+        in_expert = ("nuevo" in estado_str) or ("curso" in estado_str)
+        if not (in_board or in_expert):
+            continue
+
+        pendientes = []
+        negociadas = []
+        for equipo, pos in dep_flags:
+            flag_val = values[pos]
+            if not flag_val:
+                continue
+            flag_up = str(flag_val).strip().upper()
+            if flag_up == "P":
+                pendientes.append(equipo)
+            elif flag_up == "L":
+                negociadas.append(equipo)
+
+        celulas = frozenset(
+            c for c, pos in tren_flags
+            if values[pos] and str(values[pos]).strip().upper() in ("P", "L")
+        )
+
+        total_dep, total_L, total_P = rec.total_dep, rec.total_L, rec.total_P
+        sem = semaforo(total_dep, total_L, total_P)
+        nom_val = rec.nombre
+        desc_val = rec.descripcion
+        pri_val = values[pri_pos]
+
+        board = None
+        if in_board:
+            desc_short = ""
+            if desc_val:
+                s = str(desc_val).strip()
+                desc_short = s if len(s) <= 80 else s[:77] + "..."
+            board = {
+                "row": row,
+                "id": rec.id,
+                "q_rad": rec.q_radicado,
+                "estado": estado_val,
+                "priorizado": rec.priorizado,
+                "nombre": nom_val,
+                "descripcion_corta": desc_short,
+                "contribucion": rec.contribucion,
+                "inic_estrategica": rec.iniciativa or "",
+                "total_dep": total_dep,
+                "total_L": total_L,
+                "total_P": total_P,
+                "cub": rec.cubrimiento,
+                "rating_po": rec.rating_po,
+                "pendientes_list": pendientes,
+                "negociadas_list": negociadas,
+                "semaforo": sem,
+            }
+
+        expert = None
+        if in_expert and nom_val:
+            rating_raw = values[rating_pos]
+            rating_po = _clamp_rating(rec.rating_po) if rating_raw not in (None, "") else 0
+            expert = {
+                "row": row,
+                "nombre": str(nom_val),
+                "descripcion": str(desc_val or ""),
+                "estado": str(estado_val),
+                "priorizado": str(pri_val or "NO"),
+                "total_dep": total_dep,
+                "total_L": total_L,
+                "total_P": total_P,
+                "cobertura_pct": (total_P / total_dep) * 100.0 if total_dep > 0 else 0.0,
+                "contribucion": rec.contribucion,
+                "iniciativa": str(rec.iniciativa or ""),
+                "pending_equips": pendientes,
+                "rating_po": rating_po,
+                "semaforo": sem,
+            }
+
+        area = values[area_pos] if area_pos is not None else None
+        rows.append(_BoardRow(row=row, board=board, expert=expert, celulas=celulas, area=area))
+
+    rows_scanned("boards", len(snap.rows))
+    return rows
+
+
+_boards: Dict[object, tuple] = {}
+_boards_lock = threading.Lock()
+
+
+def get_board(dep_mapping: dict, celula_tren_map: dict, path=EXCEL_PATH, snap=None) -> List[_BoardRow]:
+    """Board rows for the current workbook version (built once, then memoised)."""
+    snap = snap or get_snapshot(path)
+    key = workbook_key(path)
+    token = (snap.version, tuple(dep_mapping.items()), tuple(celula_tren_map.items()))
+    with _boards_lock:
+        cached = _boards.get(key)
+        hit = cached is not None and cached[0] == token
+    cache_lookup("boards", hit)
+    if hit:
+        return cached[1]
+    rows = build_board(snap, dep_mapping, celula_tren_map)
+    with _boards_lock:
+        _boards[key] = (token, rows)
+    return rows
+
+
+def collect_board_projects(
+    tren_filter: Optional[str] = None,
+    dep_mapping: dict | None = None,
+    celula_tren_map: dict | None = None,
+    q_filter: Optional[str] = None,
+    solo_priorizados: bool = False,
+    path=EXCEL_PATH,
+    snap=None,
+):
+    """Active projects (Nuevo / En curso) for both mesas, sorted by Q + nombre.
+
+    With ``tren_filter`` only projects with a P/L flag in some célula of that
+    tren (per ``celula_tren_map``) are kept.
+    """
+    dep_mapping = dep_mapping or {}
+    celula_tren_map = celula_tren_map or {}
+    equipos_tren = set()
+    if tren_filter:
+        equipos_tren = {c for c, t in celula_tren_map.items() if str(t).strip() == str(tren_filter).strip()}
+
+    proyectos = []
+    for entry in get_board(dep_mapping, celula_tren_map, path, snap):
+        p = entry.board
+        if p is None:
+            continue
+        if equipos_tren and not (entry.celulas & equipos_tren):
+            continue
+        if solo_priorizados and p["priorizado"] != "SI":
+            continue
+        if q_filter and (p["q_rad"] is None or str(p["q_rad"]) != q_filter):
+            continue
+        proyectos.append(dict(p))
+
+    proyectos.sort(key=lambda x: (str(x["q_rad"]), str(x["nombre"])))
+    return proyectos
+
+
+def get_expert_project_list(
+    tren_filter: Optional[str] = None,
+    dep_mapping: dict | None = None,
+    celula_tren_map: dict | None = None,
+    path=EXCEL_PATH,
+    snap=None,
+):
+    """Projects in Nuevo / En curso with the Mesa de Expertos fields.
+
+    ``tren_filter`` matches the Area/Tren/CoE column when the sheet has one.
+    """
+    dep_mapping = dep_mapping or {}
+    celula_tren_map = celula_tren_map or {}
+    snap = snap or get_snapshot(path)
+    snap_has_area = snap.area_tren_coe_col is not None
+
+    projects = []
+    for entry in get_board(dep_mapping, celula_tren_map, path, snap):
+        p = entry.expert
+        if p is None:
+            continue
+        if tren_filter and snap_has_area and str(entry.area).strip() != str(tren_filter).strip():
+            continue
+        projects.append(dict(p))
+    return projects
+
+
+def _ranking_candidates(board_rows: List[_BoardRow]):
+    for entry in board_rows:
+        p = entry.expert
+        if p is None:
+            continue
+        yield Candidate(
+            row=p["row"],
+            nombre=p["nombre"],
+            estado=p["estado"],
+            priorizado=p["priorizado"].strip().upper() == "SI",
+            contribucion=p["contribucion"],
+            rating_po=p["rating_po"],
+            pendientes=len(p["pending_equips"]),
+            celulas=entry.celulas,
+        )
+
+
+@timed("compute")
+def rank_expert_projects(
+    tren_filter: Optional[str] = None,
+    top: int = DEFAULT_TOP,
+    weights: ScoreWeights = DEFAULT_WEIGHTS,
+    dep_mapping: dict | None = None,
+    celula_tren_map: dict | None = None,
+    path=EXCEL_PATH,
+    snap=None,
+):
+    """Top *top* expert-board projects by ``weights`` (see ``gd.ranking``), with score breakdowns.
+
+    ``tren_filter`` keeps projects with a P/L flag in some célula of that tren,
+    like ``collect_board_projects``. While the workbook only changes through
+    the board writers the ranking is served without re-reading it.
+    """
+    dep_mapping = dep_mapping or {}
+    celula_tren_map = celula_tren_map or {}
+    token = (tuple(dep_mapping.items()), tuple(celula_tren_map.items()))
+    state = RANKING.lookup(path, snap.version if snap else workbook_version(path), token)
+    if state is None:
+        snap = snap or get_snapshot(path)
+        board_rows = get_board(dep_mapping, celula_tren_map, path, snap)
+        state = RANKING.build(path, snap.version, token, _ranking_candidates(board_rows))
+
+    equipos = None
+    if tren_filter:
+        wanted = str(tren_filter).strip()
+        equipos = frozenset(c for c, t in celula_tren_map.items() if str(t).strip() == wanted)
+    return top_k(state, top, weights, equipos)
+
+
+def update_expert_fields(row: int, priorizado, contribucion, iniciativa, path=EXCEL_PATH):
+    """Mesa de Expertos decision: PRIORIZADO (C), CONTRIBUCION (P), INICIATIVA_ESTRATEGICA (Q)."""
+    values = {
+        "PRIORIZADO": "SI" if str(priorizado).upper().startswith("SI") else "NO",
+        "CONTRIBUCION": float(contribucion) if contribucion is not None else 0.0,
+        "INICIATIVA_ESTRATEGICA": iniciativa,
+    }
+    with workbook_lock(path):
+        before = workbook_version(path)
+        written = update_row_cells(row, values, path)
+        if written:
+            RANKING.update(
+                path, before, workbook_version(path), row,
+                priorizado=values["PRIORIZADO"] == "SI", contribucion=values["CONTRIBUCION"],
+            )
+    return {"row": row, "changed": bool(written), **values}
+
+
+def update_alistamiento_rating(row: int, rating, path=EXCEL_PATH):
+    """Mesa PO Sync rating (0–5) in RATING_PO_SYNC."""
+    r = _clamp_rating(rating) if rating is not None else 0
+    with workbook_lock(path):
+        before = workbook_version(path)
+        written = update_row_cells(row, {"RATING_PO_SYNC": r}, path)
+        if written:
+            RANKING.update(path, before, workbook_version(path), row, rating_po=r)
+    return {"row": row, "changed": bool(written), "RATING_PO_SYNC": r}
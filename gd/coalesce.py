@@ -0,0 +1,116 @@
+"""Request coalescing (singleflight) for expensive workbook reads.
+
+When several callers ask for the same read with the same arguments while the
+workbook is at the same version, only the first one runs it; the others wait
+for that in-flight call and receive the same result (or exception). Nothing is
+cached once the call finishes, so results never outlive their version.
+"""
+from __future__ import annotations
+
+import functools
+import inspect
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Hashable
+
+from .config import EXCEL_PATH
+from .excel import workbook_version
+from .profiling import current as current_profile
+from .telemetry import cache_lookup
+from .tracing import current_span
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls that share a key."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.shared += 1
+        cache_lookup("singleflight", not leader)
+        if not leader:
+            current_span().set("coalesced", True)
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+def freeze(value) -> Hashable:
+    """Turn call arguments (dicts, lists, sets) into a hashable key."""
+    if isinstance(value, dict):
+        return tuple((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(freeze(v) for v in value)
+    if isinstance(value, Path):
+        return str(value)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+READS = SingleFlight()
+
+
+def coalesced(fn: Callable, flight: SingleFlight = READS) -> Callable:
+    """Wrap a gd read function (one taking ``path=``) with singleflight.
+
+    The key is the function, its bound arguments and the workbook version of
+    ``path`` at call time, so a call that starts after a save never joins a
+    computation running against the previous version.
+    """
+    sig = inspect.signature(fn)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if current_profile() is not None:
+            # A profiled request runs its own computation rather than joining one.
+            return fn(*args, **kwargs)
+        bound = sig.bind(*args, **kwargs)
+        bound.apply_defaults()
+        path = bound.arguments.get("path", EXCEL_PATH)
+        key = (fn.__module__, fn.__qualname__, workbook_version(path), freeze(bound.arguments))
+        return flight.do(key, fn, *args, **kwargs)
+
+    return wrapper
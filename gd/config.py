@@ -3,6 +3,33 @@
 Environment variables:
 - GD_EXCEL_PATH: override the path to the Excel workbook (default: repository GD_v1.xlsx).
 - GD_LOGO_PATH: optional path to the Telefónica logo used by front-end shells.
+- GD_SUGGESTIONS_PATH: append-only log for feedback (default: next to the workbook).
+- GD_SUGGESTIONS_SYNC_SECONDS: how often the API copies new feedback into the
+  Sugerencias sheet (default: 300; 0 disables the periodic sync).
+- GD_READ_WORKERS: threads serving workbook reads in the API (default: 4).
+- GD_CPU_WORKERS: processes for CPU-heavy aggregation offloaded with
+  ``service.offload`` (default: min(2, CPUs); 0 runs it on the read threads).
+  /metrics reads the cached snapshot on the read threads and does not use it.
+- GD_WRITE_QUEUE_LIMIT: writes allowed to wait for the single writer before
+  new ones get 429 (default: 16; 0 = unbounded).
+- GD_WRITE_QUEUE_TIMEOUT: seconds a queued write may wait before it is
+  dropped with 503 (default: 20; 0 = no limit).
+- GD_PROFILING: set to 1 to allow per-request profiles (``X-GD-Profile: 1`` or
+  ``?profile=1``); off by default.
+- GD_PROFILE_DIR: optional directory where profile reports (.json + .pstats)
+  are also written.
+- GD_TRACE_PATH: JSON-lines file receiving request trace spans; tracing is
+  off unless set.
+- GD_TRACE_SAMPLE: fraction of requests whose traces are written (default: 0.1);
+  GD_TRACE_SLOW_MS: traces slower than this are always written (default: 1000).
+- GD_SHARED_STATE: set to 1 when running several API worker processes
+  (``uvicorn --workers N``): the parsed snapshot is shared through a sidecar
+  file and change events are relayed between workers.
+- GD_EVENTS_POLL_SECONDS: how often the API checks the workbook for edits made
+  outside of it, to announce them on /events (default: 2; 0 disables).
+- GD_RANKING_WEIGHTS: default Mesa de Expertos ranking weights, e.g.
+  ``contribucion=0.4,priorizado=0.25,rating_po=0.2,pendientes=0.15`` (names
+  left out keep their default).
 """
 from __future__ import annotations
 
@@ -10,8 +37,6 @@ import os
 from pathlib import Path
 from typing import Dict, Iterable
 
-from openpyxl.utils import column_index_from_string
-
 # Workbook locations
 REPO_ROOT = Path(__file__).resolve().parents[1]
 DEFAULT_EXCEL_PATH = REPO_ROOT / "GD_v1.xlsx"
@@ -20,6 +45,40 @@ LOGO_PATH: Path | None = None
 if os.getenv("GD_LOGO_PATH"):
     LOGO_PATH = Path(os.getenv("GD_LOGO_PATH", ""))
 
+# Feedback log (synced into the Sugerencias sheet)
+SUGGESTIONS_LOG_PATH: Path = Path(
+    os.getenv("GD_SUGGESTIONS_PATH", EXCEL_PATH.with_name(f"{EXCEL_PATH.stem}.sugerencias.jsonl"))
+)
+SUGGESTIONS_SYNC_SECONDS = float(os.getenv("GD_SUGGESTIONS_SYNC_SECONDS", "300"))
+SUGGESTIONS_RING_SIZE = 500
+
+# API executors
+READ_WORKERS = int(os.getenv("GD_READ_WORKERS", "4"))
+CPU_WORKERS = int(os.getenv("GD_CPU_WORKERS", str(min(2, os.cpu_count() or 1))))
+WRITE_QUEUE_LIMIT = int(os.getenv("GD_WRITE_QUEUE_LIMIT", "16"))
+WRITE_QUEUE_TIMEOUT = float(os.getenv("GD_WRITE_QUEUE_TIMEOUT", "20"))
+
+# Per-request profiling (opt-in)
+PROFILING = os.getenv("GD_PROFILING", "").strip().lower() in ("1", "true", "yes", "on")
+PROFILE_DIR: Path | None = Path(os.environ["GD_PROFILE_DIR"]) if os.getenv("GD_PROFILE_DIR") else None
+PROFILE_TOP = 25
+
+# Request tracing (opt-in)
+TRACE_PATH: Path | None = Path(os.environ["GD_TRACE_PATH"]) if os.getenv("GD_TRACE_PATH") else None
+TRACE_SAMPLE = float(os.getenv("GD_TRACE_SAMPLE", "0.1"))
+TRACE_SLOW_MS = float(os.getenv("GD_TRACE_SLOW_MS", "1000"))
+
+# Multi-worker deployments
+SHARED_STATE = os.getenv("GD_SHARED_STATE", "").strip().lower() in ("1", "true", "yes", "on")
+SHARED_EVENTS_POLL_SECONDS = 0.25
+
+# Change feed (/events)
+EVENTS_POLL_SECONDS = float(os.getenv("GD_EVENTS_POLL_SECONDS", "2"))
+EVENTS_KEEPALIVE_SECONDS = 15.0
+
+# Mesa de Expertos ranking
+RANKING_WEIGHTS = os.getenv("GD_RANKING_WEIGHTS", "")
+
 # Sheet names
 SHEET_PROYECTOS = "ProyectosTI"
 SHEET_DATOS = "Datos"
@@ -60,10 +119,23 @@ FLAG_END_LETTER = "BB"
 DESC_START_LETTER = "BC"
 DESC_END_LETTER = "CM"
 
-FLAG_START_COL = column_index_from_string(FLAG_START_LETTER)
-FLAG_END_COL = column_index_from_string(FLAG_END_LETTER)
-DESC_START_COL = column_index_from_string(DESC_START_LETTER)
-DESC_END_COL = column_index_from_string(DESC_END_LETTER)
+
+
+def _column_index(letters: str) -> int:
+    """``openpyxl.utils.column_index_from_string`` without importing openpyxl.
+
+    Keeps ``import gd.config`` (and so ``python -m gd --help``) cheap.
+    """
+    index = 0
+    for ch in letters.upper():
+        index = index * 26 + ord(ch) - ord("A") + 1
+    return index
+
+
+FLAG_START_COL = _column_index(FLAG_START_LETTER)
+FLAG_END_COL = _column_index(FLAG_END_LETTER)
+DESC_START_COL = _column_index(DESC_START_LETTER)
+DESC_END_COL = _column_index(DESC_END_LETTER)
 
 # Branding colours used by downstream UIs
 PRIMARY_COLOR = "#00a9e0"
@@ -14,8 +14,9 @@ from .config import (
     FLAG_START_COL,
     COLS,
 )
-from .excel import find_column_by_header_in_range, get_header_row_proyectos
+from .excel import build_header_index, get_header_row_proyectos, header_key
 from .models import Dependency
+from .tracing import current_span, span
 
 
 def compute_dep_aggregates(dep_list: Sequence[Dependency]):
@@ -32,35 +33,52 @@ def compute_dep_aggregates(dep_list: Sequence[Dependency]):
     return total_dep, total_L, total_P, cubrimiento
 
 
-def write_dep_aggregates(ws, row: int, dep_list: Sequence[Dependency]):
+def _cell_differs(current, new) -> bool:
+    if current in (None, "") and new in (None, ""):
+        return False
+    return current != new
+
+
+def write_dep_aggregates(ws, row: int, dep_list: Sequence[Dependency]) -> int:
+    """Write CN:CQ for *row*; only cells whose value changes are touched.
+
+    Returns the number of cells written.
+    """
     total_dep, total_L, total_P, cub = compute_dep_aggregates(dep_list)
     cn = column_index_from_string(COLS["TOTAL_DEP"])
     co = column_index_from_string(COLS["TOTAL_L"])
     cp = column_index_from_string(COLS["TOTAL_P"])
     cq = column_index_from_string(COLS["CUBRIMIENTO_DEP"])
 
-    ws.cell(row=row, column=cn).value = total_dep
-    ws.cell(row=row, column=co).value = total_L
-    ws.cell(row=row, column=cp).value = total_P
-    ws.cell(row=row, column=cq).value = cub
+    written = 0
+    for col_idx, value in ((cn, total_dep), (co, total_L), (cp, total_P), (cq, cub)):
+        cell = ws.cell(row=row, column=col_idx)
+        if _cell_differs(cell.value, value):
+            cell.value = value
+            written += 1
+    return written
+
 
+def desired_dependency_cells(ws, dep_list: Sequence[Dependency], dep_mapping: dict, header_row: int | None = None):
+    """Return ``{col_idx: value}`` for the flag/description cells of a row.
 
-def apply_dependencies_to_row(ws, row: int, dep_list: Sequence[Dependency], dep_mapping: dict):
-    header_row = get_header_row_proyectos(ws)
+    Every célula in *dep_mapping* starts cleared; the submitted P/L dependencies
+    are then laid on top in order, exactly as the clear-then-write sequence did.
+    """
+    header_row = header_row or get_header_row_proyectos(ws)
+    with span("dependency_columns", celulas=len(dep_mapping)):
+        flag_index = build_header_index(ws, FLAG_START_COL, FLAG_END_COL, header_row)
+        desc_index = build_header_index(ws, DESC_START_COL, DESC_END_COL, header_row)
 
+    desired = {}
     for equipo, desc_header in dep_mapping.items():
-        flag_col_idx = find_column_by_header_in_range(
-            ws, equipo, FLAG_START_COL, FLAG_END_COL, header_row
-        )
+        flag_col_idx = flag_index.get(header_key(equipo)) if equipo else None
         if flag_col_idx:
-            ws.cell(row=row, column=flag_col_idx).value = None
-
+            desired[flag_col_idx] = None
         if desc_header:
-            desc_col_idx = find_column_by_header_in_range(
-                ws, desc_header, DESC_START_COL, DESC_END_COL, header_row
-            )
+            desc_col_idx = desc_index.get(header_key(desc_header))
             if desc_col_idx:
-                ws.cell(row=row, column=desc_col_idx).value = None
+                desired[desc_col_idx] = None
 
     for dep in dep_list:
         equipo = (dep.equipo or "").strip()
@@ -70,22 +88,35 @@ def apply_dependencies_to_row(ws, row: int, dep_list: Sequence[Dependency], dep_
         if not equipo or codigo not in ("P", "L"):
             continue
 
+        flag_col_idx = flag_index.get(header_key(equipo))
+        if flag_col_idx:
+            desired[flag_col_idx] = codigo
+
         desc_header = dep_mapping.get(equipo)
+        if desc_header and texto:
+            desc_col_idx = desc_index.get(header_key(desc_header))
+            if desc_col_idx:
+                desired[desc_col_idx] = texto
 
-        flag_col_idx = find_column_by_header_in_range(
-            ws, equipo, FLAG_START_COL, FLAG_END_COL, header_row
-        )
-        if flag_col_idx:
-            ws.cell(row=row, column=flag_col_idx).value = codigo
+    return desired
 
-        if desc_header:
-            desc_col_idx = find_column_by_header_in_range(
-                ws, desc_header, DESC_START_COL, DESC_END_COL, header_row
-            )
-            if desc_col_idx and texto:
-                ws.cell(row=row, column=desc_col_idx).value = texto
 
-    write_dep_aggregates(ws, row, dep_list)
+def apply_dependencies_to_row(ws, row: int, dep_list: Sequence[Dependency], dep_mapping: dict) -> int:
+    """Bring the row's flags/descriptions and CN:CQ in line with *dep_list*.
+
+    Only cells whose value actually changes are written. Returns the number of
+    cells written so callers can skip saving when nothing changed.
+    """
+    written = 0
+    for col_idx, value in desired_dependency_cells(ws, dep_list, dep_mapping).items():
+        cell = ws.cell(row=row, column=col_idx)
+        if _cell_differs(cell.value, value):
+            cell.value = value
+            written += 1
+
+    written += write_dep_aggregates(ws, row, dep_list)
+    current_span().add("cells_written", written)
+    return written
 
 
 def dep_semaforo(total_dep: int, total_L: int, total_P: int):
@@ -98,17 +129,19 @@ def dep_semaforo(total_dep: int, total_L: int, total_P: int):
     return "#f1c40f", "Mix de dependencias negociadas (L) y pendientes (P)"
 
 
+def dep_semaforo_state(total_dep: int, total_L: int, total_P: int) -> str:
+    if total_dep == 0:
+        return "apagado"
+    if total_P == 0 and total_L > 0:
+        return "verde"
+    if total_L == 0 and total_P > 0:
+        return "rojo"
+    return "amarillo"
+
+
 def build_semaforo_block(total_dep: int, total_L: int, total_P: int, title: str = "Dependencias"):
     _color, text = dep_semaforo(total_dep, total_L, total_P)
-
-    if total_dep == 0:
-        state = "apagado"
-    elif total_P == 0 and total_L > 0:
-        state = "verde"
-    elif total_L == 0 and total_P > 0:
-        state = "rojo"
-    else:
-        state = "amarillo"
+    state = dep_semaforo_state(total_dep, total_L, total_P)
 
     def light(color_hex: str, active: bool) -> str:
         fill = color_hex if active else "#e0e0e0"
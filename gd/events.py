@@ -0,0 +1,255 @@
+"""In-process change feed for the workbook.
+
+Writers publish compact notifications (``project.inserted``,
+``project.updated``, ``dependencies.changed``, ``suggestion.added``,
+``catalog.reloaded``, ``workbook.changed``) tagged with the new workbook
+version. The API fans them out to SSE / WebSocket subscribers so clients can
+refetch only what changed instead of polling.
+
+With ``GD_SHARED_STATE`` the bus also appends every event to a sidecar log
+(``.GD_v1.xlsx.events.jsonl``) that the other worker processes tail, so a
+client connected to any worker hears about writes made by all of them. Event
+ids are then byte offsets in that log, which keeps ``Last-Event-ID`` valid
+across workers. Once the log has grown past ``LOG_ROTATE_BYTES`` and sat idle
+for ``LOG_ROTATE_IDLE_SECONDS`` (long enough for every worker to have tailed
+it), the next append starts it over with a ``{"base": N}`` header line; ids
+are ``base + offset``, so they keep increasing across rotations, and a worker
+that had not read to the end when the log rotated sends its subscribers a
+``resync``. Without it ids count up from the start time in milliseconds,
+so ids from before a restart are recognisably older than the history.
+
+A ``Last-Event-ID`` the history cannot answer for (older than what is kept,
+from before a restart, or newer than anything seen) gets a ``resync`` event
+instead of a partial backlog.
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Deque, List, Optional, Set, Tuple
+
+from .config import EXCEL_PATH, SHARED_STATE
+from .excel import FileLock, sidecar_path, workbook_version
+
+HISTORY_SIZE = 256
+SUBSCRIBER_QUEUE_SIZE = 256
+LOG_ROTATE_BYTES = 1 << 20
+LOG_ROTATE_IDLE_SECONDS = 5.0
+
+
+class Subscription:
+    """One listener: an asyncio queue bound to the loop that created it."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int = SUBSCRIBER_QUEUE_SIZE):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def _offer(self, event: dict) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow consumer: tell it to refetch everything rather than buffer forever.
+            self.overflowed = True
+
+    async def get(self, timeout: float | None = None) -> Optional[dict]:
+        if self.overflowed:
+            self.overflowed = False
+            return {"type": "resync", "version": BUS.last_version}
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBus:
+    def __init__(self, history_size: int = HISTORY_SIZE, log_path: Optional[Path] = None):
+        self._lock = threading.Lock()
+        self._ids = itertools.count(int(time.time() * 1000))
+        self._history: Deque[dict] = deque(maxlen=history_size)
+        self._subscribers: Set[Subscription] = set()
+        self.last_version: Optional[str] = None
+        self.published = 0
+        self.log_path = Path(log_path) if log_path else None
+        self._log_lock = FileLock(self.log_path.with_name(self.log_path.name + ".lock")) if log_path else None
+        # Position (base + offset) up to which this worker has read the log.
+        self._tail = self._log_header()[0] + self._log_size() if log_path else 0
+
+    def _log_size(self) -> int:
+        if self.log_path is None:
+            return 0
+        try:
+            return os.path.getsize(self.log_path)
+        except FileNotFoundError:
+            return 0
+
+    def _log_header(self) -> Tuple[int, int]:
+        """``(base, header length)`` of the shared log; ``(0, 0)`` before its first rotation."""
+        try:
+            with open(self.log_path, "rb") as fh:
+                first = fh.readline()
+        except FileNotFoundError:
+            return 0, 0
+        if first.startswith(b'{"base"') and first.endswith(b"\n"):
+            try:
+                return int(json.loads(first)["base"]), len(first)
+            except (ValueError, KeyError, TypeError):
+                pass
+        return 0, 0
+
+    def _maybe_rotate(self) -> None:
+        """Start the log over once it is large and idle; caller holds ``_log_lock``."""
+        try:
+            st = os.stat(self.log_path)
+        except FileNotFoundError:
+            return
+        if st.st_size < LOG_ROTATE_BYTES or time.time() - st.st_mtime < LOG_ROTATE_IDLE_SECONDS:
+            return
+        base, _ = self._log_header()
+        tmp = self.log_path.with_name(f"{self.log_path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"base": base + st.st_size}) + "\n")
+        os.replace(tmp, self.log_path)
+
+    def _append_shared(self, event: dict) -> int:
+        """Append *event* to the shared log; returns its id (base + offset + 1)."""
+        line = json.dumps({"origin": os.getpid(), "event": event}, ensure_ascii=False, default=str) + "\n"
+        with self._log_lock:
+            self._maybe_rotate()
+            base, _ = self._log_header()
+            with open(self.log_path, "ab") as fh:
+                offset = fh.seek(0, os.SEEK_END)
+                fh.write(line.encode("utf-8"))
+        return base + offset + 1
+
+    def _deliver(self, event: dict) -> None:
+        with self._lock:
+            self._history.append(event)
+            self.last_version = event["version"]
+            self.published += 1
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            try:
+                sub.loop.call_soon_threadsafe(sub._offer, event)
+            except RuntimeError:
+                # Loop already closed; the subscriber is going away.
+                continue
+
+    def publish(self, event_type: str, version: Optional[str] = None, path=EXCEL_PATH, **data) -> dict:
+        """Record an event and hand it to every subscriber (thread-safe)."""
+        version = version or workbook_version(path)
+        event = {"type": event_type, "version": version, "ts": time.time(), **data}
+        if self.log_path is not None:
+            event = {"id": self._append_shared(event), **event}
+        else:
+            event = {"id": next(self._ids), **event}
+        self._deliver(event)
+        return event
+
+    def pull_shared(self) -> List[dict]:
+        """Deliver events other workers appended to the shared log since the last call."""
+        if self.log_path is None:
+            return []
+        base, header_len = self._log_header()
+        size = self._log_size()
+        start = self._tail - base
+        if start < header_len or start > size:
+            # Rotated (or replaced) since we last looked. Reaching exactly the
+            # old end is fine; anything else means events we never read.
+            if start != 0:
+                self._announce_resync()
+            start = header_len if start <= size else size
+        if size <= start:
+            self._tail = base + start
+            return []
+        with open(self.log_path, "rb") as fh:
+            fh.seek(start)
+            data = fh.read()
+        received = []
+        offset = start
+        for line in data.splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                break  # still being written
+            line_offset, offset = offset, offset + len(line)
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("origin") == os.getpid():
+                continue
+            event = {"id": base + line_offset + 1, **record["event"]}
+            self._deliver(event)
+            received.append(event)
+        self._tail = base + offset
+        return received
+
+    def _announce_resync(self) -> None:
+        with self._lock:
+            event = {"type": "resync", "version": self.last_version}
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            try:
+                sub.loop.call_soon_threadsafe(sub._offer, event)
+            except RuntimeError:
+                continue
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> Tuple[Subscription, List[dict]]:
+        """Register a subscriber; returns it plus any missed events after *last_event_id*.
+
+        When the history does not reach back to *last_event_id* the backlog is
+        a single ``resync`` event.
+        """
+        sub = Subscription(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(sub)
+            backlog = []
+            if last_event_id is not None:
+                if self._covers(last_event_id):
+                    backlog = sorted((e for e in self._history if e["id"] > last_event_id), key=lambda e: e["id"])
+                else:
+                    backlog = [{"type": "resync", "version": self.last_version}]
+        return sub, backlog
+
+    def _covers(self, last_event_id: int) -> bool:
+        """Whether every event after *last_event_id* is still in the history (caller holds the lock)."""
+        ids = {e["id"] for e in self._history}
+        if last_event_id in ids:
+            return True
+        # Local ids are consecutive, so the one right before the oldest kept
+        # event is covered too; shared-log ids (byte offsets) have gaps.
+        return self.log_path is None and bool(ids) and last_event_id == min(ids) - 1
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def check_external_change(self, path=EXCEL_PATH) -> Optional[dict]:
+        """Publish ``workbook.changed`` when the file moved without a known event.
+
+        With a shared log, call ``pull_shared`` first so other workers' writes
+        (and their ``workbook.changed``) are not reported twice.
+        """
+        version = workbook_version(path)
+        with self._lock:
+            if self.last_version is None:
+                self.last_version = version
+                return None
+            if version == self.last_version:
+                return None
+        return self.publish("workbook.changed", version=version, path=path)
+
+
+BUS = EventBus(log_path=sidecar_path(EXCEL_PATH, "events.jsonl") if SHARED_STATE else None)
+
+
+def publish(event_type: str, version: Optional[str] = None, path=EXCEL_PATH, **data) -> dict:
+    return BUS.publish(event_type, version=version, path=path, **data)
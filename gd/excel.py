@@ -1,12 +1,24 @@
 """Excel helpers extracted from the original notebook."""
 from __future__ import annotations
 
+import os
+import shutil
+import threading
 from pathlib import Path
-from typing import Iterable, Tuple
+from typing import Dict, Iterable, Tuple
 
 import openpyxl
 from openpyxl.utils import column_index_from_string, get_column_letter
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
 from .config import (
     COLS,
     EXCEL_PATH,
@@ -17,14 +29,20 @@ from .config import (
     START_ROW_PROYECTOS,
     ensure_required_sheets,
 )
+from .telemetry import cache_lookup, rows_scanned, stage, timed
+from .tracing import span
 
 
 # ---------------------------------------------------------------------------
 # Workbook access
 # ---------------------------------------------------------------------------
 
-def load_workbook(path: Path = EXCEL_PATH) -> openpyxl.Workbook:
-    """Open the workbook and validate required sheets."""
+def load_workbook(path: Path = EXCEL_PATH, read_only: bool = False) -> openpyxl.Workbook:
+    """Open the workbook and validate required sheets.
+
+    ``read_only=True`` uses openpyxl's streaming reader; callers must not write
+    to it and should ``close()`` it when done.
+    """
     if not path.exists():
         raise FileNotFoundError(f"No se encontró el archivo: {path}")
     # Guard against unsupported binary formats (e.g., .xlsb) early so the error
@@ -37,7 +55,8 @@ def load_workbook(path: Path = EXCEL_PATH) -> openpyxl.Workbook:
         )
 
     try:
-        wb = openpyxl.load_workbook(path, keep_vba=False)
+        with stage("parse"), span("load_workbook", read_only=read_only):
+            wb = openpyxl.load_workbook(path, read_only=read_only, keep_vba=False)
     except openpyxl.utils.exceptions.InvalidFileException as exc:
         raise ValueError(
             "No se pudo abrir el Excel. Asegúrate de que no sea un archivo binario (.xlsb) y de que esté válido: "
@@ -47,6 +66,167 @@ def load_workbook(path: Path = EXCEL_PATH) -> openpyxl.Workbook:
     return wb
 
 
+# ---------------------------------------------------------------------------
+# Workbook versions and write coordination
+# ---------------------------------------------------------------------------
+
+_write_locks: Dict[Path, "WorkbookLock"] = {}
+_registry_lock = threading.Lock()
+
+
+def workbook_key(path) -> Path:
+    """Canonical key for per-workbook state (locks, versions, caches)."""
+    return Path(path).resolve()
+
+
+def sidecar_path(path, suffix: str) -> Path:
+    """Hidden file next to the workbook used for shared state (``.GD_v1.xlsx.lock``)."""
+    key = workbook_key(path)
+    return key.with_name(f".{key.name}.{suffix}")
+
+
+def workbook_version(path: Path = EXCEL_PATH) -> str:
+    """Opaque token that changes whenever the workbook on disk changes.
+
+    Built from the file's mtime/size plus its inode: ``save_workbook`` replaces
+    the file atomically, so every save gets a new inode even inside the same
+    mtime tick, and every worker process computes the same token.
+    """
+    try:
+        st = os.stat(workbook_key(path))
+    except FileNotFoundError:
+        return "missing"
+    return f"{st.st_mtime_ns:x}-{st.st_size:x}-{st.st_ino:x}"
+
+
+def workbook_mtime(path: Path = EXCEL_PATH) -> float | None:
+    """Last modification time of the workbook (for HTTP Last-Modified)."""
+    try:
+        return os.stat(workbook_key(path)).st_mtime
+    except FileNotFoundError:
+        return None
+
+
+class FileLock:
+    """Exclusive advisory lock on a file, shared by every process on the host."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._fh = None
+
+    def acquire(self) -> None:
+        fh = open(self.path, "a+b")
+        try:
+            if fcntl is not None:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+            elif msvcrt is not None:  # pragma: no cover - Windows
+                fh.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+        except BaseException:
+            fh.close()
+            raise
+        self._fh = fh
+
+    def release(self) -> None:
+        fh, self._fh = self._fh, None
+        if fh is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:  # pragma: no cover - Windows
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            fh.close()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
+
+
+class WorkbookLock:
+    """Re-entrant lock serialising load → modify → save across threads *and* processes.
+
+    Threads of one process queue on an ``RLock``; the outermost holder also
+    takes the ``.lock`` sidecar's file lock, so API workers, the CLI and any
+    other process using gd never save over each other.
+    """
+
+    def __init__(self, path: Path):
+        self._rlock = threading.RLock()
+        self._file = FileLock(sidecar_path(path, "lock"))
+        self._depth = 0
+
+    def acquire(self) -> None:
+        self._rlock.acquire()
+        if self._depth == 0:
+            try:
+                self._file.acquire()
+            except BaseException:
+                self._rlock.release()
+                raise
+        self._depth += 1
+
+    def release(self) -> None:
+        self._depth -= 1
+        if self._depth == 0:
+            self._file.release()
+        self._rlock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
+
+
+def workbook_lock(path: Path = EXCEL_PATH) -> WorkbookLock:
+    """Per-workbook lock serialising load → modify → save cycles."""
+    key = workbook_key(path)
+    with _registry_lock:
+        lock = _write_locks.get(key)
+        if lock is None:
+            lock = _write_locks[key] = WorkbookLock(key)
+        return lock
+
+
+def save_workbook(wb: openpyxl.Workbook, path: Path = EXCEL_PATH) -> str:
+    """Save *wb* atomically and carry version-keyed state forward; returns the new version.
+
+    The workbook is written to a temporary file and moved into place, so
+    readers in other threads or processes never see a half-written xlsx.
+    """
+    key = workbook_key(path)
+    before = workbook_version(key)
+    with stage("save"), span("wb.save"):
+        tmp = key.with_name(f".{key.name}.{os.getpid()}.tmp")
+        try:
+            wb.save(tmp)
+            if key.exists():
+                shutil.copymode(key, tmp)
+            os.replace(tmp, key)
+        except PermissionError:  # pragma: no cover - Windows: target held open elsewhere
+            tmp.unlink(missing_ok=True)
+            wb.save(key)
+        finally:
+            tmp.unlink(missing_ok=True)
+    after = workbook_version(key)
+    ROW_ID_ALLOCATOR.rebase(key, before, after)
+    return after
+
+
 def get_ws_proyectos(wb: openpyxl.Workbook | None = None):
     wb = wb or load_workbook()
     return wb[SHEET_PROYECTOS]
@@ -76,6 +256,7 @@ def get_ws_sugerencias(wb: openpyxl.Workbook | None = None):
 # Column and value helpers
 # ---------------------------------------------------------------------------
 
+@timed("index")
 def get_header_row_proyectos(ws) -> int:
     """Detect header row by locating the ID column header."""
     id_col_idx = column_index_from_string(COLS["ID"])
@@ -96,6 +277,7 @@ def get_unique_list_from_column(ws, col_letter: str, start_row: int = 2):
     return sorted(values)
 
 
+@timed("index")
 def get_next_row_and_id(ws, id_col_letter: str = "A", start_row: int = START_ROW_PROYECTOS) -> Tuple[int, int]:
     id_col_idx = column_index_from_string(id_col_letter)
     max_row_used = 0
@@ -108,11 +290,59 @@ def get_next_row_and_id(ws, id_col_letter: str = "A", start_row: int = START_ROW
             if isinstance(val, (int, float)):
                 max_id_found = max(max_id_found, int(val))
 
+    rows_scanned("row_id", ws.max_row - start_row + 1)
     next_row = start_row if max_row_used == 0 else max_row_used + 1
     next_id = max_id_found + 1 if max_id_found > 0 else 1
     return next_row, next_id
 
 
+class RowIdAllocator:
+    """Hands out ``(row, id)`` pairs for ProyectosTI without rescanning column A.
+
+    The high-water marks are computed with ``get_next_row_and_id`` once per
+    workbook version and then advanced in memory under a lock, so concurrent
+    inserts never receive the same row or ID. Saves done through
+    ``save_workbook`` rebase the state onto the new version; any other change to
+    the file (e.g. someone editing it in Excel) triggers a single rescan.
+    """
+
+    def __init__(self, id_col_letter: str = COLS["ID"], start_row: int = START_ROW_PROYECTOS):
+        self.id_col_letter = id_col_letter
+        self.start_row = start_row
+        self._lock = threading.Lock()
+        self._state: Dict[Path, Tuple[str, int, int]] = {}
+
+    def allocate(self, ws, path: Path = EXCEL_PATH) -> Tuple[int, int]:
+        key = workbook_key(path)
+        version = workbook_version(key)
+        with self._lock:
+            state = self._state.get(key)
+            cache_lookup("row_id", state is not None and state[0] == version)
+            if state is not None and state[0] == version:
+                _version, next_row, next_id = state
+            else:
+                next_row, next_id = get_next_row_and_id(
+                    ws, id_col_letter=self.id_col_letter, start_row=self.start_row
+                )
+            self._state[key] = (version, next_row + 1, next_id + 1)
+        return next_row, next_id
+
+    def rebase(self, path: Path, old_version: str, new_version: str) -> None:
+        """Move state computed for *old_version* onto *new_version* after our own save."""
+        key = workbook_key(path)
+        with self._lock:
+            state = self._state.get(key)
+            if state is not None and state[0] == old_version:
+                self._state[key] = (new_version, state[1], state[2])
+
+    def invalidate(self, path: Path = EXCEL_PATH) -> None:
+        with self._lock:
+            self._state.pop(workbook_key(path), None)
+
+
+ROW_ID_ALLOCATOR = RowIdAllocator()
+
+
 def find_column_by_header(ws, header_name: str, header_row: int = 1):
     if not header_name:
         return None
@@ -139,6 +369,27 @@ def find_column_by_header_in_range(ws, header_name: str, start_col_idx: int, end
     return None
 
 
+def header_key(header_name) -> str:
+    """Normalise a header the same way the ``find_column_by_header*`` helpers do."""
+    return str(header_name).strip().lower()
+
+
+@timed("index")
+def build_header_index(ws, start_col_idx: int, end_col_idx: int, header_row: int) -> Dict[str, int]:
+    """Map normalised header → column index in a single pass over the range.
+
+    Equivalent to calling ``find_column_by_header_in_range`` for every header
+    (first match wins) without rescanning the header row each time.
+    """
+    index: Dict[str, int] = {}
+    for col_idx in range(start_col_idx, end_col_idx + 1):
+        val = ws.cell(row=header_row, column=col_idx).value
+        if val is None:
+            continue
+        index.setdefault(header_key(val), col_idx)
+    return index
+
+
 def find_area_tren_coe_col(ws):
     header_row = get_header_row_proyectos(ws)
     candidate_idx = None
@@ -0,0 +1,63 @@
+"""HTTP validators (ETag / Last-Modified) for the read endpoints.
+
+Responses only change when the workbook (or the suggestion log) changes, so
+the ETag is a hash of that version token plus the request path and query.
+Clients revalidate with ``If-None-Match`` / ``If-Modified-Since`` and get an
+empty 304 while nothing changed.
+"""
+from __future__ import annotations
+
+import hashlib
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Optional
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(version: str, path: str, query: str = "") -> str:
+    digest = hashlib.blake2b(f"{version}|{path}?{query}".encode("utf-8"), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def _usable_last_modified(last_modified: Optional[float]) -> Optional[float]:
+    # HTTP dates have 1 s resolution: a file changed within the current second
+    # could change again under the same date, so only the ETag is trusted then.
+    if last_modified is None or time.time() - last_modified < 1.0:
+        return None
+    return last_modified
+
+
+def cache_headers(etag: str, last_modified: Optional[float] = None) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    last_modified = _usable_last_modified(last_modified)
+    if last_modified is not None:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+    return headers
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Accept weak comparisons (W/"...") as RFC 9110 requires for If-None-Match.
+    candidates = {c.strip().removeprefix("W/") for c in header.split(",")}
+    return etag in candidates
+
+
+def is_not_modified(
+    if_none_match: Optional[str],
+    if_modified_since: Optional[str],
+    etag: str,
+    last_modified: Optional[float] = None,
+) -> bool:
+    """Evaluate the conditional headers; ``If-None-Match`` takes precedence."""
+    if if_none_match:
+        return _etag_matches(if_none_match, etag)
+    last_modified = _usable_last_modified(last_modified)
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(last_modified) <= int(since)
+    return False
@@ -0,0 +1,434 @@
+"""Concurrent load tests with realistic read/write traffic mixes.
+
+Virtual users loop over weighted scenarios until the duration (or request
+budget) runs out:
+
+- ``dashboard``: ``GET /metrics`` for a random scope (all / area / célula),
+- ``explorer``: ``GET /projects`` (sometimes with ``q``) then one project,
+- ``mesa``: read a project and ``PUT /projects/{row}`` with a new avance and
+  one dependency flag flipped,
+- ``feedback``: ``POST /suggestions``.
+
+By default the app runs in-process behind the ``gd.bench`` ASGI driver, in a
+child interpreter whose ``GD_EXCEL_PATH`` points at a private copy of the
+workbook (``--workbook``, or a generated one with ``--rows``). ``--url``
+targets a running server instead; pass ``--workbook`` as well to check that
+server's workbook afterwards.
+
+The report gives throughput, p50/p95/p99 latency and error counts per
+scenario and per route, and an integrity check of the workbook after the run.
+The check verifies that:
+
+- the file still opens;
+- IDs are unique;
+- every edited row holds one of the values written to it;
+- its PORC_CUMPLIMIENTO and CN:CP aggregates match its values and flags;
+- every accepted suggestion reached the log.
+
+Usage::
+
+    python -m gd.loadtest --rows 10000 --concurrency 16 --duration 60
+    python -m gd.loadtest --url http://127.0.0.1:8000 --workbook GD_v1.xlsx --mix dashboard=6,mesa=4
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import quote, urlencode
+
+from .bench import AsgiClient, fixture_path, summarize
+
+SCENARIOS = ("dashboard", "explorer", "mesa", "feedback")
+DEFAULT_MIX = {"dashboard": 40, "explorer": 35, "mesa": 15, "feedback": 10}
+SEARCH_TERMS = ("a", "e", "pro", "dat", "red", "1")
+
+
+def parse_mix(text: Optional[str]) -> Dict[str, float]:
+    """``"dashboard=6,mesa=4"`` -> weights; unknown scenarios are an error."""
+    if not text:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f"Escenario desconocido '{name}'; usa {', '.join(SCENARIOS)}.")
+        mix[name] = float(weight or 1)
+    if not any(w > 0 for w in mix.values()):
+        raise ValueError("La mezcla necesita al menos un escenario con peso > 0.")
+    return mix
+
+
+class HttpClient:
+    """Same interface as ``AsgiClient.arequest`` over real HTTP (stdlib only)."""
+
+    def __init__(self, base_url: str, concurrency: int):
+        self.base_url = base_url.rstrip("/")
+        self._pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="gd-load")
+
+    def _send(self, method: str, path: str, json_body=None):
+        data = None if json_body is None else json.dumps(json_body).encode("utf-8")
+        req = urllib.request.Request(f"{self.base_url}{path}", data=data, method=method)
+        if data is not None:
+            req.add_header("Content-Type", "application/json")
+        try:
+            with urllib.request.urlopen(req, timeout=120) as resp:
+                return resp.status, resp.read()
+        except urllib.error.HTTPError as exc:
+            return exc.code, exc.read()
+        except OSError as exc:
+            return 0, str(exc).encode()
+
+    async def arequest(self, method: str, path: str, json_body=None):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self._send, method, path, json_body)
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False)
+
+
+# ---------------------------------------------------------------------------
+# Load generation
+# ---------------------------------------------------------------------------
+
+class LoadRun:
+    def __init__(self, client, mix: Dict[str, float], concurrency: int, seed: int, think: float, tag: str):
+        self.client = client
+        self.mix = mix
+        self.concurrency = concurrency
+        self.seed = seed
+        self.think = think
+        self.tag = tag
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self.scenario_samples: Dict[str, List[float]] = defaultdict(list)
+        self.scenario_errors: Dict[str, int] = defaultdict(int)
+        # row -> avance values acknowledged by the API
+        self.written: Dict[int, List[float]] = defaultdict(list)
+        self.suggestions_ok = 0
+        self.catalogs: dict = {}
+        self.names: List[str] = []
+
+    async def _call(self, route: str, method: str, path: str, json_body=None):
+        start = time.perf_counter()
+        status, body = await self.client.arequest(method, path, json_body)
+        self.samples[route].append(time.perf_counter() - start)
+        self.statuses[route][status] += 1
+        if not 200 <= status < 300:
+            raise _RequestFailed(route, status)
+        return json.loads(body) if body else None
+
+    async def bootstrap(self) -> None:
+        self.catalogs = await self._call("GET /catalogs", "GET", "/catalogs")
+        self.names = (await self._call("GET /projects", "GET", "/projects"))["items"]
+        if not self.names:
+            raise RuntimeError("El workbook no tiene proyectos para la prueba de carga.")
+
+    # -- scenarios -----------------------------------------------------------
+
+    async def dashboard(self, rng: random.Random) -> None:
+        scope = rng.choice(("all", "area", "celula"))
+        params = {"scope": scope}
+        options = self.catalogs.get("area_tren_coe" if scope == "area" else "celulas_dep", [])
+        if scope != "all" and options:
+            params["filter_value"] = rng.choice(options)
+        await self._call("GET /metrics", "GET", f"/metrics?{urlencode(params)}")
+
+    async def explorer(self, rng: random.Random) -> None:
+        query = f"?{urlencode({'q': rng.choice(SEARCH_TERMS)})}" if rng.random() < 0.5 else ""
+        await self._call("GET /projects", "GET", f"/projects{query}")
+        await self._call("GET /projects/{nombre}", "GET", f"/projects/{quote(rng.choice(self.names), safe='')}")
+
+    async def mesa(self, rng: random.Random) -> None:
+        detail = await self._call("GET /projects/{nombre}", "GET", f"/projects/{quote(rng.choice(self.names), safe='')}")
+        if not detail.get("found"):
+            return
+        row = detail["fila"]
+        deps = [{"equipo": d["equipo"], "codigo": d["FLAG"], "descripcion": d["descripcion"]} for d in detail["detalles"]]
+        if deps:
+            flip = rng.randrange(len(deps))
+            deps[flip]["codigo"] = "L" if deps[flip]["codigo"] == "P" else "P"
+        avance = round(rng.random(), 3)
+        payload = {"avance": avance, "estimado": round(rng.uniform(0.3, 1.0), 3), "dependencias": deps}
+        await self._call("PUT /projects/{row}", "PUT", f"/projects/{row}", payload)
+        self.written[row].append(avance)
+
+    async def feedback(self, rng: random.Random) -> None:
+        await self._call("POST /suggestions", "POST", "/suggestions", {"usuario": self.tag, "texto": f"carga {rng.random():.6f}"})
+        self.suggestions_ok += 1
+
+    # -- driver --------------------------------------------------------------
+
+    async def _user(self, idx: int, deadline: float, budget: List[int]) -> None:
+        rng = random.Random(self.seed * 1000 + idx)
+        names = list(self.mix)
+        weights = [self.mix[n] for n in names]
+        while time.perf_counter() < deadline:
+            if budget[0] <= 0:
+                return
+            budget[0] -= 1
+            scenario = rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                await getattr(self, scenario)(rng)
+            except _RequestFailed:
+                self.scenario_errors[scenario] += 1
+            self.scenario_samples[scenario].append(time.perf_counter() - start)
+            if self.think:
+                await asyncio.sleep(rng.expovariate(1 / self.think))
+
+    async def run(self, duration: float, max_iterations: Optional[int]) -> dict:
+        await self.bootstrap()
+        self.samples.clear()
+        self.statuses.clear()
+        budget = [max_iterations if max_iterations else float("inf")]
+        start = time.perf_counter()
+        await asyncio.gather(*(self._user(i, start + duration, budget) for i in range(self.concurrency)))
+        return self.report(time.perf_counter() - start)
+
+    def report(self, wall: float) -> dict:
+        routes = {}
+        total = errors = 0
+        for route, samples in sorted(self.samples.items()):
+            statuses = self.statuses[route]
+            failed = sum(n for status, n in statuses.items() if not 200 <= status < 300)
+            total += len(samples)
+            errors += failed
+            routes[route] = {
+                **summarize(samples),
+                "requests_per_sec": round(len(samples) / wall, 2) if wall else 0.0,
+                "errors": failed,
+                "error_rate": round(failed / len(samples), 4) if samples else 0.0,
+                "statuses": {str(k): v for k, v in sorted(statuses.items())},
+            }
+        scenarios = {
+            name: {**summarize(samples), "errors": self.scenario_errors[name]}
+            for name, samples in sorted(self.scenario_samples.items())
+        }
+        return {
+            "wall_seconds": round(wall, 3),
+            "concurrency": self.concurrency,
+            "mix": self.mix,
+            "requests": total,
+            "requests_per_sec": round(total / wall, 2) if wall else 0.0,
+            "errors": errors,
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "routes": routes,
+            "scenarios": scenarios,
+            "tag": self.tag,
+            "written": {str(row): values for row, values in self.written.items()},
+            "suggestions_ok": self.suggestions_ok,
+        }
+
+
+class _RequestFailed(Exception):
+    def __init__(self, route: str, status: int):
+        super().__init__(f"{route} -> {status}")
+        self.status = status
+
+
+# ---------------------------------------------------------------------------
+# Integrity check
+# ---------------------------------------------------------------------------
+
+def check_integrity(workbook: Path, report: dict, suggestions_log: Optional[Path] = None) -> dict:
+    """Check *workbook* against what the run in *report* got acknowledged."""
+    from .config import FLAG_END_COL, FLAG_START_COL
+    from .excel import to_num_cell
+    from .snapshot import build_snapshot
+
+    problems: List[str] = []
+    try:
+        snap = build_snapshot(Path(workbook))
+    except Exception as exc:  # the point is to report, not to crash
+        return {"ok": False, "problems": [f"El workbook no se pudo abrir: {exc}"]}
+
+    id_pos = snap.col("ID")
+    seen: Dict[int, int] = {}
+    rows = {}
+    for row, values in snap.iter_rows():
+        rows[row] = values
+        raw = values[id_pos]
+        if isinstance(raw, (int, float)):
+            if int(raw) in seen:
+                problems.append(f"ID {int(raw)} duplicado en filas {seen[int(raw)]} y {row}.")
+            seen.setdefault(int(raw), row)
+
+    av_pos, est_pos, pct_pos = (snap.col(f) for f in ("AVANCE", "ESTIMADO_AVANCE", "PORC_CUMPLIMIENTO"))
+    totals = [snap.col(f) for f in ("TOTAL_DEP", "TOTAL_L", "TOTAL_P")]
+    for row_text, written in report.get("written", {}).items():
+        row = int(row_text)
+        values = rows.get(row)
+        if values is None:
+            problems.append(f"La fila editada {row} ya no existe.")
+            continue
+        avance = to_num_cell(values[av_pos])
+        if not any(abs(avance - w) < 1e-9 for w in written):
+            problems.append(f"Fila {row}: AVANCE {avance} no coincide con ningún valor escrito.")
+        estimado = to_num_cell(values[est_pos])
+        pct = to_num_cell(values[pct_pos])
+        if abs(pct - (avance / estimado if estimado > 0 else 0.0)) > 1e-9:
+            problems.append(f"Fila {row}: PORC_CUMPLIMIENTO {pct} no es AVANCE/ESTIMADO.")
+        flags = [str(v).strip().upper() for v in values[FLAG_START_COL - 1:FLAG_END_COL] if v is not None]
+        expected = (
+            sum(1 for f in flags if f in ("P", "L")),
+            sum(1 for f in flags if f == "L"),
+            sum(1 for f in flags if f == "P"),
+        )
+        actual = tuple(int(to_num_cell(values[pos])) for pos in totals)
+        if actual != expected:
+            problems.append(f"Fila {row}: CN:CP {actual} no cuadra con las banderas {expected}.")
+
+    logged = None
+    if suggestions_log is not None:
+        logged = 0
+        if Path(suggestions_log).exists():
+            with open(suggestions_log, encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        logged += json.loads(line).get("usuario") == report["tag"]
+                    except ValueError:
+                        problems.append("Línea corrupta en el log de sugerencias.")
+        if logged != report.get("suggestions_ok", 0):
+            problems.append(f"Sugerencias aceptadas {report.get('suggestions_ok', 0)}, registradas {logged}.")
+
+    return {
+        "ok": not problems,
+        "rows": len(rows),
+        "edited_rows": len(report.get("written", {})),
+        "suggestions_logged": logged,
+        "problems": problems[:50],
+    }
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def _print_summary(report: dict) -> None:
+    out = sys.stderr
+    print(
+        f"\n{report['requests']} peticiones en {report['wall_seconds']} s "
+        f"({report['requests_per_sec']} req/s), errores {report['errors']} ({report['error_rate']:.2%})",
+        file=out,
+    )
+    print(f"{'ruta':<26}{'n':>7}{'req/s':>9}{'p50':>10}{'p95':>10}{'p99':>10}{'err':>6}", file=out)
+    for route, r in report["routes"].items():
+        print(
+            f"{route:<26}{r['n']:>7}{r['requests_per_sec']:>9}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}{r['errors']:>6}",
+            file=out,
+        )
+    integrity = report.get("integrity")
+    if integrity:
+        print(f"Integridad: {'OK' if integrity['ok'] else 'FALLÓ'}", file=out)
+        for problem in integrity["problems"]:
+            print(f"  - {problem}", file=out)
+
+
+def _run(client, args, tag: str) -> dict:
+    mix = parse_mix(args.mix)
+    run = LoadRun(client, mix, args.concurrency, args.seed, args.think_ms / 1000, tag)
+    loop = getattr(client, "loop", None) or asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(run.run(args.duration, args.iterations))
+    finally:
+        loop.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m gd.loadtest", description="Prueba de carga concurrente de la API de gd.")
+    parser.add_argument("--url", help="servidor a probar; sin esto la app corre en proceso")
+    parser.add_argument("--workbook", type=Path, help="workbook a copiar (en proceso) o a verificar (con --url)")
+    parser.add_argument("--rows", type=int, default=5000, help="filas del workbook generado si no hay --workbook")
+    parser.add_argument("--suggestions-log", type=Path, help="log de sugerencias del servidor (con --url)")
+    parser.add_argument("--mix", help="pesos, p. ej. dashboard=40,explorer=35,mesa=15,feedback=10")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30.0, help="segundos")
+    parser.add_argument("--iterations", type=int, help="máximo de iteraciones de escenario (además de --duration)")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="pausa media entre iteraciones por usuario")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", type=Path, default=Path(tempfile.gettempdir()) / "gd-bench")
+    parser.add_argument("--output", type=Path, help="archivo JSON del reporte")
+    parser.add_argument("--keep", action="store_true", help="conservar la copia del workbook usada")
+    parser.add_argument("--child", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    try:
+        parse_mix(args.mix)
+    except ValueError as exc:
+        parser.error(str(exc))
+    tag = f"loadtest-{os.getpid()}-{int(time.time())}"
+
+    if args.child:
+        # In-process target: GD_EXCEL_PATH was set by the parent.
+        from . import api, service
+
+        try:
+            report = _run(AsgiClient(api.app), args, os.environ.get("GD_LOADTEST_TAG", tag))
+        finally:
+            service.shutdown_executors()
+        args.child.write_text(json.dumps(report))
+        return 0
+
+    run_dir = None
+    if args.url:
+        client = HttpClient(args.url, args.concurrency)
+        try:
+            report = _run(client, args, tag)
+        finally:
+            client.close()
+        workbook, suggestions_log = args.workbook, args.suggestions_log
+        if workbook is not None and suggestions_log is None:
+            suggestions_log = workbook.with_name(f"{workbook.stem}.sugerencias.jsonl")
+    else:
+        args.workdir.mkdir(parents=True, exist_ok=True)
+        source = args.workbook or fixture_path(args.workdir, args.rows, args.seed)
+        run_dir = Path(tempfile.mkdtemp(prefix="load-", dir=args.workdir))
+        workbook = run_dir / source.name
+        shutil.copy2(source, workbook)
+        suggestions_log = run_dir / "sugerencias.jsonl"
+        out = run_dir / "report.json"
+        env = dict(
+            os.environ,
+            GD_EXCEL_PATH=str(workbook),
+            GD_SUGGESTIONS_PATH=str(suggestions_log),
+            GD_SUGGESTIONS_SYNC_SECONDS="0",
+            GD_EVENTS_POLL_SECONDS="0",
+            GD_LOADTEST_TAG=tag,
+        )
+        cmd = [sys.executable, "-m", "gd.loadtest", "--child", str(out)] + list(argv if argv is not None else sys.argv[1:])
+        subprocess.run(cmd, env=env, check=True)
+        report = json.loads(out.read_text())
+
+    if workbook is not None:
+        report["integrity"] = check_integrity(workbook, report, suggestions_log)
+    if run_dir is not None:
+        if args.keep:
+            report["workbook"] = str(workbook)
+        else:
+            shutil.rmtree(run_dir, ignore_errors=True)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        args.output.write_text(text)
+    else:
+        print(text)
+    _print_summary(report)
+    return 0 if report.get("integrity", {"ok": True})["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,12 +11,20 @@ from .excel import (
     load_workbook,
     to_num_cell,
 )
+from .snapshot import get_snapshot
+from .telemetry import rows_scanned, timed
 
 
+def _flag_set(value) -> bool:
+    return bool(value) and str(value).strip().upper() in ("P", "L")
+
+
+@timed("compute")
 def compute_metrics(scope: str = "all", filter_value: str | None = None, dep_mapping: dict | None = None, celula_tren_map: dict | None = None, path=EXCEL_PATH):
     wb = load_workbook(path)
     ws = get_ws_proyectos(wb)
     header_row = get_header_row_proyectos(ws)
+    rows_scanned("metrics", ws.max_row - START_ROW_PROYECTOS + 1)
 
     name_col_idx = column_index_from_string(COLS["NOMBRE_PROYECTO"])
     prior_col_idx = column_index_from_string(COLS["PRIORIZADO"])
@@ -99,6 +107,16 @@ def compute_metrics(scope: str = "all", filter_value: str | None = None, dep_map
             no_pri_count += 1
             no_pri_avance_sum += av_val
 
+    return _metrics_payload(
+        total_projects, total_dep, total_L, total_P, sum_avance,
+        pri_count, pri_avance_sum, no_pri_count, no_pri_avance_sum,
+    )
+
+
+def _metrics_payload(
+    total_projects, total_dep, total_L, total_P, sum_avance,
+    pri_count, pri_avance_sum, no_pri_count, no_pri_avance_sum,
+):
     avg_avance = (sum_avance / total_projects) if total_projects > 0 else 0.0
     avg_pri = (pri_avance_sum / pri_count) if pri_count > 0 else 0.0
     avg_no_pri = (no_pri_avance_sum / no_pri_count) if no_pri_count > 0 else 0.0
@@ -115,3 +133,70 @@ def compute_metrics(scope: str = "all", filter_value: str | None = None, dep_map
         "avg_no_pri": float(avg_no_pri),
         "num_pri": int(pri_count),
     }
+
+
+@timed("compute")
+def compute_metrics_from_snapshot(snap, scope: str = "all", filter_value: str | None = None, dep_mapping: dict | None = None, celula_tren_map: dict | None = None):
+    """``compute_metrics`` over an already parsed ``ProjectSnapshot``.
+
+    Reads the snapshot's ``ProjectRecord``s, so numeric cells are decoded once
+    per workbook version rather than on every call.
+    """
+    # Flag columns of the células whose tren is the requested area.
+    area_positions = None
+    if scope == "area" and filter_value:
+        celula_tren_map = celula_tren_map or {}
+        wanted = str(filter_value).strip()
+        area_positions = []
+        for equipo in (dep_mapping or {}).keys():
+            tren_val = celula_tren_map.get(equipo)
+            pos = snap.flag_col(equipo)
+            if pos is not None and tren_val and str(tren_val).strip() == wanted:
+                area_positions.append(pos)
+
+    cel_pos = None
+    if scope == "celula" and filter_value:
+        cel_pos = snap.flag_col(filter_value)
+
+    total_projects = 0
+    total_dep = total_L = total_P = sum_avance = 0.0
+    pri_count = no_pri_count = 0
+    pri_avance_sum = no_pri_avance_sum = 0.0
+
+    records = snap.records()
+    rows_scanned("metrics", len(records))
+    for rec in records:
+        if not rec.nombre:
+            continue
+        values = rec.values
+        if area_positions is not None and not any(_flag_set(values[pos]) for pos in area_positions):
+            continue
+        if scope == "celula" and filter_value and (cel_pos is None or not _flag_set(values[cel_pos])):
+            continue
+
+        total_projects += 1
+        total_dep += rec.total_dep
+        total_L += rec.total_L
+        total_P += rec.total_P
+
+        av_val = rec.avance
+        sum_avance += av_val
+
+        if rec.priorizado == "SI":
+            pri_count += 1
+            pri_avance_sum += av_val
+        else:
+            no_pri_count += 1
+            no_pri_avance_sum += av_val
+
+    return _metrics_payload(
+        total_projects, total_dep, total_L, total_P, sum_avance,
+        pri_count, pri_avance_sum, no_pri_count, no_pri_avance_sum,
+    )
+
+
+def compute_metrics_cached(scope: str = "all", filter_value: str | None = None, dep_mapping: dict | None = None, celula_tren_map: dict | None = None, path=EXCEL_PATH, snap=None):
+    """``compute_metrics`` from the cached snapshot of *path* (what the API serves)."""
+    return compute_metrics_from_snapshot(
+        snap or get_snapshot(path), scope, filter_value, dep_mapping, celula_tren_map
+    )
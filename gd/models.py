@@ -2,7 +2,12 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import ClassVar, Iterator, List, Optional, Tuple
+
+from openpyxl.utils import column_index_from_string
+
+from .config import COLS
+from .excel import to_num_cell
 
 
 @dataclass
@@ -29,23 +34,31 @@ class Project:
     contribucion: float | None = None
     iniciativa: Optional[str] = None
 
+    # COLS field -> attribute, in the order the row is written.
+    ROW_FIELDS: ClassVar[Tuple[Tuple[str, str], ...]] = (
+        ("NOMBRE_PROYECTO", "nombre"),
+        ("ESTADO_PROYECTO", "estado"),
+        ("Q_RADICADO", "q_radicado"),
+        ("PRIORIZADO", "priorizado"),
+        ("RESPONSABLE_PROYECTO", "responsable"),
+        ("AREA_SOLICITANTE", "area_solicitante"),
+        ("FECHA_INICIO", "fecha_inicio"),
+        ("FECHA_ESTIMADA_CIERRE", "fecha_estimada_cierre"),
+        ("LINEA_BASE", "linea_base"),
+        ("LINEA_BASE_Q_GESTION", "linea_base_q_gestion"),
+        ("AVANCE", "avance"),
+        ("ESTIMADO_AVANCE", "estimado_avance"),
+        ("CONTRIBUCION", "contribucion"),
+        ("INICIATIVA_ESTRATEGICA", "iniciativa"),
+    )
+
+    def iter_row_values(self) -> Iterator[Tuple[str, object]]:
+        """``(COLS field, value)`` pairs for the row, without building a dict."""
+        for field_name, attr in self.ROW_FIELDS:
+            yield field_name, getattr(self, attr)
+
     def to_row_mapping(self):
-        return {
-            "NOMBRE_PROYECTO": self.nombre,
-            "ESTADO_PROYECTO": self.estado,
-            "Q_RADICADO": self.q_radicado,
-            "PRIORIZADO": self.priorizado,
-            "RESPONSABLE_PROYECTO": self.responsable,
-            "AREA_SOLICITANTE": self.area_solicitante,
-            "FECHA_INICIO": self.fecha_inicio,
-            "FECHA_ESTIMADA_CIERRE": self.fecha_estimada_cierre,
-            "LINEA_BASE": self.linea_base,
-            "LINEA_BASE_Q_GESTION": self.linea_base_q_gestion,
-            "AVANCE": self.avance,
-            "ESTIMADO_AVANCE": self.estimado_avance,
-            "CONTRIBUCION": self.contribucion,
-            "INICIATIVA_ESTRATEGICA": self.iniciativa,
-        }
+        return dict(self.iter_row_values())
 
 
 @dataclass
@@ -59,3 +72,91 @@ class Catalogs:
     iniciativas: List[str] = field(default_factory=list)
     dependency_mapping: dict = field(default_factory=dict)
     celula_tren_map: dict = field(default_factory=dict)
+
+
+def _position(field_name: str) -> int:
+    return column_index_from_string(COLS[field_name]) - 1
+
+
+def _decoded(field_name: str) -> property:
+    """Property returning ``to_num_cell`` of *field_name*, decoded on first access."""
+    pos = _position(field_name)
+    slot = "_" + field_name.lower()
+
+    def get(self) -> float:
+        value = getattr(self, slot, None)
+        if value is None:
+            value = to_num_cell(self.values[pos])
+            setattr(self, slot, value)
+        return value
+
+    return property(get, doc=f"``to_num_cell`` of {field_name}, cached.")
+
+
+def _raw(field_name: str) -> property:
+    pos = _position(field_name)
+    return property(lambda self: self.values[pos], doc=f"Raw {field_name} cell value.")
+
+
+class ProjectRecord:
+    """One ProyectosTI row as a view over a snapshot's value tuple.
+
+    Records hold the row number and the snapshot's (shared) tuple; numeric
+    cells are decoded with ``to_num_cell`` the first time they are read and
+    kept in a slot, so every request served from the same snapshot reuses the
+    decoded values instead of re-parsing "0,5" or "45%". Get them from
+    ``ProjectSnapshot.records()``.
+    """
+
+    NUMERIC_FIELDS: ClassVar[Tuple[str, ...]] = (
+        "LINEA_BASE", "AVANCE", "ESTIMADO_AVANCE", "PORC_CUMPLIMIENTO", "CONTRIBUCION",
+        "TOTAL_DEP", "TOTAL_L", "TOTAL_P", "CUBRIMIENTO_DEP", "RATING_PO_SYNC",
+    )
+
+    __slots__ = ("row", "values", "_priorizado") + tuple("_" + f.lower() for f in NUMERIC_FIELDS)
+
+    def __init__(self, row: int, values: tuple):
+        self.row = row
+        self.values = values
+
+    def __repr__(self) -> str:
+        return f"ProjectRecord(row={self.row}, nombre={self.nombre!r})"
+
+    id = _raw("ID")
+    q_radicado = _raw("Q_RADICADO")
+    estado = _raw("ESTADO_PROYECTO")
+    nombre = _raw("NOMBRE_PROYECTO")
+    descripcion = _raw("DESCRIPCION_PROYECTO")
+    iniciativa = _raw("INICIATIVA_ESTRATEGICA")
+
+    linea_base = _decoded("LINEA_BASE")
+    avance = _decoded("AVANCE")
+    estimado = _decoded("ESTIMADO_AVANCE")
+    porc_cumplimiento = _decoded("PORC_CUMPLIMIENTO")
+    contribucion = _decoded("CONTRIBUCION")
+    total_dep = _decoded("TOTAL_DEP")
+    total_L = _decoded("TOTAL_L")
+    total_P = _decoded("TOTAL_P")
+    cubrimiento = _decoded("CUBRIMIENTO_DEP")
+    rating_po = _decoded("RATING_PO_SYNC")
+
+    @property
+    def priorizado(self) -> str:
+        """PRIORIZADO stripped and upper-cased ("" when empty), cached."""
+        value = getattr(self, "_priorizado", None)
+        if value is None:
+            raw = self.values[_PRIORIZADO_POS]
+            value = str(raw).strip().upper() if raw not in (None, "") else ""
+            self._priorizado = value
+        return value
+
+    def flag(self, pos: int) -> str:
+        """The "P" / "L" flag at 0-based *pos*, or "" for anything else."""
+        value = self.values[pos]
+        if not value:
+            return ""
+        flag = str(value).strip().upper()
+        return flag if flag in ("P", "L") else ""
+
+
+_PRIORIZADO_POS = _position("PRIORIZADO")
@@ -0,0 +1,208 @@
+"""Opt-in, per-request profiling.
+
+Enabled with ``GD_PROFILING=1``; a request then asks for a profile with the
+``X-GD-Profile: 1`` header or ``?profile=1``. The work that request runs on the
+API executors is profiled with cProfile (process-pool offloads and request
+coalescing are bypassed for it so the profile shows the real work) and the
+report — top functions plus time split between openpyxl, gd and everything
+else — is kept in memory, optionally written to ``GD_PROFILE_DIR``, and
+linked from the ``X-GD-Profile-Id`` response header.
+
+With profiling disabled the middleware is not installed and the executor
+hooks reduce to one context-variable lookup.
+"""
+from __future__ import annotations
+
+import contextvars
+import cProfile
+import functools
+import itertools
+import json
+import os
+import pstats
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from urllib.parse import parse_qs
+
+from .config import PROFILE_DIR, PROFILE_TOP
+
+PROFILE_HEADER = "x-gd-profile"
+PROFILE_ID_HEADER = "X-GD-Profile-Id"
+MAX_REPORTS = 50
+
+_GD_DIR = os.path.dirname(os.path.abspath(__file__)) + os.sep
+
+_current: contextvars.ContextVar[Optional["RequestProfile"]] = contextvars.ContextVar("gd_profile", default=None)
+
+
+def _category(filename: str) -> str:
+    if f"{os.sep}openpyxl{os.sep}" in filename:
+        return "openpyxl"
+    if filename.startswith(_GD_DIR):
+        return "gd"
+    return "otros"
+
+
+class RequestProfile:
+    """cProfile data for one request, accumulated across the jobs it runs."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, method: str, path: str):
+        self.id = f"{int(time.time())}-{next(self._ids)}"
+        self.method = method
+        self.path = path
+        self.started = time.time()
+        self.wall = 0.0
+        self.profiled = 0.0
+        self._profiler = cProfile.Profile()
+        # One cProfile instance can only be active on one thread at a time.
+        self._lock = threading.Lock()
+
+    def wrap(self, fn: Callable) -> Callable:
+        """Run *fn* profiled, with this profile as the current one in that thread."""
+
+        @functools.wraps(fn)
+        def profiled(*args, **kwargs):
+            with self._lock:
+                token = _current.set(self)
+                start = time.perf_counter()
+                self._profiler.enable()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self._profiler.disable()
+                    self.profiled += time.perf_counter() - start
+                    _current.reset(token)
+
+        return profiled
+
+    def report(self, top: int = PROFILE_TOP) -> dict:
+        self._profiler.create_stats()
+        stats = pstats.Stats(self._profiler)
+        by_category: Dict[str, float] = {"openpyxl": 0.0, "gd": 0.0, "otros": 0.0}
+        functions: List[dict] = []
+        for (filename, lineno, name), (cc, nc, tottime, cumtime, _callers) in stats.stats.items():
+            by_category[_category(filename)] += tottime
+            functions.append(
+                {
+                    "function": f"{os.path.basename(filename)}:{lineno}({name})",
+                    "category": _category(filename),
+                    "calls": nc,
+                    "tottime": round(tottime, 6),
+                    "cumtime": round(cumtime, 6),
+                }
+            )
+        functions.sort(key=lambda f: f["tottime"], reverse=True)
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "started": self.started,
+            "wall_seconds": round(self.wall, 6),
+            "profiled_seconds": round(self.profiled, 6),
+            "seconds_by_category": {k: round(v, 6) for k, v in by_category.items()},
+            "top": functions[:top],
+        }
+
+
+def current() -> Optional[RequestProfile]:
+    """The profile of the request being served, if it asked for one."""
+    return _current.get()
+
+
+def wrap_for_current(fn: Callable) -> Callable:
+    """Hook for executors: profile *fn* when submitted on behalf of a profiled request."""
+    profile = _current.get()
+    return profile.wrap(fn) if profile is not None else fn
+
+
+# ---------------------------------------------------------------------------
+# Report storage
+# ---------------------------------------------------------------------------
+
+_reports: "OrderedDict[str, dict]" = OrderedDict()
+_reports_lock = threading.Lock()
+
+
+def store_report(profile: RequestProfile) -> dict:
+    report = profile.report()
+    with _reports_lock:
+        _reports[report["id"]] = report
+        while len(_reports) > MAX_REPORTS:
+            _reports.popitem(last=False)
+    if PROFILE_DIR:
+        directory = Path(PROFILE_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"{report['id']}.json").write_text(json.dumps(report, ensure_ascii=False, indent=2))
+        profile._profiler.dump_stats(directory / f"{report['id']}.pstats")
+    return report
+
+
+def get_report(profile_id: str) -> Optional[dict]:
+    with _reports_lock:
+        return _reports.get(profile_id)
+
+
+def list_reports() -> List[dict]:
+    with _reports_lock:
+        return [
+            {k: r[k] for k in ("id", "method", "path", "started", "wall_seconds", "profiled_seconds")}
+            for r in reversed(_reports.values())
+        ]
+
+
+# ---------------------------------------------------------------------------
+# ASGI middleware
+# ---------------------------------------------------------------------------
+
+def _requested(scope) -> bool:
+    for name, value in scope.get("headers", ()):
+        if name == PROFILE_HEADER.encode() and value.strip() not in (b"", b"0"):
+            return True
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    return any(v not in ("", "0") for v in query.get("profile", ()))
+
+
+class ProfilingMiddleware:
+    """Profiles requests that ask for it; only installed when ``GD_PROFILING`` is on."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope.get("method", ""), scope.get("path", ""))
+
+        start = time.perf_counter()
+        stored = False
+
+        def finish():
+            nonlocal stored
+            if not stored:
+                stored = True
+                profile.wall = time.perf_counter() - start
+                store_report(profile)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                # The handler's work is done: store the report before the
+                # client can follow the header to it.
+                finish()
+                headers = list(message.get("headers", []))
+                headers.append((PROFILE_ID_HEADER.lower().encode(), profile.id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = _current.set(profile)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            finish()
@@ -1,51 +1,98 @@
 """Project CRUD helpers based on the Excel workbook."""
 from __future__ import annotations
 
-from typing import Iterable, Sequence
+from typing import Iterable, List, Sequence, Tuple
 
 from openpyxl.utils import column_index_from_string
 
 from .config import COLS, EXCEL_PATH, START_ROW_PROYECTOS
 from .dependencies import apply_dependencies_to_row
+from .events import publish
 from .excel import (
+    ROW_ID_ALLOCATOR,
     find_column_by_header_in_range,
     get_header_row_proyectos,
-    get_next_row_and_id,
     get_ws_proyectos,
     load_workbook,
+    save_workbook,
     to_num_cell,
+    workbook_lock,
 )
 from .models import Dependency, Project
+from .snapshot import get_snapshot
+from .telemetry import rows_scanned, timed
 
 
-def write_project_with_dependencies(project: Project, dep_list: Sequence[Dependency], dep_mapping: dict, path=EXCEL_PATH):
-    """Insert a new project row and apply dependencies + aggregates."""
-    wb = load_workbook(path)
-    ws = get_ws_proyectos(wb)
+_ID_COL = column_index_from_string(COLS["ID"])
+_ROW_COLS = {field: column_index_from_string(COLS[field]) for field, _attr in Project.ROW_FIELDS}
 
-    next_row, next_id = get_next_row_and_id(
-        ws, id_col_letter=COLS["ID"], start_row=START_ROW_PROYECTOS
-    )
 
-    row_data = project.to_row_mapping()
-    row_data["ID"] = next_id
+def _fill_new_row(ws, row: int, project_id: int, project: Project, dep_list: Sequence[Dependency], dep_mapping: dict) -> None:
+    ws.cell(row=row, column=_ID_COL).value = project_id
+    for field, value in project.iter_row_values():
+        ws.cell(row=row, column=_ROW_COLS[field]).value = value
 
-    for field, col_letter in COLS.items():
-        if field in row_data:
-            col_idx = column_index_from_string(col_letter)
-            ws.cell(row=next_row, column=col_idx).value = row_data.get(field)
+    apply_dependencies_to_row(ws, row, dep_list, dep_mapping)
 
-    apply_dependencies_to_row(ws, next_row, dep_list, dep_mapping)
 
-    wb.save(path)
+@timed("compute")
+def write_project_with_dependencies(project: Project, dep_list: Sequence[Dependency], dep_mapping: dict, path=EXCEL_PATH):
+    """Insert a new project row and apply dependencies + aggregates."""
+    with workbook_lock(path):
+        wb = load_workbook(path)
+        ws = get_ws_proyectos(wb)
+
+        next_row, next_id = ROW_ID_ALLOCATOR.allocate(ws, path)
+        try:
+            _fill_new_row(ws, next_row, next_id, project, dep_list, dep_mapping)
+            version = save_workbook(wb, path)
+        except Exception:
+            # The reserved row/ID never reached disk; rescan on the next insert.
+            ROW_ID_ALLOCATOR.invalidate(path)
+            raise
+    publish("project.inserted", version=version, path=path, row=next_row, id=next_id)
     return next_row, next_id
 
 
+@timed("compute")
+def write_projects_with_dependencies(
+    items: Iterable[Tuple[Project, Sequence[Dependency]]],
+    dep_mapping: dict,
+    path=EXCEL_PATH,
+) -> List[Tuple[int, int]]:
+    """Insert several ``(project, dep_list)`` rows with a single load and save.
+
+    Same result as calling ``write_project_with_dependencies`` for each item,
+    without rewriting the whole workbook once per project. Returns the
+    ``(row, id)`` pairs in input order.
+    """
+    inserted: List[Tuple[int, int]] = []
+    with workbook_lock(path):
+        wb = load_workbook(path)
+        ws = get_ws_proyectos(wb)
+        try:
+            for project, dep_list in items:
+                next_row, next_id = ROW_ID_ALLOCATOR.allocate(ws, path)
+                _fill_new_row(ws, next_row, next_id, project, dep_list, dep_mapping)
+                inserted.append((next_row, next_id))
+            if not inserted:
+                return inserted
+            version = save_workbook(wb, path)
+        except Exception:
+            ROW_ID_ALLOCATOR.invalidate(path)
+            raise
+    for row, project_id in inserted:
+        publish("project.inserted", version=version, path=path, row=row, id=project_id)
+    return inserted
+
+
+@timed("compute")
 def get_all_project_names(path=EXCEL_PATH):
     wb = load_workbook(path)
     ws = get_ws_proyectos(wb)
     name_col_idx = column_index_from_string(COLS["NOMBRE_PROYECTO"])
     names = set()
+    rows_scanned("project_names", ws.max_row - START_ROW_PROYECTOS + 1)
     for row in range(START_ROW_PROYECTOS, ws.max_row + 1):
         val = ws.cell(row=row, column=name_col_idx).value
         if val not in (None, ""):
@@ -53,6 +100,22 @@ def get_all_project_names(path=EXCEL_PATH):
     return sorted(names)
 
 
+def project_names_from_snapshot(snap):
+    """``get_all_project_names`` computed from a snapshot."""
+    names = set()
+    for rec in snap.records():
+        val = rec.nombre
+        if val not in (None, ""):
+            names.add(str(val).strip())
+    return sorted(names)
+
+
+def project_names(path=EXCEL_PATH, snap=None):
+    """``get_all_project_names`` from the cached snapshot (what the API serves)."""
+    return project_names_from_snapshot(snap or get_snapshot(path))
+
+
+@timed("compute")
 def summarize_by_equipo(equipo_name: str, dep_mapping: dict, path=EXCEL_PATH):
     wb = load_workbook(path)
     ws = get_ws_proyectos(wb)
@@ -70,6 +133,7 @@ def summarize_by_equipo(equipo_name: str, dep_mapping: dict, path=EXCEL_PATH):
     total = pendientes = negociadas = 0
     rows = []
 
+    rows_scanned("team", ws.max_row - START_ROW_PROYECTOS + 1)
     for row in range(START_ROW_PROYECTOS, ws.max_row + 1):
         flag = ws.cell(row=row, column=col_flag_idx).value
         if flag is None or str(flag).strip() == "":
@@ -100,6 +164,99 @@ def summarize_by_equipo(equipo_name: str, dep_mapping: dict, path=EXCEL_PATH):
     }
 
 
+def _pct(part: int, total: int) -> float:
+    return (part / total * 100) if total > 0 else 0.0
+
+
+@timed("compute")
+def summarize_all_equipos(
+    equipos: Sequence[str],
+    celula_tren_map: dict | None = None,
+    include_rows: bool = False,
+    rows_offset: int = 0,
+    rows_limit: int = 50,
+    path=EXCEL_PATH,
+    snap=None,
+):
+    """``summarize_by_equipo`` for every célula plus tren rollups, in one pass.
+
+    Rows are only materialised when ``include_rows`` is set, and then paginated
+    per team with ``rows_offset``/``rows_limit`` (``rows_total`` carries the
+    unpaginated count). Pass ``snap`` to read a specific snapshot instead of
+    the current one.
+    """
+    snap = snap or get_snapshot(path)
+    celula_tren_map = celula_tren_map or {}
+    name_pos = snap.col("NOMBRE_PROYECTO")
+    q_pos = snap.col("Q_RADICADO")
+
+    summaries = {}
+    tracked = []
+    for equipo in equipos:
+        pos = snap.flag_col(equipo)
+        if pos is None:
+            summaries[equipo] = {"found": False, "msg": f"No se encontró la columna '{equipo}' en R:BB."}
+            continue
+        summary = {"found": True, "equipo": equipo, "total": 0, "pendientes": 0, "negociadas": 0}
+        summaries[equipo] = summary
+        tracked.append((pos, summary, []))
+
+    rows_scanned("teams", len(snap.rows))
+    for row, values in snap.iter_rows():
+        for pos, summary, rows in tracked:
+            flag = values[pos]
+            if flag is None:
+                continue
+            flag_up = str(flag).strip().upper()
+            if flag_up not in ("P", "L"):
+                continue
+            summary["total"] += 1
+            if flag_up == "P":
+                summary["pendientes"] += 1
+            else:
+                summary["negociadas"] += 1
+            if include_rows:
+                rows.append((row, values, flag_up))
+
+    trenes = {}
+    for pos, summary, rows in tracked:
+        summary["pct_pendientes"] = _pct(summary["pendientes"], summary["total"])
+        if include_rows:
+            page = rows[rows_offset: rows_offset + rows_limit] if rows_limit >= 0 else rows[rows_offset:]
+            summary["rows_total"] = len(rows)
+            summary["rows"] = [
+                {
+                    "fila": row,
+                    "Q_RADICADO": values[q_pos],
+                    "PROYECTO": values[name_pos],
+                    "FLAG": flag_up,
+                }
+                for row, values, flag_up in page
+            ]
+
+        tren = celula_tren_map.get(summary["equipo"])
+        if not tren:
+            continue
+        tren = str(tren).strip()
+        agg = trenes.setdefault(
+            tren, {"tren": tren, "celulas": [], "total": 0, "pendientes": 0, "negociadas": 0}
+        )
+        agg["celulas"].append(summary["equipo"])
+        agg["total"] += summary["total"]
+        agg["pendientes"] += summary["pendientes"]
+        agg["negociadas"] += summary["negociadas"]
+
+    for agg in trenes.values():
+        agg["pct_pendientes"] = _pct(agg["pendientes"], agg["total"])
+
+    return {
+        "count": len(summaries),
+        "equipos": [summaries[e] for e in equipos],
+        "trenes": [trenes[t] for t in sorted(trenes)],
+    }
+
+
+@timed("compute")
 def summarize_by_proyecto(nombre_proyecto: str, dep_mapping: dict, path=EXCEL_PATH):
     wb = load_workbook(path)
     ws = get_ws_proyectos(wb)
@@ -114,6 +271,7 @@ def summarize_by_proyecto(nombre_proyecto: str, dep_mapping: dict, path=EXCEL_PA
         if val and str(val).strip() == nombre_proyecto:
             target_row = row
             break
+    rows_scanned("project", (target_row or ws.max_row) - START_ROW_PROYECTOS + 1)
 
     if not target_row:
         return {"found": False, "msg": f"No se encontró el proyecto '{nombre_proyecto}'."}
@@ -189,6 +347,135 @@ def summarize_by_proyecto(nombre_proyecto: str, dep_mapping: dict, path=EXCEL_PA
     }
 
 
+def _summarize_snapshot_row(rec, nombre: str, dep_columns):
+    """Build the ``summarize_by_proyecto`` payload for one ``ProjectRecord``."""
+    values = rec.values
+    detalles = []
+    for equipo, flag_pos, desc_pos in dep_columns:
+        flag = values[flag_pos]
+        if flag is None or str(flag).strip() == "":
+            continue
+        flag_up = str(flag).strip().upper()
+        if flag_up not in ("P", "L"):
+            continue
+        desc = (values[desc_pos] or "") if desc_pos is not None else ""
+        detalles.append({"equipo": equipo, "FLAG": flag_up, "descripcion": desc})
+
+    total = len(detalles)
+    pendientes = sum(1 for d in detalles if d["FLAG"] == "P")
+    negociadas = sum(1 for d in detalles if d["FLAG"] == "L")
+
+    return {
+        "found": True,
+        "fila": rec.row,
+        "proyecto": nombre,
+        "Q_RADICADO": rec.q_radicado,
+        "total_dep": total,
+        "pendientes": pendientes,
+        "negociadas": negociadas,
+        "pct_pendientes": _pct(pendientes, total),
+        "detalles": detalles,
+        "linea_base": rec.linea_base,
+        "avance": rec.avance,
+        "estimado": rec.estimado,
+        "total_dep_xl": rec.total_dep,
+        "total_L_xl": rec.total_L,
+        "total_P_xl": rec.total_P,
+        "cub_xl": rec.cubrimiento,
+    }
+
+
+@timed("compute")
+def summarize_projects(
+    nombres: Iterable[str] = (),
+    ids: Iterable[int] = (),
+    dep_mapping: dict | None = None,
+    path=EXCEL_PATH,
+    snap=None,
+):
+    """Batch ``summarize_by_proyecto`` by name and/or ID from one snapshot.
+
+    Items come back in request order (names first, then IDs), each tagged with
+    its ``query``; anything not found is reported as ``found: False`` in place
+    instead of failing the batch.
+    """
+    snap = snap or get_snapshot(path)
+    dep_mapping = dep_mapping or {}
+    nombres = [str(n) for n in nombres]
+    ids = list(ids)
+
+    wanted_names = set(nombres)
+    wanted_ids = set()
+    for raw in ids:
+        try:
+            wanted_ids.add(int(raw))
+        except (TypeError, ValueError):
+            continue
+
+    by_name = {}
+    by_id = {}
+    for rec in snap.records():
+        if len(by_name) == len(wanted_names) and len(by_id) == len(wanted_ids):
+            break
+        val = rec.nombre
+        if wanted_names and val:
+            key = str(val).strip()
+            if key in wanted_names and key not in by_name:
+                by_name[key] = rec
+        id_val = rec.id
+        if wanted_ids and isinstance(id_val, (int, float)):
+            key = int(id_val)
+            if key in wanted_ids and key not in by_id:
+                by_id[key] = rec
+
+    dep_columns = []
+    for equipo, desc_header in dep_mapping.items():
+        flag_pos = snap.flag_col(equipo)
+        if flag_pos is None:
+            continue
+        dep_columns.append((equipo, flag_pos, snap.desc_col(desc_header)))
+
+    items = []
+    for nombre in nombres:
+        hit = by_name.get(nombre)
+        if hit is None:
+            item = {"found": False, "msg": f"No se encontró el proyecto '{nombre}'."}
+        else:
+            item = _summarize_snapshot_row(hit, nombre, dep_columns)
+        items.append({"query": nombre, **item})
+
+    for raw in ids:
+        try:
+            hit = by_id.get(int(raw))
+        except (TypeError, ValueError):
+            hit = None
+        if hit is None:
+            item = {"found": False, "msg": f"No se encontró el proyecto con ID '{raw}'."}
+        else:
+            item = _summarize_snapshot_row(hit, str(hit.nombre or "").strip(), dep_columns)
+        items.append({"query": raw, **item})
+
+    found = sum(1 for item in items if item["found"])
+    return {"count": len(items), "found": found, "missing": len(items) - found, "items": items}
+
+
+def summarize_project(nombre_proyecto: str, dep_mapping: dict, path=EXCEL_PATH, snap=None):
+    """``summarize_by_proyecto`` answered from the cached snapshot."""
+    item = summarize_projects([nombre_proyecto], dep_mapping=dep_mapping, path=path, snap=snap)["items"][0]
+    item.pop("query", None)
+    return item
+
+
+def summarize_equipo(equipo_name: str, path=EXCEL_PATH, snap=None):
+    """``summarize_by_equipo`` answered from the cached snapshot."""
+    summary = summarize_all_equipos(
+        [equipo_name], include_rows=True, rows_limit=-1, path=path, snap=snap
+    )["equipos"][0]
+    summary.pop("rows_total", None)
+    return summary
+
+
+@timed("compute")
 def update_project_row_and_dependencies(
     row: int,
     avance: float | None,
@@ -197,30 +484,40 @@ def update_project_row_and_dependencies(
     dep_mapping: dict,
     path=EXCEL_PATH,
 ):
-    wb = load_workbook(path)
-    ws = get_ws_proyectos(wb)
-
     lb_col = column_index_from_string(COLS["LINEA_BASE"])
     av_col = column_index_from_string(COLS["AVANCE"])
     est_col = column_index_from_string(COLS["ESTIMADO_AVANCE"])
     pct_col = column_index_from_string(COLS["PORC_CUMPLIMIENTO"])
 
-    linea_base = to_num_cell(ws.cell(row=row, column=lb_col).value)
-    old_av = to_num_cell(ws.cell(row=row, column=av_col).value)
-    old_es = to_num_cell(ws.cell(row=row, column=est_col).value)
+    with workbook_lock(path):
+        wb = load_workbook(path)
+        ws = get_ws_proyectos(wb)
 
-    new_av = float(avance) if avance is not None else float(old_av)
-    new_es = float(estimado) if estimado is not None else float(old_es)
+        linea_base = to_num_cell(ws.cell(row=row, column=lb_col).value)
+        old_av = to_num_cell(ws.cell(row=row, column=av_col).value)
+        old_es = to_num_cell(ws.cell(row=row, column=est_col).value)
 
-    ws.cell(row=row, column=av_col).value = new_av
-    ws.cell(row=row, column=est_col).value = new_es
+        new_av = float(avance) if avance is not None else float(old_av)
+        new_es = float(estimado) if estimado is not None else float(old_es)
 
-    pct_cumpl = (new_av / new_es) if new_es > 0 else 0.0
-    ws.cell(row=row, column=pct_col).value = pct_cumpl
+        pct_cumpl = (new_av / new_es) if new_es > 0 else 0.0
 
-    apply_dependencies_to_row(ws, row, dep_list, dep_mapping)
+        fields_written = 0
+        for col_idx, value in ((av_col, new_av), (est_col, new_es), (pct_col, pct_cumpl)):
+            cell = ws.cell(row=row, column=col_idx)
+            if cell.value != value:
+                cell.value = value
+                fields_written += 1
 
-    wb.save(path)
+        deps_written = apply_dependencies_to_row(ws, row, dep_list, dep_mapping)
+
+        # Nothing changed: skip the full-workbook rewrite.
+        version = save_workbook(wb, path) if fields_written or deps_written else None
+
+    if fields_written:
+        publish("project.updated", version=version, path=path, row=row)
+    if deps_written:
+        publish("dependencies.changed", version=version, path=path, row=row)
 
     var_vs_lb = new_av - float(linea_base)
     return {
@@ -230,3 +527,32 @@ def update_project_row_and_dependencies(
         "pct_cumpl": pct_cumpl * 100,
         "var_vs_lb_pp": var_vs_lb * 100,
     }
+
+
+@timed("compute")
+def update_row_cells(row: int, values: dict, path=EXCEL_PATH) -> int:
+    """Write ``{COLS field: value}`` into one ProyectosTI row.
+
+    Goes through the same lock/save path as the other writers, only touches
+    cells whose value changes and skips the save when nothing did. Returns the
+    number of cells written.
+    """
+    if row < START_ROW_PROYECTOS:
+        raise ValueError(f"La fila {row} no pertenece al bloque de proyectos (desde {START_ROW_PROYECTOS}).")
+
+    with workbook_lock(path):
+        wb = load_workbook(path)
+        ws = get_ws_proyectos(wb)
+
+        changed = []
+        for field, value in values.items():
+            cell = ws.cell(row=row, column=column_index_from_string(COLS[field]))
+            if cell.value != value:
+                cell.value = value
+                changed.append(field)
+
+        if changed:
+            version = save_workbook(wb, path)
+    if changed:
+        publish("project.updated", version=version, path=path, row=row, fields=changed)
+    return len(changed)
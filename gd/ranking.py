@@ -0,0 +1,205 @@
+"""Top-k prioritisation for the Mesa de Expertos.
+
+Every project on the expert board gets a score from four components, each
+scaled to 0–1:
+
+- ``contribucion``: CONTRIBUCION relative to the largest on the board;
+- ``priorizado``: 1 when PRIORIZADO is "SI";
+- ``rating_po``: RATING_PO_SYNC / 5;
+- ``pendientes``: pending (P) dependencies relative to the most blocked
+  project. This component *subtracts* from the score.
+
+``score = Σ peso × componente`` with the ``pendientes`` term negated. The
+default weights come from ``GD_RANKING_WEIGHTS`` (``"contribucion=0.4,..."``)
+and a request may override them; ``top_k`` picks the best N with a heap
+instead of sorting the whole board.
+
+The candidates live in ``RANKING``, one immutable state per workbook. It is
+built from the memoised boards, and the board writers patch it in place when a
+rating or expert decision is saved (rebasing it onto the new version, like
+``RowIdAllocator``), so ranks follow the session's edits without re-parsing
+the workbook.
+"""
+from __future__ import annotations
+
+import heapq
+import threading
+from dataclasses import asdict, dataclass, fields, replace
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+from .config import RANKING_WEIGHTS
+from .excel import workbook_key
+from .telemetry import cache_lookup
+
+DEFAULT_TOP = 20
+RATING_MAX = 5
+
+
+@dataclass(frozen=True)
+class ScoreWeights:
+    contribucion: float = 0.4
+    priorizado: float = 0.25
+    rating_po: float = 0.2
+    pendientes: float = 0.15
+
+    @classmethod
+    def parse(cls, text: Optional[str], base: Optional["ScoreWeights"] = None) -> "ScoreWeights":
+        """``"contribucion=0.5,pendientes=0"`` over *base*; unknown names are an error."""
+        base = base or cls()
+        if not text:
+            return base
+        names = [f.name for f in fields(cls)]
+        changes = {}
+        for part in filter(None, (p.strip() for p in text.split(","))):
+            name, _, weight = part.partition("=")
+            name = name.strip()
+            if name not in names:
+                raise ValueError(f"Peso desconocido '{name}'; usa {', '.join(names)}.")
+            try:
+                changes[name] = float(weight)
+            except ValueError:
+                raise ValueError(f"El peso de '{name}' debe ser numérico.") from None
+        return replace(base, **changes)
+
+
+DEFAULT_WEIGHTS = ScoreWeights.parse(RANKING_WEIGHTS)
+
+
+@dataclass(frozen=True)
+class Candidate:
+    row: int
+    nombre: str
+    estado: str
+    priorizado: bool
+    contribucion: float
+    rating_po: int
+    pendientes: int
+    celulas: FrozenSet[str]  # células with a P/L flag, for the tren filter
+
+
+@dataclass(frozen=True)
+class RankingState:
+    version: str
+    token: tuple
+    candidates: Dict[int, Candidate]  # by Excel row
+    max_contribucion: float
+    max_pendientes: int
+
+    @classmethod
+    def build(cls, version: str, token: tuple, candidates: Dict[int, Candidate]) -> "RankingState":
+        return cls(
+            version=version,
+            token=token,
+            candidates=candidates,
+            max_contribucion=max((c.contribucion for c in candidates.values()), default=0.0),
+            max_pendientes=max((c.pendientes for c in candidates.values()), default=0),
+        )
+
+    def components(self, cand: Candidate) -> Dict[str, float]:
+        return {
+            "contribucion": cand.contribucion / self.max_contribucion if self.max_contribucion > 0 else 0.0,
+            "priorizado": 1.0 if cand.priorizado else 0.0,
+            "rating_po": cand.rating_po / RATING_MAX,
+            "pendientes": cand.pendientes / self.max_pendientes if self.max_pendientes > 0 else 0.0,
+        }
+
+    def score(self, cand: Candidate, weights: ScoreWeights) -> float:
+        contrib = cand.contribucion / self.max_contribucion if self.max_contribucion > 0 else 0.0
+        pend = cand.pendientes / self.max_pendientes if self.max_pendientes > 0 else 0.0
+        return (
+            weights.contribucion * contrib
+            + (weights.priorizado if cand.priorizado else 0.0)
+            + weights.rating_po * cand.rating_po / RATING_MAX
+            - weights.pendientes * pend
+        )
+
+
+class RankingIndex:
+    """Ranking candidates per workbook, kept in step with our own saves."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states: Dict[object, RankingState] = {}
+
+    def lookup(self, path, version: str, token: tuple) -> Optional[RankingState]:
+        with self._lock:
+            state = self._states.get(workbook_key(path))
+        hit = state is not None and state.version == version and state.token == token
+        cache_lookup("ranking", hit)
+        return state if hit else None
+
+    def build(self, path, version: str, token: tuple, candidates: Iterable[Candidate]) -> RankingState:
+        state = RankingState.build(version, token, {c.row: c for c in candidates})
+        with self._lock:
+            self._states[workbook_key(path)] = state
+        return state
+
+    def update(self, path, old_version: str, new_version: str, row: int, **changes) -> bool:
+        """After our own save of *row*: apply *changes* and move the state to *new_version*.
+
+        Only a state built for *old_version* is carried forward; anything else
+        is left to be rebuilt on the next read. Returns whether it was patched.
+        """
+        key = workbook_key(path)
+        with self._lock:
+            state = self._states.get(key)
+            if state is None or state.version != old_version:
+                return False
+            candidates = state.candidates
+            if row in candidates:
+                candidates = dict(candidates)
+                candidates[row] = replace(candidates[row], **changes)
+            self._states[key] = RankingState.build(new_version, state.token, candidates)
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._states.clear()
+
+
+RANKING = RankingIndex()
+
+
+def top_k(
+    state: RankingState,
+    k: int = DEFAULT_TOP,
+    weights: ScoreWeights = DEFAULT_WEIGHTS,
+    equipos: Optional[FrozenSet[str]] = None,
+) -> dict:
+    """The *k* best candidates (optionally only those touching *equipos*) with their breakdown.
+
+    Ties go to the lower Excel row, so the order is stable between calls.
+    """
+    candidates: Iterable[Candidate] = state.candidates.values()
+    if equipos is not None:
+        candidates = [c for c in candidates if c.celulas & equipos]
+    else:
+        candidates = list(candidates)
+    scored = ((state.score(c, weights), -c.row, c) for c in candidates)
+    best = heapq.nlargest(max(k, 0), scored, key=lambda item: item[:2])
+
+    weight_map = asdict(weights)
+    items: List[dict] = []
+    for rank, (score, _row, cand) in enumerate(best, start=1):
+        components = state.components(cand)
+        desglose = {name: weight_map[name] * value for name, value in components.items()}
+        desglose["pendientes"] = -desglose["pendientes"] or 0.0
+        items.append({
+            "rank": rank,
+            "row": cand.row,
+            "nombre": cand.nombre,
+            "estado": cand.estado,
+            "priorizado": "SI" if cand.priorizado else "NO",
+            "contribucion": cand.contribucion,
+            "rating_po": cand.rating_po,
+            "pendientes": cand.pendientes,
+            "score": score,
+            "componentes": components,
+            "desglose": desglose,
+        })
+    return {
+        "version": state.version,
+        "pesos": weight_map,
+        "candidatos": len(candidates),
+        "items": items,
+    }
@@ -0,0 +1,165 @@
+"""Bulk reconciliation of the derived ProyectosTI columns.
+
+``TOTAL_DEP``, ``TOTAL_L``, ``TOTAL_P``, ``CUBRIMIENTO_DEP`` (CN:CQ) follow
+from the R:BB flags and ``PORC_CUMPLIMIENTO`` (O) from ``AVANCE`` /
+``ESTIMADO_AVANCE`` (M/N). The API keeps them in step whenever it writes a
+row, but flags or avances edited directly in Excel leave them stale, which is
+why ``summarize_by_proyecto`` reports both calculated and ``*_xl`` totals.
+
+``reconcile`` recomputes the five columns for every row of the snapshot in one
+pass and reports the rows that drift. With ``fix=True`` it writes the
+calculated values back with a single load and save, under the workbook lock,
+so the metrics and boards that read CN:CQ can trust them again.
+
+Cells holding an Excel formula (``=COUNTIF(...)``, ``=M12/N12``) are computed
+by Excel and are left alone unless ``include_formulas`` is set, in which case
+they count as drift and ``fix`` replaces them with values.
+"""
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from openpyxl.utils import column_index_from_string
+
+from .config import COLS, EXCEL_PATH, FLAG_END_COL, FLAG_START_COL
+from .events import publish
+from .excel import get_ws_proyectos, load_workbook, save_workbook, workbook_lock
+from .snapshot import get_snapshot
+from .telemetry import rows_scanned, timed
+from .tracing import current_span
+
+DERIVED_FIELDS = ("TOTAL_DEP", "TOTAL_L", "TOTAL_P", "CUBRIMIENTO_DEP", "PORC_CUMPLIMIENTO")
+TOLERANCE = 1e-9
+DEFAULT_LIMIT = 100
+
+_FLAG_SLICE = slice(FLAG_START_COL - 1, FLAG_END_COL)
+_FLAG_WIDTH = FLAG_END_COL - FLAG_START_COL + 1
+
+
+def _is_formula(value) -> bool:
+    return isinstance(value, str) and value.startswith("=")
+
+
+def flag_counts(values: tuple) -> Tuple[int, int]:
+    """``(total_L, total_P)`` from a row's R:BB flags.
+
+    Clean rows (only "P", "L" and empty cells) are counted with ``tuple.count``;
+    anything else (lower case, padding, stray text) falls back to normalising
+    each cell like ``compute_dep_aggregates`` does.
+    """
+    flags = values[_FLAG_SLICE]
+    total_L = flags.count("L")
+    total_P = flags.count("P")
+    if total_L + total_P + flags.count(None) == _FLAG_WIDTH:
+        return total_L, total_P
+    total_L = total_P = 0
+    for flag in flags:
+        if not flag:
+            continue
+        flag_up = str(flag).strip().upper()
+        if flag_up == "L":
+            total_L += 1
+        elif flag_up == "P":
+            total_P += 1
+    return total_L, total_P
+
+
+def expected_values(rec) -> Tuple[int, int, int, float, float]:
+    """Calculated ``DERIVED_FIELDS`` for one ``ProjectRecord``."""
+    total_L, total_P = flag_counts(rec.values)
+    total_dep = total_L + total_P
+    estimado = rec.estimado
+    return (
+        total_dep,
+        total_L,
+        total_P,
+        (total_P / total_dep) if total_dep else 0.0,
+        (rec.avance / estimado) if estimado > 0 else 0.0,
+    )
+
+
+# ProjectRecord attributes holding the current (decoded) derived values.
+_CURRENT = ("total_dep", "total_L", "total_P", "cubrimiento", "porc_cumplimiento")
+
+
+def find_drift(snap, include_formulas: bool = False) -> List[dict]:
+    """Rows of *snap* whose derived columns differ from their calculated values.
+
+    Each item is ``{"fila", "id", "proyecto", "campos"}`` where ``campos`` maps
+    every drifting field to ``{"excel": <cell value>, "calculado": <value>}``.
+    """
+    positions = [snap.col(f) for f in DERIVED_FIELDS]
+    drift = []
+    records = snap.records()
+    rows_scanned("reconcile", len(records))
+    for rec in records:
+        values = rec.values
+        campos = None
+        for field, pos, attr, calc in zip(DERIVED_FIELDS, positions, _CURRENT, expected_values(rec)):
+            current = values[pos]
+            if _is_formula(current):
+                if not include_formulas:
+                    continue
+            elif abs(getattr(rec, attr) - calc) <= TOLERANCE:
+                continue
+            if campos is None:
+                campos = {}
+            campos[field] = {"excel": current, "calculado": calc}
+        if campos:
+            drift.append({"fila": rec.row, "id": rec.id, "proyecto": rec.nombre, "campos": campos})
+    return drift
+
+
+def _write_fixes(drift: Sequence[dict], path) -> Tuple[int, Optional[str]]:
+    """Write the calculated values of *drift* with one load/save; caller holds the lock."""
+    columns = {field: column_index_from_string(COLS[field]) for field in DERIVED_FIELDS}
+    wb = load_workbook(path)
+    ws = get_ws_proyectos(wb)
+    written = 0
+    for item in drift:
+        for field, change in item["campos"].items():
+            ws.cell(row=item["fila"], column=columns[field]).value = change["calculado"]
+            written += 1
+    current_span().add("cells_written", written)
+    return written, save_workbook(wb, path)
+
+
+@timed("compute")
+def reconcile(
+    path=EXCEL_PATH,
+    fix: bool = False,
+    include_formulas: bool = False,
+    limit: Optional[int] = DEFAULT_LIMIT,
+) -> dict:
+    """Report (and with *fix*, repair) drift in CN:CQ and PORC_CUMPLIMIENTO.
+
+    The report carries per-field counts and the first *limit* drifting rows
+    (``None`` = all). With *fix* the drift is computed from the snapshot of
+    the version under the workbook lock, so no write can land in between, and
+    all fixes go out in one save announced as ``workbook.changed``.
+    """
+    written, version = 0, None
+    if fix:
+        with workbook_lock(path):
+            snap = get_snapshot(path)
+            drift = find_drift(snap, include_formulas)
+            if drift:
+                written, version = _write_fixes(drift, path)
+        if version is not None:
+            publish("workbook.changed", version=version, path=path, reason="reconcile", rows=len(drift))
+    else:
+        snap = get_snapshot(path)
+        drift = find_drift(snap, include_formulas)
+
+    by_field: Dict[str, int] = {field: 0 for field in DERIVED_FIELDS}
+    for item in drift:
+        for field in item["campos"]:
+            by_field[field] += 1
+    return {
+        "version": version or snap.version,
+        "rows": len(snap.rows),
+        "drifted_rows": len(drift),
+        "by_field": by_field,
+        "fixed_cells": written,
+        "items": drift if limit is None else drift[:max(limit, 0)],
+    }
@@ -0,0 +1,257 @@
+"""Async service layer: dedicated executors for workbook I/O.
+
+- reads run on a bounded thread pool (``GD_READ_WORKERS``),
+- writes run on a single writer thread, so saves never race each other,
+- CPU-heavy aggregation can be offloaded to a process pool (``GD_CPU_WORKERS``;
+  0 keeps it on the read pool).
+
+Handlers await these instead of using Starlette's default threadpool, which
+stays free for cheap endpoints. ``executor_stats`` reports queue depths.
+
+The writer is admission-controlled: once ``GD_WRITE_QUEUE_LIMIT`` jobs are
+waiting, new ones are refused immediately, and a job that waited longer than
+``GD_WRITE_QUEUE_TIMEOUT`` is dropped before it runs. Both raise
+``Overloaded`` with a ``retry_after`` estimate that the API turns into
+429/503 + ``Retry-After``.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import multiprocessing
+import math
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict
+
+from . import profiling, telemetry, tracing
+from .config import CPU_WORKERS, READ_WORKERS, WRITE_QUEUE_LIMIT, WRITE_QUEUE_TIMEOUT
+
+QUEUE_WAIT_SECONDS = telemetry.REGISTRY.register(
+    telemetry.Histogram("gd_executor_queue_wait_seconds", "Time jobs waited before starting.", ("pool",))
+)
+REJECTED = telemetry.REGISTRY.register(
+    telemetry.Counter("gd_executor_rejected_total", "Jobs refused by admission control.", ("pool", "reason"))
+)
+
+
+class Overloaded(RuntimeError):
+    """A job was refused because the executor is saturated."""
+
+    def __init__(self, pool: str, reason: str, retry_after: float):
+        self.pool = pool
+        self.reason = reason  # "queue_full" | "queue_timeout"
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(f"Cola '{pool}' saturada ({reason}); reintenta en {self.retry_after} s.")
+
+
+class TrackedExecutor:
+    """Wraps an executor and counts queued / running / completed jobs.
+
+    ``max_queue`` bounds how many jobs may wait; ``max_wait`` drops jobs that
+    waited too long before starting (their caller has likely given up).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[[], Executor],
+        workers: int,
+        max_queue: int | None = None,
+        max_wait: float | None = None,
+    ):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._factory = factory
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.cancelled = 0
+        # Exponentially weighted mean job duration, for Retry-After estimates.
+        self.service_time = 0.0
+
+    def executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._factory()
+            return self._executor
+
+    def _started(self) -> None:
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+
+    def _finished(self, ok: bool, duration: float | None = None) -> None:
+        with self._lock:
+            self.running -= 1
+            self.completed += 1
+            if not ok:
+                self.failed += 1
+            if duration is not None:
+                self.service_time = duration if not self.service_time else 0.8 * self.service_time + 0.2 * duration
+
+    def retry_after(self) -> float:
+        """Rough time until a newly queued job would start."""
+        with self._lock:
+            return (self.queued + self.running) * self.service_time / max(self.workers, 1)
+
+    def _reject(self, reason: str) -> Overloaded:
+        with self._lock:
+            self.rejected += 1
+        REJECTED.inc(pool=self.name, reason=reason)
+        return Overloaded(self.name, reason, self.retry_after())
+
+    def submit(self, fn: Callable, *args, **kwargs):
+        """Submit *fn* and return a concurrent future.
+
+        Raises ``Overloaded`` right away when ``max_queue`` jobs are already
+        waiting; the future fails with it when the job exceeds ``max_wait``.
+        """
+        with self._lock:
+            full = self.max_queue is not None and self.queued >= self.max_queue
+            if not full:
+                self.queued += 1
+        if full:
+            raise self._reject("queue_full")
+        if isinstance(self.executor(), ProcessPoolExecutor):
+            # The job runs in another process: count it as started once queued.
+            self._started()
+            future = self.executor().submit(fn, *args, **kwargs)
+            future.add_done_callback(lambda f: self._finished(not f.cancelled() and f.exception() is None))
+            return future
+
+        fn = profiling.wrap_for_current(fn)
+        # Run in the submitter's context so the request's trace span (and
+        # profile) follow the job onto the worker thread.
+        context = contextvars.copy_context()
+        enqueued = time.perf_counter()
+
+        def job():
+            started = time.perf_counter()
+            waited = started - enqueued
+            QUEUE_WAIT_SECONDS.observe(waited, pool=self.name)
+            if self.max_wait is not None and waited > self.max_wait:
+                with self._lock:
+                    self.queued -= 1
+                raise self._reject("queue_timeout")
+            self._started()
+            ok = False
+            try:
+                result = fn(*args, **kwargs)
+                ok = True
+                return result
+            finally:
+                self._finished(ok, time.perf_counter() - started)
+
+        future = self.executor().submit(context.run, job)
+        # A job cancelled while still queued (its awaiting request went away)
+        # never runs, so it has to leave the queue count here.
+        future.add_done_callback(self._dequeue_if_cancelled)
+        return future
+
+    def _dequeue_if_cancelled(self, future) -> None:
+        if future.cancelled():
+            with self._lock:
+                self.queued -= 1
+                self.cancelled += 1
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queued": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "cancelled": self.cancelled,
+                "max_queue": self.max_queue,
+                "avg_seconds": round(self.service_time, 4),
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=False)
+
+
+READ_POOL = TrackedExecutor(
+    "read",
+    lambda: ThreadPoolExecutor(max_workers=READ_WORKERS, thread_name_prefix="gd-read"),
+    READ_WORKERS,
+)
+WRITE_POOL = TrackedExecutor(
+    "write",
+    lambda: ThreadPoolExecutor(max_workers=1, thread_name_prefix="gd-write"),
+    1,
+    max_queue=WRITE_QUEUE_LIMIT or None,
+    max_wait=WRITE_QUEUE_TIMEOUT or None,
+)
+CPU_POOL = TrackedExecutor(
+    "cpu",
+    lambda: ProcessPoolExecutor(
+        max_workers=CPU_WORKERS, mp_context=multiprocessing.get_context("spawn")
+    ),
+    CPU_WORKERS,
+)
+
+
+async def run_read(fn: Callable, *args, **kwargs):
+    return await READ_POOL.run(fn, *args, **kwargs)
+
+
+async def run_write(fn: Callable, *args, **kwargs):
+    return await WRITE_POOL.run(fn, *args, **kwargs)
+
+
+def offload(fn: Callable) -> Callable:
+    """Run module-level *fn* in the process pool, blocking the calling thread.
+
+    Keeps *fn*'s signature so it can still be wrapped with ``coalesced``; with
+    ``GD_CPU_WORKERS=0`` it simply calls *fn* in place. Telemetry recorded in
+    the worker process is replayed into this one.
+    """
+    if CPU_WORKERS <= 0:
+        return fn
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if profiling.current() is not None:
+            # Profile the real work, not a wait on another process.
+            return fn(*args, **kwargs)
+        trace_context = tracing.trace_context()
+        if trace_context is None:
+            result, observations = CPU_POOL.submit(telemetry.run_captured, fn, *args, **kwargs).result()
+        else:
+            (result, spans), observations = CPU_POOL.submit(
+                telemetry.run_captured, tracing.run_in_trace, trace_context, fn, *args, **kwargs
+            ).result()
+            tracing.adopt(spans)
+        telemetry.replay(observations)
+        return result
+
+    return wrapper
+
+
+def executor_stats() -> Dict[str, dict]:
+    stats = {pool.name: pool.stats() for pool in (READ_POOL, WRITE_POOL)}
+    if CPU_WORKERS > 0:
+        stats[CPU_POOL.name] = CPU_POOL.stats()
+    return stats
+
+
+def shutdown_executors() -> None:
+    for pool in (WRITE_POOL, READ_POOL, CPU_POOL):
+        pool.shutdown()
@@ -0,0 +1,276 @@
+"""Read-only, version-keyed snapshot of the ProyectosTI sheet.
+
+Aggregations that need every row (all-teams summaries, batch lookups, boards)
+read the sheet once per workbook version through ``get_snapshot`` instead of
+parsing the workbook and probing cells one by one on every request.
+
+With ``GD_SHARED_STATE`` the parsed snapshot is also written to a sidecar
+(``.GD_v1.xlsx.snapshot``) that other worker processes load instead of
+parsing the xlsx again; a file lock makes sure only one worker parses each
+version. The sidecar holds plain data only (``marshal`` of the row tuples,
+with dates and times stored as ISO strings), so a tampered file can at worst
+fail to load, never run code.
+"""
+from __future__ import annotations
+
+import datetime
+import marshal
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from openpyxl.utils import column_index_from_string
+
+from .config import (
+    COLS,
+    DESC_END_COL,
+    DESC_START_COL,
+    EXCEL_PATH,
+    FLAG_END_COL,
+    FLAG_START_COL,
+    HEADER_ROW_PROYECTOS,
+    SHARED_STATE,
+    SHEET_PROYECTOS,
+    START_ROW_PROYECTOS,
+)
+from .excel import FileLock, header_key, load_workbook, sidecar_path, workbook_key, workbook_version
+from .models import ProjectRecord
+from .telemetry import cache_lookup, rows_scanned, timed
+
+# Widest column any reader needs (RATING_PO_SYNC lives in CR).
+MAX_SNAPSHOT_COL = max(
+    DESC_END_COL,
+    FLAG_END_COL,
+    *(column_index_from_string(letter) for letter in COLS.values()),
+)
+
+
+@dataclass
+class ProjectSnapshot:
+    path: Path
+    version: str
+    header_row: int
+    flag_columns: Dict[str, int] = field(default_factory=dict)
+    desc_columns: Dict[str, int] = field(default_factory=dict)
+    rows: List[Tuple[int, tuple]] = field(default_factory=list)
+    area_tren_coe_col: Optional[int] = None
+    _records: Optional[List[ProjectRecord]] = field(default=None, init=False, repr=False, compare=False)
+
+    @staticmethod
+    def col(field_name: str) -> int:
+        """0-based position of a ``COLS`` field inside each row tuple."""
+        return column_index_from_string(COLS[field_name]) - 1
+
+    def flag_col(self, equipo: str) -> Optional[int]:
+        """0-based position of the R:BB flag column for *equipo*, if any."""
+        if not equipo:
+            return None
+        idx = self.flag_columns.get(header_key(equipo))
+        return idx - 1 if idx else None
+
+    def desc_col(self, desc_header: str) -> Optional[int]:
+        """0-based position of the BC:CM description column, if any."""
+        if not desc_header:
+            return None
+        idx = self.desc_columns.get(header_key(desc_header))
+        return idx - 1 if idx else None
+
+    def iter_rows(self) -> Iterator[Tuple[int, tuple]]:
+        """Yield ``(excel_row, values)`` for every non-empty data row."""
+        return iter(self.rows)
+
+    def records(self) -> List[ProjectRecord]:
+        """``ProjectRecord`` views of ``rows``, created once per snapshot.
+
+        Their decoded numbers are shared by every request served from this
+        workbook version.
+        """
+        records = self._records
+        if records is None:
+            records = self._records = [ProjectRecord(row, values) for row, values in self.rows]
+        return records
+
+
+@timed("index")
+def build_snapshot(path: Path = EXCEL_PATH) -> ProjectSnapshot:
+    """Parse ProyectosTI once in read-only mode and materialise its rows."""
+    path = Path(path)
+    version = workbook_version(path)
+    wb = load_workbook(path, read_only=True)
+    try:
+        ws = wb[SHEET_PROYECTOS]
+        id_pos = column_index_from_string(COLS["ID"]) - 1
+
+        # The header rows are read at full width so an Area/Tren/CoE column
+        # past CR still widens the rows enough to hold it.
+        header_values: Dict[int, tuple] = {}
+        for row_idx, values in enumerate(
+            ws.iter_rows(min_row=1, max_row=START_ROW_PROYECTOS - 1, values_only=True), start=1
+        ):
+            header_values[row_idx] = tuple(values) + (None,) * (MAX_SNAPSHOT_COL - len(values))
+
+        # Same rule as get_header_row_proyectos: first row above the data whose
+        # column A reads "ID".
+        header_row = HEADER_ROW_PROYECTOS
+        for row_idx in sorted(header_values):
+            v = header_values[row_idx][id_pos]
+            if isinstance(v, str) and v.strip().lower() == "id":
+                header_row = row_idx
+                break
+        header = header_values.get(header_row, (None,) * MAX_SNAPSHOT_COL)
+
+        # Same rule as find_area_tren_coe_col.
+        area_tren_coe_col = None
+        for col_idx, val in enumerate(header, start=1):
+            h = str(val).strip().lower() if val else ""
+            if "tren" in h and "coe" in h:
+                area_tren_coe_col = col_idx
+                break
+        width = max(MAX_SNAPSHOT_COL, area_tren_coe_col or 0)
+
+        rows: List[Tuple[int, tuple]] = []
+        for row_idx, values in enumerate(
+            ws.iter_rows(min_row=START_ROW_PROYECTOS, max_col=width, values_only=True), start=START_ROW_PROYECTOS
+        ):
+            if len(values) < width:
+                values = tuple(values) + (None,) * (width - len(values))
+            if all(v is None for v in values):
+                continue
+            rows.append((row_idx, values))
+    finally:
+        wb.close()
+    rows_scanned("snapshot", len(rows))
+
+    flag_columns: Dict[str, int] = {}
+    for col_idx in range(FLAG_START_COL, FLAG_END_COL + 1):
+        val = header[col_idx - 1]
+        if val is not None:
+            flag_columns.setdefault(header_key(val), col_idx)
+    desc_columns: Dict[str, int] = {}
+    for col_idx in range(DESC_START_COL, DESC_END_COL + 1):
+        val = header[col_idx - 1]
+        if val is not None:
+            desc_columns.setdefault(header_key(val), col_idx)
+
+    return ProjectSnapshot(
+        path=path,
+        version=version,
+        header_row=header_row,
+        flag_columns=flag_columns,
+        desc_columns=desc_columns,
+        rows=rows,
+        area_tren_coe_col=area_tren_coe_col,
+    )
+
+
+# Cell values marshal can store as they are; anything else (dates, times,
+# durations) is written separately as ``(row, column, kind, text)``.
+_PLAIN_TYPES = (str, int, float, bool, type(None))
+_DECODERS = {
+    "datetime": datetime.datetime.fromisoformat,
+    "date": datetime.date.fromisoformat,
+    "time": datetime.time.fromisoformat,
+    "timedelta": lambda text: datetime.timedelta(seconds=float(text)),
+    "str": str,
+}
+
+
+def _encode_cell(value) -> Tuple[str, str]:
+    if isinstance(value, datetime.datetime):
+        return "datetime", value.isoformat()
+    if isinstance(value, datetime.date):
+        return "date", value.isoformat()
+    if isinstance(value, datetime.time):
+        return "time", value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return "timedelta", repr(value.total_seconds())
+    return "str", str(value)
+
+
+def write_snapshot_sidecar(snap: ProjectSnapshot, target: Path) -> None:
+    """Persist *snap* as a version line plus marshalled data, replacing *target* atomically."""
+    rows = []
+    cells = []
+    for i, (row_idx, values) in enumerate(snap.rows):
+        if not all(isinstance(v, _PLAIN_TYPES) for v in values):
+            values = list(values)
+            for j, value in enumerate(values):
+                if not isinstance(value, _PLAIN_TYPES):
+                    cells.append((i, j) + _encode_cell(value))
+                    values[j] = None
+            values = tuple(values)
+        rows.append((row_idx, values))
+    fields = {k: v for k, v in vars(snap).items() if not k.startswith("_")}
+    fields.update(path=str(snap.path), rows=rows, cells=cells)
+    tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as fh:
+        fh.write(snap.version.encode("ascii") + b"\n")
+        fh.write(marshal.dumps(fields))
+    os.replace(tmp, target)
+
+
+def read_snapshot_sidecar(source: Path, version: str) -> Optional[ProjectSnapshot]:
+    """Load the sidecar if it holds *version*; only the header line is read otherwise.
+
+    A sidecar that does not decode is treated as missing (the caller reparses).
+    """
+    try:
+        fh = open(source, "rb")
+    except FileNotFoundError:
+        return None
+    with fh:
+        if fh.readline().rstrip(b"\n").decode("ascii", "replace") != version:
+            return None
+        data = fh.read()
+    try:
+        fields = marshal.loads(data)
+        rows = fields["rows"]
+        for i, j, kind, text in fields.pop("cells"):
+            values = list(rows[i][1])
+            values[j] = _DECODERS[kind](text)
+            rows[i] = (rows[i][0], tuple(values))
+        fields["path"] = Path(fields["path"])
+        return ProjectSnapshot(**fields)
+    except (EOFError, ValueError, TypeError, KeyError, IndexError):
+        return None
+
+
+def _shared_snapshot(key: Path, version: str) -> ProjectSnapshot:
+    sidecar = sidecar_path(key, "snapshot")
+    snap = read_snapshot_sidecar(sidecar, version)
+    if snap is None:
+        # One worker parses each version; the others wait and load its result.
+        with FileLock(sidecar_path(key, "snapshot.lock")):
+            snap = read_snapshot_sidecar(sidecar, version)
+            if snap is None:
+                snap = build_snapshot(key)
+                write_snapshot_sidecar(snap, sidecar)
+                return snap
+    cache_lookup("snapshot_sidecar", True)
+    return snap
+
+
+_snapshots: Dict[Path, ProjectSnapshot] = {}
+_snapshot_lock = threading.Lock()
+
+
+def get_snapshot(path: Path = EXCEL_PATH) -> ProjectSnapshot:
+    """Return the cached snapshot for the current workbook version, rebuilding if stale."""
+    key = workbook_key(path)
+    version = workbook_version(key)
+    with _snapshot_lock:
+        snap = _snapshots.get(key)
+        hit = snap is not None and snap.version == version
+        cache_lookup("snapshot", hit)
+        if hit:
+            return snap
+        snap = _shared_snapshot(key, version) if SHARED_STATE else build_snapshot(key)
+        _snapshots[key] = snap
+        return snap
+
+
+def clear_snapshots() -> None:
+    with _snapshot_lock:
+        _snapshots.clear()
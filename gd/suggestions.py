@@ -1,43 +1,235 @@
-"""Persistence helpers for the Feedback/Sugerencias sheet."""
+"""Feedback/Sugerencias persistence.
+
+New suggestions go to an append-only JSONL log and an in-memory ring buffer,
+so submitting feedback never loads or rewrites the workbook and never waits on
+project writes. ``sync_suggestions`` copies the entries that are not in the
+``Sugerencias`` sheet yet (the API runs it periodically and on shutdown); the
+number of log bytes already copied is kept in a ``.offset`` sidecar.
+
+Several worker processes may append to the same log; each store catches its
+ring up with lines it did not write before answering, and the sync reads the
+offset under the cross-process workbook lock so entries are copied once.
+"""
 from __future__ import annotations
 
-from .config import EXCEL_PATH
-from .excel import get_ws_sugerencias, load_workbook
+import json
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, List
 
+from .config import EXCEL_PATH, SUGGESTIONS_LOG_PATH, SUGGESTIONS_RING_SIZE, SHEET_SUG
+from .events import publish
+from .excel import (
+    get_ws_sugerencias,
+    load_workbook,
+    save_workbook,
+    workbook_key,
+    workbook_lock,
+    workbook_mtime,
+    workbook_version,
+)
 
-def append_suggestion(usuario: str, texto: str, path=EXCEL_PATH):
-    wb = load_workbook(path)
-    ws = get_ws_sugerencias(wb)
 
-    next_row = ws.max_row + 1
-    if next_row == 2 and ws["A1"].value is None:
-        ws["A1"] = "Usuario"
-        ws["B1"] = "Sugerencia"
-        next_row = 2
+def suggestions_log_path(path=EXCEL_PATH) -> Path:
+    """Log file backing the suggestions of the workbook at *path*."""
+    if workbook_key(path) == workbook_key(EXCEL_PATH):
+        return SUGGESTIONS_LOG_PATH
+    path = Path(path)
+    return path.with_name(f"{path.stem}.sugerencias.jsonl")
+
+
+def _read_sheet_rows(path) -> List[dict]:
+    wb = load_workbook(Path(path), read_only=True)
+    try:
+        if SHEET_SUG not in wb.sheetnames:
+            return []
+        rows = []
+        for usuario, texto in wb[SHEET_SUG].iter_rows(min_row=2, max_col=2, values_only=True):
+            if usuario is None and texto is None:
+                continue
+            rows.append(
+                {
+                    "usuario": str(usuario) if usuario is not None else "",
+                    "texto": str(texto) if texto is not None else "",
+                }
+            )
+        return rows
+    finally:
+        wb.close()
+
+
+class SuggestionStore:
+    """Append-only suggestion log for one workbook plus a ring of the latest entries."""
+
+    def __init__(self, workbook_path, log_path: Path, ring_size: int = SUGGESTIONS_RING_SIZE):
+        self.workbook_path = Path(workbook_path)
+        self.log_path = Path(log_path)
+        self.offset_path = self.log_path.with_name(self.log_path.name + ".offset")
+        self.ring_size = ring_size
+        self._ring: deque = deque(maxlen=ring_size)
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._loaded = False
+        self._log_bytes = 0
+        self._seed_version = ""
+        self.last_modified: float | None = None
+
+    # -- bootstrap ---------------------------------------------------------
+
+    def _synced_offset(self) -> int:
+        try:
+            return int(self.offset_path.read_text().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _write_offset(self, offset: int) -> None:
+        tmp = self.offset_path.with_name(self.offset_path.name + ".tmp")
+        tmp.write_text(str(offset))
+        os.replace(tmp, self.offset_path)
+
+    def _pending(self, offset: int):
+        """Entries after *offset* in the log, and the log size they end at."""
+        entries = []
+        try:
+            with open(self.log_path, "rb") as fh:
+                fh.seek(offset)
+                data = fh.read()
+        except FileNotFoundError:
+            return entries, offset
+        end = offset
+        for line in data.splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                break  # partial line from an interrupted append
+            end += len(line)
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+        return entries, end
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        # Latest rows already in the sheet, then whatever the log has not synced.
+        self._seed_version = workbook_version(self.workbook_path)
+        self.last_modified = workbook_mtime(self.workbook_path)
+        seed = _read_sheet_rows(self.workbook_path)[-self.ring_size:] if self.workbook_path.exists() else []
+        pending, self._log_bytes = self._pending(self._synced_offset())
+        self._ring.extend(seed)
+        self._ring.extend({"usuario": e.get("usuario", ""), "texto": e.get("texto", "")} for e in pending)
+        self._loaded = True
+
+    def _catch_up(self) -> None:
+        """Pull log lines appended since the ring was last updated (by anyone)."""
+        try:
+            if os.path.getsize(self.log_path) <= self._log_bytes:
+                return
+        except FileNotFoundError:
+            return
+        entries, end = self._pending(self._log_bytes)
+        self._ring.extend({"usuario": e.get("usuario", ""), "texto": e.get("texto", "")} for e in entries)
+        self._log_bytes = end
+        self.last_modified = time.time()
+
+    # -- public API --------------------------------------------------------
+
+    def append(self, usuario: str, texto: str) -> None:
+        record = {"usuario": usuario or "", "texto": texto or ""}
+        line = json.dumps({**record, "ts": time.time()}, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._ensure_loaded()
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.log_path, "a", encoding="utf-8") as fh:
+                fh.write(line)
+            # Picks up our line plus anything other workers appended before it.
+            self._catch_up()
+            token = f"{self._seed_version}+{self._log_bytes:x}"
+        publish("suggestion.added", path=self.workbook_path, suggestions=token)
 
-    ws.cell(row=next_row, column=1).value = usuario or ""
-    ws.cell(row=next_row, column=2).value = texto or ""
-    wb.save(path)
+    def last(self, limit: int = 5) -> List[dict]:
+        with self._lock:
+            self._ensure_loaded()
+            self._catch_up()
+            if limit <= 0:
+                return []
+            return list(self._ring)[-limit:]
+
+    def version(self) -> str:
+        """Token that changes whenever the ring's contents change."""
+        with self._lock:
+            self._ensure_loaded()
+            self._catch_up()
+            return f"{self._seed_version}+{self._log_bytes:x}"
+
+    def history(self, limit: int) -> List[dict]:
+        """The latest *limit* suggestions, older than the ring included, without writing.
+
+        Sliced like the sheet always was (``rows[-limit:]``), so ``limit=0``
+        returns every suggestion.
+
+        Sheet rows plus the log entries not synced into it yet; holding the
+        sync lock keeps this process's sync from moving the offset in between.
+        """
+        with self._sync_lock:
+            offset = self._synced_offset()
+            rows = _read_sheet_rows(self.workbook_path) if self.workbook_path.exists() else []
+        pending, _end = self._pending(offset)
+        rows.extend({"usuario": e.get("usuario", ""), "texto": e.get("texto", "")} for e in pending)
+        return rows[-limit:]
+
+    def sync(self) -> int:
+        """Copy unsynced log entries into the Sugerencias sheet; returns how many."""
+        with self._sync_lock, workbook_lock(self.workbook_path):
+            offset = self._synced_offset()
+            pending, end = self._pending(offset)
+            if not pending:
+                if end != offset:
+                    self._write_offset(end)
+                return 0
+
+            wb = load_workbook(self.workbook_path)
+            ws = get_ws_sugerencias(wb)
+            next_row = ws.max_row + 1
+            for entry in pending:
+                ws.cell(row=next_row, column=1).value = entry.get("usuario", "")
+                ws.cell(row=next_row, column=2).value = entry.get("texto", "")
+                next_row += 1
+            version = save_workbook(wb, self.workbook_path)
+            self._write_offset(end)
+        # The sheet changed but no project data did; tell listeners so they
+        # don't treat the new version as an external edit.
+        publish("suggestions.synced", version=version, path=self.workbook_path, count=len(pending))
+        return len(pending)
+
+
+_stores: Dict[Path, SuggestionStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_suggestion_store(path=EXCEL_PATH) -> SuggestionStore:
+    key = workbook_key(path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = SuggestionStore(key, suggestions_log_path(path))
+        return store
+
+
+def append_suggestion(usuario: str, texto: str, path=EXCEL_PATH):
+    get_suggestion_store(path).append(usuario, texto)
 
 
 def get_last_suggestions(limit: int = 5, path=EXCEL_PATH):
-    wb = load_workbook(path)
-    ws = get_ws_sugerencias(wb)
-
-    rows = []
-    for row in range(2, ws.max_row + 1):
-        usuario = ws.cell(row=row, column=1).value
-        texto = ws.cell(row=row, column=2).value
-        if usuario is None and texto is None:
-            continue
-        rows.append(
-            {
-                "usuario": str(usuario) if usuario is not None else "",
-                "texto": str(texto) if texto is not None else "",
-            }
-        )
-
-    if not rows:
-        return []
-
-    return rows[-limit:]
+    store = get_suggestion_store(path)
+    if 0 < limit <= store.ring_size:
+        return store.last(limit)
+    # Older than the ring (or limit <= 0, i.e. everything): read the sheet
+    # and the unsynced log (no save).
+    return store.history(limit)
+
+
+def sync_suggestions(path=EXCEL_PATH) -> int:
+    return get_suggestion_store(path).sync()
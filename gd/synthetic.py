@@ -0,0 +1,306 @@
+"""Synthetic GD workbooks for scale testing.
+
+``generate_workbook`` writes a workbook in exactly the layout the backend
+reads: ``ProyectosTI`` with the header on ``HEADER_ROW_PROYECTOS`` and data
+from ``START_ROW_PROYECTOS``, the ``COLS`` positions, one flag column per
+célula in R:BB with its description column in BC:CM, CN:CQ aggregates that
+match the flags, an ``AREA/TREN/COE`` column right after them holding each
+row's tren, and a ``Datos`` sheet whose area catalog lists the same
+``Área N`` values the rows use and whose célula → tren and célula →
+description mappings point at those headers. Output depends only on the
+spec, so the same seed always yields the same workbook.
+
+R:BB holds at most 37 células; larger layouts do not fit the sheet the code
+expects and are rejected.
+
+Usage::
+
+    python -m gd.synthetic /tmp/gd_10k.xlsx --rows 10000 --density 0.1 --seed 7
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List
+
+from openpyxl import Workbook
+from openpyxl.utils import column_index_from_string
+
+from .config import (
+    COLS,
+    DESC_START_COL,
+    FLAG_END_COL,
+    FLAG_START_COL,
+    HEADER_ROW_PROYECTOS,
+    SHEET_DATOS,
+    SHEET_PROYECTOS,
+    SHEET_SUG,
+    START_ROW_PROYECTOS,
+)
+
+MAX_CELULAS = FLAG_END_COL - FLAG_START_COL + 1
+
+HEADERS = {
+    "ID": "ID",
+    "Q_RADICADO": "Q_RADICADO",
+    "PRIORIZADO": "PRIORIZADO",
+    "ESTADO_PROYECTO": "ESTADO_PROYECTO",
+    "NOMBRE_PROYECTO": "NOMBRE_PROYECTO",
+    "DESCRIPCION_PROYECTO": "DESCRIPCION_PROYECTO",
+    "RESPONSABLE_PROYECTO": "RESPONSABLE_PROYECTO",
+    "AREA_SOLICITANTE": "AREA_SOLICITANTE",
+    "FECHA_INICIO": "FECHA_INICIO",
+    "FECHA_ESTIMADA_CIERRE": "FECHA_ESTIMADA_CIERRE",
+    "LINEA_BASE": "LINEA_BASE",
+    "LINEA_BASE_Q_GESTION": "LINEA_BASE_Q_GESTIÓN",
+    "AVANCE": "AVANCE",
+    "ESTIMADO_AVANCE": "ESTIMADO DE AVANCE",
+    "PORC_CUMPLIMIENTO": "% CUMPLIMIENTO",
+    "CONTRIBUCION": "CONTRIBUCIÓN",
+    "INICIATIVA_ESTRATEGICA": "INICIATIVA_ESTRATEGICA",
+    "TOTAL_DEP": "TOTAL_DEPENDENCIAS",
+    "TOTAL_L": "TOTAL_DEP_NEGOCIADAS",
+    "TOTAL_P": "TOTAL_DEP_PENDIENTES",
+    "CUBRIMIENTO_DEP": "CUBRIMIENTO_DEP_%",
+    "RATING_PO_SYNC": "RATING_PO_SYNC",
+}
+
+ESTADOS = ["Nuevo", "En curso", "Detenido", "Cancelado", "Finalizado"]
+QUARTERS = ["2Q/25", "3Q/25", "4Q/25", "1Q/26", "2Q/26"]
+AREAS = [f"Área {i}" for i in range(1, 13)]
+INICIATIVAS = ["Ebitda", "Opex", "NPS", "Modelo OP IA", "Ingresos B2C", "Ingresos B2B"]
+WORDS = [
+    "Migración", "Portal", "Facturación", "Red", "Analítica", "Canal", "Móvil", "Nube",
+    "Soporte", "Integración", "Clientes", "Pagos", "Automatización", "Datos", "Seguridad",
+]
+
+_COL = {field: column_index_from_string(letter) for field, letter in COLS.items()}
+# The Area/Tren/CoE column follows the last ``COLS`` column (CR).
+AREA_TREN_COE_COL = max(_COL.values()) + 1
+AREA_TREN_COE_HEADER = "AREA/TREN/COE"
+ROW_WIDTH = AREA_TREN_COE_COL
+
+
+@dataclass
+class SyntheticSpec:
+    """What to generate; every field has a sensible default for a 10k-row run."""
+
+    rows: int = 10_000
+    celulas: int = MAX_CELULAS
+    trenes: int = 8
+    # Probability that a given project depends on a given célula.
+    density: float = 0.08
+    # Share of dependencies still pending (P); the rest are negotiated (L).
+    p_share: float = 0.5
+    # Share of dependencies that carry a description.
+    described: float = 0.6
+    priorizado_share: float = 0.3
+    # Share of progress cells stored as decimal-comma text ("0,45"), as users type them.
+    text_numbers: float = 0.02
+    responsables: int = 150
+    seed: int = 0
+
+    def validate(self) -> None:
+        if self.rows < 0:
+            raise ValueError("rows debe ser >= 0.")
+        if not 1 <= self.celulas <= MAX_CELULAS:
+            raise ValueError(f"celulas debe estar entre 1 y {MAX_CELULAS} (ancho de R:BB).")
+        if not 1 <= self.trenes <= self.celulas:
+            raise ValueError("trenes debe estar entre 1 y el número de células.")
+        for name in ("density", "p_share", "described", "priorizado_share", "text_numbers"):
+            if not 0.0 <= getattr(self, name) <= 1.0:
+                raise ValueError(f"{name} debe estar entre 0 y 1.")
+
+
+def celula_names(spec: SyntheticSpec) -> List[str]:
+    return [f"CÉLULA SINTÉTICA {i + 1:02d}" for i in range(spec.celulas)]
+
+
+def celula_trenes(spec: SyntheticSpec) -> Dict[str, str]:
+    """célula -> tren, in contiguous blocks like the real sheet groups them."""
+    names = celula_names(spec)
+    per_tren = -(-len(names) // spec.trenes)
+    return {name: f"Tren Sintético {i // per_tren + 1}" for i, name in enumerate(names)}
+
+
+def _number(rng: random.Random, value: float, spec: SyntheticSpec):
+    if rng.random() >= spec.text_numbers:
+        return value
+    return f"{value:.2f}".replace(".", ",")
+
+
+def _header_rows(spec: SyntheticSpec, tren_of: Dict[str, str]) -> List[list]:
+    names = celula_names(spec)
+    # Everything above START_ROW_PROYECTOS; the data rows follow directly.
+    rows = [[None] * ROW_WIDTH for _ in range(START_ROW_PROYECTOS - 1)]
+
+    rows[1][FLAG_START_COL - 1] = "DEPENDENCIA"
+    rows[1][DESC_START_COL - 1] = "DESCRIPCIÓN"
+    previous = None
+    for i, name in enumerate(names):
+        if tren_of[name] != previous:
+            previous = tren_of[name]
+            rows[2][FLAG_START_COL - 1 + i] = previous
+            rows[2][DESC_START_COL - 1 + i] = previous
+
+    header = rows[HEADER_ROW_PROYECTOS - 1]
+    for field, text in HEADERS.items():
+        header[_COL[field] - 1] = text
+    header[AREA_TREN_COE_COL - 1] = AREA_TREN_COE_HEADER
+    for i, name in enumerate(names):
+        header[FLAG_START_COL - 1 + i] = name
+        header[DESC_START_COL - 1 + i] = f"DESCRIPCION {name}"
+    return rows
+
+
+def _project_row(rng: random.Random, project_id: int, spec: SyntheticSpec, responsables: List[str], celulas: List[str], tren_of: Dict[str, str]) -> list:
+    values = [None] * ROW_WIDTH
+
+    def put(field, value):
+        values[_COL[field] - 1] = value
+
+    linea_base = round(rng.random() * 0.6, 2)
+    avance = round(min(1.0, linea_base + rng.random() * 0.5), 2)
+    estimado = round(rng.uniform(0.3, 1.0), 2)
+    inicio = dt.datetime(2025, 1, 1) + dt.timedelta(days=rng.randrange(540))
+
+    put("ID", project_id)
+    put("Q_RADICADO", rng.choice(QUARTERS))
+    put("PRIORIZADO", "SI" if rng.random() < spec.priorizado_share else "NO")
+    put("ESTADO_PROYECTO", rng.choice(ESTADOS))
+    put("NOMBRE_PROYECTO", f"PRY-{project_id:06d} {rng.choice(WORDS)} {rng.choice(WORDS)}")
+    put("DESCRIPCION_PROYECTO", f"Proyecto sintético {project_id}")
+    put("RESPONSABLE_PROYECTO", rng.choice(responsables))
+    put("AREA_SOLICITANTE", rng.choice(AREAS))
+    put("FECHA_INICIO", inicio)
+    put("FECHA_ESTIMADA_CIERRE", inicio + dt.timedelta(days=rng.randrange(30, 400)))
+    put("LINEA_BASE", _number(rng, linea_base, spec))
+    put("LINEA_BASE_Q_GESTION", linea_base)
+    put("AVANCE", _number(rng, avance, spec))
+    put("ESTIMADO_AVANCE", _number(rng, estimado, spec))
+    put("PORC_CUMPLIMIENTO", avance / estimado if estimado > 0 else 0.0)
+    put("CONTRIBUCION", rng.choice((0, 0, 0, rng.randrange(100, 10_000, 100))))
+    put("INICIATIVA_ESTRATEGICA", rng.choice(INICIATIVAS))
+    if rng.random() < 0.5:
+        put("RATING_PO_SYNC", rng.randrange(0, 6))
+
+    total_l = total_p = 0
+    flagged = []
+    for i in range(len(celulas)):
+        if rng.random() >= spec.density:
+            continue
+        if rng.random() < spec.p_share:
+            flag, total_p = "P", total_p + 1
+        else:
+            flag, total_l = "L", total_l + 1
+        values[FLAG_START_COL - 1 + i] = flag
+        flagged.append(celulas[i])
+        if rng.random() < spec.described:
+            values[DESC_START_COL - 1 + i] = f"Dependencia {flag} del proyecto {project_id}"
+
+    total = total_l + total_p
+    put("TOTAL_DEP", total)
+    put("TOTAL_L", total_l)
+    put("TOTAL_P", total_p)
+    put("CUBRIMIENTO_DEP", (total_p / total) if total else 0.0)
+    # The tren of one of the células it depends on (picked by ID, so the
+    # trenes stay balanced); rows without dependencies cycle through them.
+    trenes = [tren_of[name] for name in flagged] or sorted(set(tren_of.values()))
+    values[AREA_TREN_COE_COL - 1] = trenes[project_id % len(trenes)]
+    return values
+
+
+def generate_workbook(path, spec: SyntheticSpec | None = None) -> Path:
+    """Write a synthetic workbook for *spec* to *path* and return the path."""
+    spec = spec or SyntheticSpec()
+    spec.validate()
+    path = Path(path)
+    rng = random.Random(spec.seed)
+
+    names = celula_names(spec)
+    tren_of = celula_trenes(spec)
+    responsables = [f"Responsable {i + 1:03d}" for i in range(spec.responsables)]
+
+    # write_only streams rows to disk, so 100k-row workbooks fit in memory.
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(SHEET_PROYECTOS)
+    for values in _header_rows(spec, tren_of):
+        ws.append(values)
+    for offset in range(spec.rows):
+        ws.append(_project_row(rng, offset + 1, spec, responsables, names, tren_of))
+
+    ws_d = wb.create_sheet(SHEET_DATOS)
+    ws_d.append(
+        [
+            "Estado",
+            "PriorizacionQ",
+            "ResponsableProyecto",
+            "Areasolicitante",
+            "AreaTrenCoe",
+            "Celula",
+            "Celula Dependencia",
+            "Celula Descripcion Dependencia",
+            "Iniciativa Estrategica",
+        ]
+    )
+    height = max(len(names), len(responsables), len(ESTADOS), len(QUARTERS), len(AREAS), len(INICIATIVAS))
+    for i in range(height):
+        name = names[i] if i < len(names) else None
+        ws_d.append(
+            [
+                ESTADOS[i] if i < len(ESTADOS) else None,
+                QUARTERS[i] if i < len(QUARTERS) else None,
+                responsables[i] if i < len(responsables) else None,
+                AREAS[i] if i < len(AREAS) else None,
+                tren_of[name] if name else None,
+                name,
+                name,
+                f"DESCRIPCION {name}" if name else None,
+                INICIATIVAS[i] if i < len(INICIATIVAS) else None,
+            ]
+        )
+
+    ws_s = wb.create_sheet(SHEET_SUG)
+    ws_s.append(["SUGERENCIAS"])
+
+    wb.save(path)
+    return path
+
+
+def main(argv=None) -> None:
+    defaults = SyntheticSpec()
+    parser = argparse.ArgumentParser(prog="python -m gd.synthetic", description="Genera un workbook GD sintético.")
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--rows", type=int, default=defaults.rows)
+    parser.add_argument("--celulas", type=int, default=defaults.celulas)
+    parser.add_argument("--trenes", type=int, default=defaults.trenes)
+    parser.add_argument("--density", type=float, default=defaults.density)
+    parser.add_argument("--p-share", type=float, default=defaults.p_share)
+    parser.add_argument("--described", type=float, default=defaults.described)
+    parser.add_argument("--priorizado-share", type=float, default=defaults.priorizado_share)
+    parser.add_argument("--text-numbers", type=float, default=defaults.text_numbers)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    args = parser.parse_args(argv)
+    spec = SyntheticSpec(
+        rows=args.rows,
+        celulas=args.celulas,
+        trenes=args.trenes,
+        density=args.density,
+        p_share=args.p_share,
+        described=args.described,
+        priorizado_share=args.priorizado_share,
+        text_numbers=args.text_numbers,
+        seed=args.seed,
+    )
+    try:
+        out = generate_workbook(args.output, spec)
+    except ValueError as exc:
+        parser.error(str(exc))
+    print(out)
+
+
+if __name__ == "__main__":
+    main()
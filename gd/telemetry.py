@@ -0,0 +1,320 @@
+"""In-process performance telemetry, exposed in Prometheus text format.
+
+Records per-stage latency (``parse``, ``index``, ``compute``, ``serialize``,
+``save``), per-endpoint latency, cache hit rates and rows scanned. Recording is
+a bisect plus a couple of integer bumps under a lock; nothing is formatted
+until ``render()`` is called by a scrape, and gauges such as the workbook size
+are only read then.
+
+Stages nest: ``stage("compute")`` around a function that loads the workbook
+records the load as ``parse`` and only the remainder as ``compute``, so the
+per-stage histograms add up to the request time instead of overlapping.
+"""
+from __future__ import annotations
+
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .config import EXCEL_PATH
+from .tracing import current_span, span
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# When set (inside a process-pool worker), observations are also appended here
+# so the parent can replay them into its own registry.
+_capture: Optional[list] = None
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(n, "") for n in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        self._apply(self._key(labels), amount)
+        if _capture is not None:
+            _capture.append((self.name, self._key(labels), amount))
+
+    def _apply(self, key: tuple, amount: float) -> None:
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = self._header()
+        lines += [f"{self.name}{_labels(self.labelnames, k)} {_fmt(v)}" for k, v in items]
+        return lines
+
+
+class Gauge(_Metric):
+    """Gauge whose samples come from a callback evaluated at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), collect: Callable[[], Iterable[Tuple[tuple, float]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self._collect = collect
+
+    def render(self) -> List[str]:
+        try:
+            samples = list(self._collect()) if self._collect else []
+        except Exception:  # pragma: no cover - never fail a scrape on one gauge
+            samples = []
+        lines = self._header()
+        lines += [f"{self.name}{_labels(self.labelnames, k)} {_fmt(v)}" for k, v in samples]
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        self._apply(self._key(labels), value)
+        if _capture is not None:
+            _capture.append((self.name, self._key(labels), value))
+
+    def _apply(self, key: tuple, value: float) -> None:
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][idx] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return series[2] if series else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(s[0]), s[1], s[2])) for k, s in self._series.items())
+        lines = self._header()
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = f'le="{_fmt(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_fmt(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _workbook_size():
+    try:
+        yield (), os.stat(EXCEL_PATH).st_size
+    except FileNotFoundError:
+        return
+
+
+STAGE_SECONDS = REGISTRY.register(
+    Histogram("gd_stage_seconds", "Exclusive time per processing stage.", ("stage",))
+)
+REQUEST_SECONDS = REGISTRY.register(
+    Histogram("gd_http_request_duration_seconds", "API request latency by route.", ("method", "route", "status"))
+)
+CACHE_LOOKUPS = REGISTRY.register(
+    Counter("gd_cache_lookups_total", "Cache lookups by cache and result (hit/miss).", ("cache", "result"))
+)
+ROWS_SCANNED = REGISTRY.register(
+    Counter("gd_rows_scanned_total", "ProyectosTI rows visited, by reader.", ("source",))
+)
+WORKBOOK_BYTES = REGISTRY.register(
+    Gauge("gd_workbook_size_bytes", "Size of the workbook on disk.", collect=_workbook_size)
+)
+
+
+# ---------------------------------------------------------------------------
+# Recording helpers
+# ---------------------------------------------------------------------------
+
+_stack = threading.local()
+
+
+@contextmanager
+def stage(name: str):
+    """Time a block as *name*, excluding time spent in nested stages."""
+    frames = getattr(_stack, "frames", None)
+    if frames is None:
+        frames = _stack.frames = []
+    frame = [0.0]  # time consumed by nested stages
+    frames.append(frame)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        frames.pop()
+        if frames:
+            frames[-1][0] += elapsed
+        STAGE_SECONDS.observe(max(elapsed - frame[0], 0.0), stage=name)
+
+
+def timed(name: str) -> Callable:
+    """Decorator form of ``stage``; also opens a trace span named after *fn*."""
+
+    def decorate(fn):
+        span_name = fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name), span(span_name, stage=name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_LOOKUPS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def rows_scanned(source: str, count: int) -> None:
+    if count > 0:
+        ROWS_SCANNED.inc(count, source=source)
+        current_span().add("rows_scanned", count)
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+class RequestTimingMiddleware:
+    """ASGI middleware feeding ``gd_http_request_duration_seconds``.
+
+    Labels use the matched route template (``/projects/{nombre}``), not the raw
+    path, so cardinality stays bounded. Long-lived streams in *exclude* are
+    skipped.
+    """
+
+    def __init__(self, app, exclude: Sequence[str] = ()):
+        self.app = app
+        self.exclude = frozenset(exclude)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path") in self.exclude:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                method=scope.get("method", ""),
+                route=getattr(route, "path", "<unmatched>"),
+                status=status,
+            )
+
+
+# ---------------------------------------------------------------------------
+# Process-pool support
+# ---------------------------------------------------------------------------
+
+def run_captured(fn: Callable, *args, **kwargs):
+    """Run *fn* in a pool worker and return ``(result, observations)``."""
+    global _capture
+    _capture = []
+    try:
+        return fn(*args, **kwargs), _capture
+    finally:
+        _capture = None
+
+
+def replay(observations: Iterable[tuple]) -> None:
+    """Apply observations recorded by ``run_captured`` to this process's registry."""
+    for name, key, value in observations:
+        metric = REGISTRY.get(name)
+        if metric is not None:
+            metric._apply(key, value)
@@ -0,0 +1,264 @@
+"""Request-scoped trace spans exported as JSON lines.
+
+Enabled by ``GD_TRACE_PATH``. Every API request then gets a root span and the
+instrumented stages underneath it (``load_workbook``,
+``get_header_row_proyectos``, ``dependency_columns``, the compute functions,
+``wb.save``) become nested child spans carrying attributes such as
+``rows_scanned`` and ``cells_written``. A finished trace is written when it was
+sampled (``GD_TRACE_SAMPLE``), forced with ``X-GD-Trace: 1``, or slower than
+``GD_TRACE_SLOW_MS`` — so slow outliers are always kept. The last traces also
+stay in memory as a local collector stand-in (``/internal/traces``).
+
+Without a current trace, ``span()`` returns a shared no-op object.
+"""
+from __future__ import annotations
+
+import contextvars
+import functools
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Deque, List, Optional
+
+from .config import TRACE_PATH, TRACE_SAMPLE, TRACE_SLOW_MS
+
+TRACE_HEADER = "x-gd-trace"
+TRACE_ID_HEADER = "X-GD-Trace-Id"
+RECENT_TRACES = 100
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("gd_span", default=None)
+
+
+def _new_id(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+
+class Trace:
+    __slots__ = ("trace_id", "spans", "forced", "sampled")
+
+    def __init__(self, forced: bool = False):
+        self.trace_id = _new_id(16)
+        self.spans: List[Span] = []
+        self.forced = forced
+        self.sampled = forced or random.random() < TRACE_SAMPLE
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "start", "duration", "attributes", "error", "_t0")
+
+    def __init__(self, trace: Trace, name: str, parent_id: Optional[str], attributes: dict):
+        self.trace = trace
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self.start = time.time()
+        self.duration = 0.0
+        self._t0 = time.perf_counter()
+
+    def set(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def add(self, key: str, amount: float = 1) -> None:
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round(self.duration * 1000, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """Stand-in returned when nothing is being traced."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, key, value) -> None:
+        pass
+
+    def add(self, key, amount=1) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _SpanScope:
+    __slots__ = ("_trace", "_parent_id", "_name", "_attributes", "_span", "_token")
+
+    def __init__(self, trace: Trace, parent_id: Optional[str], name: str, attributes: dict):
+        self._trace = trace
+        self._parent_id = parent_id
+        self._name = name
+        self._attributes = attributes
+
+    def __enter__(self) -> Span:
+        self._span = Span(self._trace, self._name, self._parent_id, self._attributes)
+        self._token = _current_span.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb):
+        span = self._span
+        span.duration = time.perf_counter() - span._t0
+        if exc_type is not None:
+            span.error = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self._token)
+        # list.append is atomic; spans may finish on different threads.
+        span.trace.spans.append(span)
+        return False
+
+
+def span(name: str, **attributes):
+    """Child span of the current one; a no-op when the request is not traced."""
+    parent = _current_span.get()
+    if parent is None:
+        return NOOP_SPAN
+    return _SpanScope(parent.trace, parent.span_id, name, attributes)
+
+
+def traced(name: str) -> Callable:
+    """Decorator form of ``span``."""
+
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def current_span():
+    return _current_span.get() or NOOP_SPAN
+
+
+# ---------------------------------------------------------------------------
+# Export
+# ---------------------------------------------------------------------------
+
+_recent: Deque[List[dict]] = deque(maxlen=RECENT_TRACES)
+_export_lock = threading.Lock()
+exported_traces = 0
+dropped_traces = 0
+
+
+def export(trace: Trace, root: Span, path: Optional[Path] = TRACE_PATH) -> bool:
+    """Write *trace* if it was sampled, forced or slow; returns whether it was kept."""
+    global exported_traces, dropped_traces
+    if not (trace.sampled or root.duration * 1000 >= TRACE_SLOW_MS):
+        dropped_traces += 1
+        return False
+    spans = sorted((s.to_dict() for s in trace.spans), key=lambda s: s["start"])
+    with _export_lock:
+        _recent.append(spans)
+        exported_traces += 1
+        if path:
+            with open(path, "a", encoding="utf-8") as fh:
+                for s in spans:
+                    fh.write(json.dumps(s, ensure_ascii=False, default=str) + "\n")
+    return True
+
+
+def recent_traces(limit: int = 20) -> List[List[dict]]:
+    with _export_lock:
+        return list(_recent)[-limit:][::-1]
+
+
+# ---------------------------------------------------------------------------
+# Process-pool support
+# ---------------------------------------------------------------------------
+
+def trace_context():
+    """``(trace_id, parent span id, sampled)`` to hand to a worker process, or None."""
+    parent = _current_span.get()
+    if parent is None:
+        return None
+    return parent.trace.trace_id, parent.span_id, parent.trace.sampled
+
+
+def run_in_trace(context, fn: Callable, *args, **kwargs):
+    """Worker side: run *fn* under a trace continuing *context*; returns ``(result, spans)``."""
+    trace = Trace()
+    trace.trace_id, parent_id, trace.sampled = context
+    # Placeholder for the parent span living in the API process.
+    remote_parent = Span(trace, "remote", None, {})
+    remote_parent.span_id = parent_id
+    token = _current_span.set(remote_parent)
+    try:
+        result = fn(*args, **kwargs)
+    finally:
+        _current_span.reset(token)
+    return result, list(trace.spans)
+
+
+def adopt(spans: List[Span]) -> None:
+    """Parent side: attach spans recorded in a worker to the current trace."""
+    parent = _current_span.get()
+    if parent is None:
+        return
+    for s in spans:
+        s.trace = parent.trace
+        parent.trace.spans.append(s)
+
+
+# ---------------------------------------------------------------------------
+# ASGI middleware
+# ---------------------------------------------------------------------------
+
+class TracingMiddleware:
+    """Root span per HTTP request; only installed when ``GD_TRACE_PATH`` is set."""
+
+    def __init__(self, app, exclude=()):
+        self.app = app
+        self.exclude = frozenset(exclude)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path") in self.exclude:
+            await self.app(scope, receive, send)
+            return
+
+        forced = any(n == TRACE_HEADER.encode() and v.strip() not in (b"", b"0") for n, v in scope.get("headers", ()))
+        trace = Trace(forced=forced)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((TRACE_ID_HEADER.lower().encode(), trace.trace_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        method = scope.get("method", "")
+        root_scope = _SpanScope(trace, None, "http", {"http.method": method, "http.path": scope.get("path", "")})
+        root = root_scope.__enter__()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            root.name = f"{method} {getattr(route, 'path', scope.get('path', ''))}"
+            root.set("http.status", status)
+            root_scope.__exit__(None, None, None)
+            try:
+                export(trace, root)
+            except OSError as exc:  # pragma: no cover - never fail a request on export
+                print("⚠️ No se pudo exportar la traza:", exc)
@@ -0,0 +1,71 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from gd import service
+
+
+def _pool(max_queue=2):
+    return service.TrackedExecutor(
+        "test",
+        lambda: ThreadPoolExecutor(max_workers=1, thread_name_prefix="gd-test"),
+        1,
+        max_queue=max_queue,
+    )
+
+
+def test_cancelled_queued_job_leaves_the_queue():
+    pool = _pool()
+    release = threading.Event()
+
+    async def scenario():
+        blocker = asyncio.ensure_future(pool.run(release.wait))
+        await asyncio.sleep(0.05)  # the blocker is running, the pool is busy
+        waiting = asyncio.ensure_future(pool.run(lambda: "never"))
+        await asyncio.sleep(0.05)
+        assert pool.stats()["queued"] == 1
+
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        release.set()
+        await blocker
+
+    try:
+        asyncio.run(scenario())
+        stats = pool.stats()
+        assert stats["queued"] == 0
+        assert stats["running"] == 0
+        assert stats["cancelled"] == 1
+        assert stats["completed"] == 1
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+def test_cancellations_do_not_fill_the_admission_queue():
+    pool = _pool(max_queue=2)
+    release = threading.Event()
+
+    async def scenario():
+        blocker = asyncio.ensure_future(pool.run(release.wait))
+        await asyncio.sleep(0.05)
+        for _ in range(5):
+            waiting = asyncio.ensure_future(pool.run(lambda: None))
+            await asyncio.sleep(0)
+            waiting.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiting
+        release.set()
+        await blocker
+        return await pool.run(lambda: "ok")
+
+    try:
+        assert asyncio.run(scenario()) == "ok"
+        assert pool.stats()["rejected"] == 0
+        assert pool.stats()["cancelled"] == 5
+    finally:
+        release.set()
+        pool.shutdown()
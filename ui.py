@@ -1,5 +1,8 @@
 # ui.py — GD Front (Streamlit)
+import copy
 import os
+from collections import OrderedDict
+
 import requests
 import pandas as pd
 import streamlit as st
@@ -11,15 +14,72 @@ st.set_page_config(page_title="GD · Dependencias", layout="wide")
 # ----------------------------
 # Helpers
 # ----------------------------
+ETAG_CACHE_SIZE = 256
+
+
+def _etag_cache():
+    # (path, params) -> (ETag, body), per session and least recently used
+    # first; keys include free-text searches, so it is capped.
+    return st.session_state.setdefault("_etag_cache", OrderedDict())
+
+
+# Bodies fetched by prefetch() for this rerun; api_get consumes them first.
+_prefetched = {}
+
+
+def _request_key(path: str, params=None):
+    return (path, tuple(sorted((k, str(v)) for k, v in (params or {}).items() if v is not None)))
+
+
+def prefetch(reads):
+    """Fetch this rerun's reads with one POST /batch (one snapshot, one parse)."""
+    items = [
+        {"id": str(i), "path": path, "params": {k: v for k, v in (params or {}).items() if v is not None}}
+        for i, (path, params) in enumerate(reads)
+    ]
+    try:
+        r = requests.post(f"{API_BASE}/batch", json={"requests": items}, timeout=30)
+    except requests.RequestException:
+        return
+    if not r.ok:
+        return  # API without /batch: api_get falls back to one GET per read
+    for (path, params), result in zip(reads, r.json().get("results", [])):
+        if result.get("status") == 200:
+            _prefetched[_request_key(path, params)] = result["body"]
+
+
 def api_get(path: str, params=None):
-    r = requests.get(f"{API_BASE}{path}", params=params, timeout=30)
+    key = _request_key(path, params)
+    if key in _prefetched:
+        return _prefetched.pop(key)
+    cache = _etag_cache()
+    cached = cache.get(key)
+    headers = {"If-None-Match": cached[0]} if cached else {}
+    r = requests.get(f"{API_BASE}{path}", params=params, headers=headers, timeout=30)
+    if r.status_code == 304 and cached:
+        cache.move_to_end(key)
+        return copy.deepcopy(cached[1])
     if not r.ok:
         raise RuntimeError(f"GET {path} -> {r.status_code}: {r.text}")
-    return r.json()
+    data = r.json()
+    if r.headers.get("ETag"):
+        # Callers may mutate what they get back; the cache keeps its own copy.
+        cache[key] = (r.headers["ETag"], copy.deepcopy(data))
+        cache.move_to_end(key)
+        while len(cache) > ETAG_CACHE_SIZE:
+            cache.popitem(last=False)
+    return data
+
+
+def _raise_if_busy(r):
+    # Admission control on the write endpoints: fail fast instead of retrying.
+    if r.status_code in (429, 503) and r.headers.get("Retry-After"):
+        raise RuntimeError(f"El servidor está ocupado guardando otros cambios; reintenta en {r.headers['Retry-After']} s.")
 
 
 def api_post(path: str, payload: dict):
     r = requests.post(f"{API_BASE}{path}", json=payload, timeout=60)
+    _raise_if_busy(r)
     if not r.ok:
         raise RuntimeError(f"POST {path} -> {r.status_code}: {r.text}")
     return r.json()
@@ -27,6 +87,7 @@ def api_post(path: str, payload: dict):
 
 def api_put(path: str, payload: dict):
     r = requests.put(f"{API_BASE}{path}", json=payload, timeout=60)
+    _raise_if_busy(r)
     if not r.ok:
         raise RuntimeError(f"PUT {path} -> {r.status_code}: {r.text}")
     return r.json()
@@ -51,7 +112,24 @@ with col2:
 # ----------------------------
 # Bootstrap catalogs + health
 # ----------------------------
+# Widget values from the previous rerun decide what this render needs.
+_scope = st.session_state.get("scope", "all")
+_filter_value = st.session_state.get(f"filter_{_scope}")
+_q = st.session_state.get("q") or None
+_selected = st.session_state.get("selected")
+_reads = [
+    ("/health", None),
+    ("/catalogs", None),
+    ("/metrics", {"scope": _scope, "filter_value": _filter_value}),
+    ("/projects", {"q": _q}),
+    ("/suggestions", {"limit": 5}),
+    ("/teams", None),
+]
+if _selected:
+    _reads.append((f"/projects/{_selected}", None))
+
 with st.spinner("Cargando configuración..."):
+    prefetch(_reads)
     health = api_get("/health")
     catalogs = api_get("/catalogs")
 
@@ -67,13 +145,13 @@ iniciativas = catalogs.get("iniciativas", [])
 # Sidebar filters (metrics)
 # ----------------------------
 st.sidebar.header("Filtros de métricas")
-scope = st.sidebar.selectbox("Scope", ["all", "area", "celula"], index=0)
+scope = st.sidebar.selectbox("Scope", ["all", "area", "celula"], index=0, key="scope")
 
 filter_value = None
 if scope == "area":
-    filter_value = st.sidebar.selectbox("Área/Tren/CoE", area_tren_coe if area_tren_coe else ["(vacío)"])
+    filter_value = st.sidebar.selectbox("Área/Tren/CoE", area_tren_coe if area_tren_coe else ["(vacío)"], key="filter_area")
 elif scope == "celula":
-    filter_value = st.sidebar.selectbox("Célula", celulas_dep if celulas_dep else ["(vacío)"])
+    filter_value = st.sidebar.selectbox("Célula", celulas_dep if celulas_dep else ["(vacío)"], key="filter_celula")
 
 # ----------------------------
 # Dashboard metrics
@@ -98,7 +176,7 @@ st.markdown("### Explorador de Proyectos")
 left, right = st.columns([2, 3], gap="large")
 
 with left:
-    q = st.text_input("Buscar proyecto (contiene)", "")
+    q = st.text_input("Buscar proyecto (contiene)", "", key="q")
     with st.spinner("Cargando lista..."):
         proj_list = api_get("/projects", params={"q": q if q else None}).get("items", [])
 
@@ -106,7 +184,7 @@ with left:
         st.warning("No hay proyectos (o tu búsqueda quedó vacía).")
         st.stop()
 
-    selected = st.selectbox("Selecciona proyecto", proj_list)
+    selected = st.selectbox("Selecciona proyecto", proj_list, key="selected")
 
     st.markdown("#### Acciones")
     usuario = st.text_input("Tu usuario (para sugerencias)", "")
@@ -203,6 +281,15 @@ st.divider()
 # Team / Célula view
 # ----------------------------
 st.markdown("### Vista por célula (resumen de dependencias)")
+with st.spinner("Cargando resumen de células..."):
+    teams_overview = api_get("/teams")
+overview_rows = [e for e in teams_overview.get("equipos", []) if e.get("found")]
+if overview_rows:
+    st.dataframe(
+        pd.DataFrame(overview_rows)[["equipo", "total", "pendientes", "negociadas", "pct_pendientes"]],
+        use_container_width=True,
+        hide_index=True,
+    )
 team = st.selectbox("Célula", celulas_dep if celulas_dep else ["(vacío)"], index=0)
 if st.button("Ver resumen de célula", use_container_width=True):
     data = api_get(f"/teams/{team}")